@@ -0,0 +1,680 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional, List, Dict, Tuple
+
+import psycopg
+import psycopg.errors
+import psycopg2
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+import migrate
+from cache import TTLCache
+from database import (
+    APPROVE_LOCK_SQL,
+    APPROVE_USER_UPDATE_SQL,
+    CLAIM_OUTBOX_SQL,
+    CREATE_SUBMISSION_SQL,
+    ENQUEUE_ADMIN_TICKETS_SQL,
+    ENQUEUE_OUTBOX_SQL,
+    INCREMENT_MISSION_STAT_SQL,
+    MILESTONES,
+    QUEST_BOARD_SQL,
+    REBUILD_MISSION_STATS_SQL,
+    REJECT_SUBMISSION_SQL,
+    QUEST_INFO,
+    SET_STATE_SQL,
+    SYNC_ALL_TIERS_SQL,
+    USERS_VERSION_KEY,
+    USER_RANK_SQL,
+    approval_notice,
+    build_quest_board,
+    build_user_rank,
+    export_copy_query,
+    fill_missing_tiers,
+    outbox_payload,
+    submissions_query,
+    users_page_query,
+    tier_for_xp,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase:
+    """Database와 같은 API를 asyncio로 제공 (psycopg3 + 비동기 연결 풀).
+
+    봇(이벤트 루프)에서는 이 클래스만 사용한다. 모든 메서드가 코루틴이므로
+    asyncio.to_thread 없이 바로 await 하면 되고, 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self):
+        """PostgreSQL 비동기 연결 풀 구성 (실제 연결은 open()에서)"""
+        self.connection_string = os.getenv('DATABASE_URL') or os.getenv('DATABASE_PUBLIC_URL')
+        if not self.connection_string:
+            raise ValueError("DATABASE_URL 또는 DATABASE_PUBLIC_URL 환경 변수가 설정되지 않았습니다.")
+        self.pool = AsyncConnectionPool(
+            self.connection_string,
+            min_size=int(os.getenv('DB_POOL_MIN', '1')),
+            max_size=int(os.getenv('DB_POOL_MAX', '10')),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+            timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            kwargs={'row_factory': dict_row},
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        self._opened = False
+        self._schema_lock = asyncio.Lock()
+        self._schema_verified = False
+        self._xp_listeners: List[Callable[[int, int], None]] = []
+        # users 행 읽기 캐시. 승인/제출/티어 동기화가 커밋 후 갱신하거나 지운다.
+        # 다른 프로세스(CLI 가져오기/티어 동기화)는 bot_state의 users_version을 올리고, 캐시를 읽을 때
+        # USER_CACHE_POLL초마다 그 값을 확인해 바뀌었으면 전부 비운다. TTL은 버전을 올리지 않는 수동 SQL 대비.
+        self._user_cache = TTLCache(
+            maxsize=int(os.getenv('USER_CACHE_SIZE', '4096')),
+            ttl=float(os.getenv('USER_CACHE_TTL', '300')),
+        )
+        self._users_version: Optional[str] = None
+        self._users_version_poll = float(os.getenv('USER_CACHE_POLL', '10'))
+        self._users_version_checked_at = float('-inf')
+
+    async def open(self) -> None:
+        """연결 풀 열기 (이벤트 루프 안에서 호출)"""
+        if not self._opened:
+            await self.pool.open()
+            self._opened = True
+
+    async def close(self) -> None:
+        """연결 풀 종료"""
+        if self._opened:
+            await self.pool.close()
+            self._opened = False
+
+    @asynccontextmanager
+    async def connection(self):
+        """풀에서 연결을 빌려오는 비동기 컨텍스트 매니저. 블록이 정상 종료되면 커밋, 예외 시 롤백."""
+        if not self._opened:
+            await self.open()
+        if not self._schema_verified:
+            await self.ensure_schema()
+        async with self.pool.connection() as conn:
+            yield conn
+
+    def pool_stats(self) -> Dict:
+        """연결 풀 상태 조회"""
+        return self.pool.get_stats()
+
+    def user_cache_stats(self) -> Dict:
+        """유저 캐시 적중률과 대략적인 메모리 사용량"""
+        return {**self._user_cache.stats(), 'approx_bytes': self._user_cache.approx_bytes()}
+
+    def invalidate_user(self, user_id: int) -> None:
+        """유저 캐시 항목 제거 (users 행을 바꾼 커밋 후 호출)"""
+        self._user_cache.pop(user_id)
+
+    def _update_cached_user(self, user_id: int, **fields) -> None:
+        """캐시에 있는 유저 행만 바뀐 컬럼으로 교체 (없으면 다음 조회 때 채워짐)"""
+        cached = self._user_cache.pop(user_id)
+        if cached is not None:
+            self._user_cache.set(user_id, {**cached, **fields})
+
+    def add_xp_listener(self, listener: Callable[[int, int], None]) -> None:
+        """XP 변경 커밋 후 호출될 콜백 등록. listener(user_id, new_total_xp)"""
+        self._xp_listeners.append(listener)
+
+    def _notify_xp_changed(self, user_id: int, total_xp: int) -> None:
+        for listener in self._xp_listeners:
+            try:
+                listener(user_id, total_xp)
+            except Exception as e:
+                print(f"❌ XP 변경 리스너 오류: {e}")
+
+    async def ensure_schema(self) -> None:
+        """스키마가 최신인지 한 번만 확인하고, 미적용 마이그레이션이 있을 때만 적용"""
+        async with self._schema_lock:
+            if self._schema_verified:
+                return
+            async with self.pool.connection() as conn:
+                try:
+                    cursor = await conn.execute('SELECT version FROM schema_migrations')
+                    applied = {row['version'] for row in await cursor.fetchall()}
+                except psycopg.errors.UndefinedTable:
+                    await conn.rollback()
+                    applied = set()
+            migrations = migrate.load_migrations()
+            pending = [m for m in migrations if m.transactional and m.version not in applied]
+            if pending:
+                # 마이그레이션 러너는 동기(psycopg2) 구현이라 배포 직후 한 번만 스레드에서 실행
+                await asyncio.to_thread(self.init_database)
+            # CREATE INDEX CONCURRENTLY 같은 no-transaction 마이그레이션은 부팅 시 적용하지 않음.
+            # 빠진 인덱스 없이 순위/목록 쿼리가 풀 스캔으로 돌지 않도록 운영자에게 알린다.
+            skipped = migrate.pending_no_transaction(applied, migrations)
+            if skipped:
+                logger.warning(
+                    "미적용 no-transaction 마이그레이션 %s - '%s'로 적용하세요.",
+                    ", ".join(f"{m.version:04d}_{m.name}" for m in skipped),
+                    migrate.APPLY_NO_TRANSACTION_COMMAND,
+                )
+            self._schema_verified = True
+
+    def init_database(self) -> None:
+        """미적용 마이그레이션 적용 (동기, 전용 연결 사용)"""
+        conn = psycopg2.connect(self.connection_string)
+        try:
+            migrate.apply(conn)
+        except Exception as e:
+            print(f"❌ 데이터베이스 초기화 오류: {e}")
+            raise
+        finally:
+            conn.close()
+
+    async def register_user(self, user_id: int) -> bool:
+        """사용자 등록 (처음 사용 시)"""
+        async with self.connection() as conn:
+            try:
+                cursor = await conn.execute('''
+                    INSERT INTO users (user_id, tier, tier_name)
+                    VALUES (%s, 1, 'Code SZ')
+                    ON CONFLICT (user_id) DO NOTHING
+                ''', (user_id,))
+                return cursor.rowcount > 0
+            except Exception as e:
+                await conn.rollback()
+                print(f"❌ 사용자 등록 오류: {e}")
+                return False
+
+    async def _check_users_version(self) -> None:
+        """다른 프로세스가 users를 바꿨으면(users_version 변경) 유저 캐시를 비움. 최대 USER_CACHE_POLL초에 한 번 조회."""
+        now = time.monotonic()
+        if now - self._users_version_checked_at < self._users_version_poll:
+            return
+        # 동시에 들어온 조회가 같이 확인하지 않도록 먼저 기록
+        self._users_version_checked_at = now
+        version = await self.get_state(USERS_VERSION_KEY)
+        if version != self._users_version:
+            self._user_cache.clear()
+            self._users_version = version
+
+    async def get_user(self, user_id: int) -> Optional[Dict]:
+        """사용자 정보 조회 (유저 캐시 우선, 반환값은 복사본)"""
+        await self._check_users_version()
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+        async with self.connection() as conn:
+            cursor = await conn.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
+            user = await cursor.fetchone()
+        if user is not None:
+            self._user_cache.set(user_id, user)
+            return dict(user)
+        return None
+
+    async def get_or_create_user(self, user_id: int) -> Dict:
+        """사용자 정보 조회 또는 생성"""
+        user = await self.get_user(user_id)
+        if not user:
+            await self.register_user(user_id)
+            user = await self.get_user(user_id)
+        return user
+
+    async def create_submission(self, user_id: int, mission_code: str, link: str) -> Optional[int]:
+        """제출 생성. 이미 완료한 원타임 퀘스트면 아무것도 기록하지 않고 None."""
+        submission_id = await self._create_submission_tx(user_id, mission_code, link)
+        if submission_id is not None:
+            # total_submissions, link_list가 바뀜
+            self.invalidate_user(user_id)
+        return submission_id
+
+    async def _create_submission_tx(self, user_id: int, mission_code: str, link: str) -> Optional[int]:
+        async with self.connection() as conn:
+            try:
+                # 제출 기록 추가 (원타임 완료 여부 확인 포함)
+                cursor = await conn.execute(CREATE_SUBMISSION_SQL, {
+                    'user_id': user_id,
+                    'mission_code': mission_code,
+                    'link': link,
+                    'one_time': QUEST_INFO[mission_code]['type'] == 'one-time',
+                })
+                row = await cursor.fetchone()
+                if row is None:
+                    await conn.rollback()
+                    return None
+                submission_id = row['submission_id']
+
+                # 사용자 테이블 업데이트 (total_submissions, link_list)
+                await conn.execute('''
+                    UPDATE users
+                    SET total_submissions = total_submissions + 1,
+                        link_list = array_append(link_list, %s)
+                    WHERE user_id = %s
+                ''', (link, user_id))
+
+                # 관리자 채널 티켓은 커밋과 함께 아웃박스에 기록 (전송은 봇 디스패처가 담당)
+                await conn.execute(ENQUEUE_OUTBOX_SQL, ('admin_ticket', outbox_payload(
+                    submission_id=submission_id, user_id=user_id, mission_code=mission_code, link=link,
+                )))
+                return submission_id
+            except Exception as e:
+                await conn.rollback()
+                print(f"❌ 제출 생성 오류: {e}")
+                raise
+
+    async def get_submission(self, submission_id: int) -> Optional[Dict]:
+        """제출 정보 조회"""
+        async with self.connection() as conn:
+            cursor = await conn.execute(
+                'SELECT * FROM submissions WHERE submission_id = %s', (submission_id,)
+            )
+            return await cursor.fetchone()
+
+    async def approve_submission(self, submission_id: int) -> Tuple[bool, Optional[str], Optional[Dict]]:
+        """제출 승인 및 XP 추가 (잠금 + 커밋 1회의 단일 트랜잭션).
+
+        성공 시 (True, 메시지, 결과) 를 반환하며 결과에는 user_id, mission_code, xp_earned,
+        total_xp, tier, tier_name, approved_count, milestones 가 들어 있어 호출 측에서 다시 조회할 필요가 없다.
+        커밋 후 유저 캐시를 갱신하고 XP 변경 리스너(리더보드 캐시 등)에 알린다.
+        """
+        success, message, result = await self._approve_submission_tx(submission_id)
+        if success:
+            # 마일스톤 보상도 같은 UPDATE에 합산되므로 여기서 한 번에 반영
+            self._update_cached_user(
+                result['user_id'],
+                total_xp=result['total_xp'],
+                tier=result['tier'],
+                tier_name=result['tier_name'],
+                approved_count=result['approved_count'],
+            )
+            self._notify_xp_changed(result['user_id'], result['total_xp'])
+        return success, message, result
+
+    async def _approve_submission_tx(self, submission_id: int) -> Tuple[bool, Optional[str], Optional[Dict]]:
+        async with self.connection() as conn:
+            try:
+                cursor = await conn.execute(APPROVE_LOCK_SQL, (submission_id,))
+                submission = await cursor.fetchone()
+                if not submission:
+                    await conn.rollback()
+                    return False, "제출을 찾을 수 없습니다.", None
+
+                if submission['status'] != 'pending':
+                    await conn.rollback()
+                    return False, "이미 처리된 제출입니다.", None
+
+                user_id = submission['user_id']
+                mission_code = submission['mission_code']
+
+                # 원타임 퀘스트 중복 체크
+                quest_info = QUEST_INFO.get(mission_code)
+                if not quest_info:
+                    await conn.rollback()
+                    return False, "유효하지 않은 미션 코드입니다.", None
+
+                if quest_info['type'] == 'one-time' and submission['already_completed']:
+                    await conn.rollback()
+                    return False, "이미 완료한 원타임 퀘스트입니다.", None
+
+                # 제출 상태 업데이트
+                await conn.execute('''
+                    UPDATE submissions
+                    SET status = 'approved', approved_at = CURRENT_TIMESTAMP
+                    WHERE submission_id = %s
+                ''', (submission_id,))
+
+                # 완료된 퀘스트 기록 (원타임만 기록). 잠금 대기 중 다른 승인이 먼저 완료했으면 여기서 걸러짐
+                xp_earned = quest_info['xp']
+                if quest_info['type'] == 'one-time':
+                    cursor = await conn.execute('''
+                        INSERT INTO completed_quests (user_id, mission_code, xp_earned)
+                        VALUES (%s, %s, %s)
+                        ON CONFLICT (user_id, mission_code) DO NOTHING
+                        RETURNING completion_id
+                    ''', (user_id, mission_code, xp_earned))
+                    if await cursor.fetchone() is None:
+                        await conn.rollback()
+                        return False, "이미 완료한 원타임 퀘스트입니다.", None
+
+                # 미션 카운터 증가 후 누적 마일스톤 체크
+                cursor = await conn.execute(INCREMENT_MISSION_STAT_SQL, (user_id, mission_code))
+                approved_count = (await cursor.fetchone())['approved_count']
+                milestone_rewards = await self._check_milestones(user_id, mission_code, approved_count, conn)
+                total_earned = xp_earned + sum(r['xp'] for r in milestone_rewards)
+
+                # XP 추가 + 티어 재계산 (UPDATE 1회)
+                cursor = await conn.execute(
+                    APPROVE_USER_UPDATE_SQL, {'xp': total_earned, 'user_id': user_id}
+                )
+                updated = await cursor.fetchone()
+
+                # XP 로그 기록 (미션 + 마일스톤을 한 번에)
+                log_rows = [(user_id, f"Mission {mission_code}: {quest_info['name']}", xp_earned)]
+                log_rows += [
+                    (user_id, f"Mission {r['mission']}: {QUEST_INFO[r['mission']]['name']} (Milestone)", r['xp'])
+                    for r in milestone_rewards
+                ]
+                async with conn.cursor() as log_cursor:
+                    await log_cursor.executemany(
+                        'INSERT INTO xp_logs (user_id, mission_name, xp_amount) VALUES (%s, %s, %s)',
+                        log_rows,
+                    )
+
+                result = {
+                    'submission_id': submission_id,
+                    'user_id': user_id,
+                    'mission_code': mission_code,
+                    'xp_earned': xp_earned,
+                    'total_xp': updated['total_xp'],
+                    'tier': updated['tier'],
+                    'tier_name': updated['tier_name'],
+                    'approved_count': updated['approved_count'],
+                    'milestones': milestone_rewards,
+                }
+                # 승인 알림 DM은 같은 트랜잭션에서 아웃박스에 기록
+                await conn.execute(ENQUEUE_OUTBOX_SQL, ('approval_dm', approval_notice(result)))
+                return True, f"{xp_earned} XP를 획득했습니다.", result
+
+            except Exception as e:
+                await conn.rollback()
+                print(f"❌ 승인 처리 오류: {e}")
+                return False, f"오류 발생: {str(e)}", None
+
+    async def _check_milestones(self, user_id: int, approved_mission: str, approved_count: int, conn) -> List[Dict]:
+        """누적 마일스톤 체크 및 완료 기록. approved_count는 방금 승인까지 포함한 카운터 값.
+
+        XP 가산은 호출 측 UPDATE에서 한 번에 처리.
+        """
+        milestones = MILESTONES.get(approved_mission)
+        if not milestones:
+            return []
+
+        rewards = []
+        for milestone_code, threshold in milestones:
+            if approved_count == threshold and await self._grant_milestone(user_id, milestone_code, conn):
+                rewards.append({'mission': milestone_code, 'xp': QUEST_INFO[milestone_code]['xp']})
+        return rewards
+
+    async def _grant_milestone(self, user_id: int, mission_code: str, conn) -> bool:
+        """마일스톤 완료 기록. 이미 완료한 마일스톤이면 False."""
+        quest_info = QUEST_INFO.get(mission_code)
+        if not quest_info:
+            return False
+
+        cursor = await conn.execute('''
+            INSERT INTO completed_quests (user_id, mission_code, xp_earned)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (user_id, mission_code) DO NOTHING
+            RETURNING completion_id
+        ''', (user_id, mission_code, quest_info['xp']))
+        return await cursor.fetchone() is not None
+
+    async def reject_submission(self, submission_id: int, reason: str = None) -> bool:
+        """제출 거부 (반려 알림 DM은 같은 트랜잭션에서 아웃박스에 기록). 대기 중인 제출이 없으면 False."""
+        async with self.connection() as conn:
+            try:
+                cursor = await conn.execute(REJECT_SUBMISSION_SQL, (reason, submission_id))
+                row = await cursor.fetchone()
+                if row is None:
+                    await conn.rollback()
+                    return False
+
+                await conn.execute(ENQUEUE_OUTBOX_SQL, ('rejection_dm', outbox_payload(
+                    submission_id=submission_id, user_id=row['user_id'],
+                    mission_code=row['mission_code'], reason=reason,
+                )))
+                return True
+            except Exception as e:
+                await conn.rollback()
+                print(f"❌ 거부 처리 오류: {e}")
+                return False
+
+    async def get_rejected_submissions(self, user_id: int) -> List[Dict]:
+        """사용자의 반려된 제출 목록 조회"""
+        return await self.get_user_submissions(user_id, 'rejected')
+
+    async def get_quest_board_data(self, user_id: int) -> Dict:
+        """퀘스트 보드(/sz)용 데이터를 쿼리 1회로 조회 (유저가 없으면 생성)"""
+        async with self.connection() as conn:
+            row = None
+            # 동시에 다른 요청이 같은 유저를 먼저 만들면 이번 스냅샷에서는 행이 안 보일 수 있어 한 번 재시도
+            for _ in range(2):
+                cursor = await conn.execute(QUEST_BOARD_SQL, {'user_id': user_id})
+                row = await cursor.fetchone()
+                await conn.commit()
+                if row:
+                    break
+        board = build_quest_board(row)
+        # 보드 쿼리가 users 행 전체를 읽으므로 유저 캐시도 채움
+        self._user_cache.set(user_id, dict(board['user']))
+        return board
+
+    async def get_user_submissions(self, user_id: int, status: Optional[str] = None) -> List[Dict]:
+        """사용자의 제출 목록 조회 (최신순 전체)"""
+        return [row async for row in self.iter_submissions(user_id=user_id, status=status, newest_first=True)]
+
+    async def get_user_submissions_page(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 50,
+    ) -> List[Dict]:
+        """사용자의 제출 한 페이지 (최신순). after는 직전 페이지 마지막 행의 submission_cursor."""
+        return await self._fetch_submissions(*submissions_query(user_id, status, after, limit, newest_first=True))
+
+    async def _fetch_submissions(self, sql: str, params: Dict) -> List[Dict]:
+        async with self.connection() as conn:
+            cursor = await conn.execute(sql, params)
+            return await cursor.fetchall()
+
+    async def iter_submissions(
+        self,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None,
+        newest_first: bool = False,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict]:
+        """제출 전체를 서버 측 커서로 batch_size개씩 받아 하나씩 내보내는 비동기 제너레이터.
+
+        순회가 끝나거나 제너레이터가 닫힐 때까지 풀 연결 하나를 점유한다.
+        """
+        sql, params = submissions_query(user_id, status, newest_first=newest_first)
+        async with self.connection() as conn:
+            async with conn.cursor('submissions_stream') as cursor:
+                cursor.itersize = batch_size
+                await cursor.execute(sql, params)
+                async for row in cursor:
+                    yield row
+
+    async def get_approved_count(self, user_id: int, mission_code: str) -> int:
+        """승인된 특정 미션 개수 (user_mission_stats 카운터)"""
+        async with self.connection() as conn:
+            cursor = await conn.execute('''
+                SELECT approved_count FROM user_mission_stats
+                WHERE user_id = %s AND mission_code = %s
+            ''', (user_id, mission_code))
+            row = await cursor.fetchone()
+            return row['approved_count'] if row else 0
+
+    async def rebuild_mission_stats(self) -> Dict:
+        """user_mission_stats 카운터를 submissions 기준으로 재계산. {'repaired', 'removed'} 반환."""
+        async with self.connection() as conn:
+            # 재계산 중 승인 트랜잭션의 카운터 증가는 잠시 대기시켜 결과가 어긋나지 않게 함
+            await conn.execute('LOCK TABLE user_mission_stats IN SHARE ROW EXCLUSIVE MODE')
+            cursor = await conn.execute(REBUILD_MISSION_STATS_SQL)
+            return await cursor.fetchone()
+
+    async def get_state(self, key: str) -> Optional[str]:
+        """bot_state 값 조회 (없으면 None)"""
+        async with self.connection() as conn:
+            cursor = await conn.execute('SELECT value FROM bot_state WHERE key = %s', (key,))
+            row = await cursor.fetchone()
+            return row['value'] if row else None
+
+    async def set_state(self, key: str, value: str) -> None:
+        """bot_state 값 저장 (있으면 덮어씀)"""
+        async with self.connection() as conn:
+            await conn.execute(SET_STATE_SQL, (key, value))
+
+    async def claim_outbox(self, limit: int = 20, lease: float = 60.0) -> List[Dict]:
+        """전송할 아웃박스 행을 최대 limit개 가져옴 (lease 초 동안 다른 디스패처에 안 보임)"""
+        async with self.connection() as conn:
+            cursor = await conn.execute(CLAIM_OUTBOX_SQL, {'limit': limit, 'lease': lease})
+            return await cursor.fetchall()
+
+    async def mark_outbox_sent(self, outbox_ids: List[int]) -> None:
+        """전송 완료 처리 (배치)"""
+        if not outbox_ids:
+            return
+        async with self.connection() as conn:
+            await conn.execute('''
+                UPDATE outbox SET status = 'sent', sent_at = CURRENT_TIMESTAMP, last_error = NULL
+                WHERE outbox_id = ANY(%s)
+            ''', (outbox_ids,))
+
+    async def mark_outbox_failed(self, outbox_id: int, error: str, retry_in: Optional[float]) -> None:
+        """전송 실패 기록. retry_in이 None이면 재시도 포기(dead)."""
+        async with self.connection() as conn:
+            if retry_in is None:
+                await conn.execute('''
+                    UPDATE outbox SET status = 'dead', last_error = %s WHERE outbox_id = %s
+                ''', (error[:1000], outbox_id))
+            else:
+                await conn.execute('''
+                    UPDATE outbox
+                    SET last_error = %s, next_attempt_at = CURRENT_TIMESTAMP + %s * INTERVAL '1 second'
+                    WHERE outbox_id = %s
+                ''', (error[:1000], retry_in, outbox_id))
+
+    async def get_outbox_counts(self) -> Dict[str, int]:
+        """아웃박스 상태별 행 수 (pending / sent / dead)"""
+        async with self.connection() as conn:
+            cursor = await conn.execute('SELECT status, COUNT(*) AS count FROM outbox GROUP BY status')
+            return {row['status']: row['count'] for row in await cursor.fetchall()}
+
+    async def is_quest_completed(self, user_id: int, mission_code: str) -> bool:
+        """원타임 퀘스트 완료 여부"""
+        async with self.connection() as conn:
+            cursor = await conn.execute('''
+                SELECT COUNT(*) AS count FROM completed_quests
+                WHERE user_id = %s AND mission_code = %s
+            ''', (user_id, mission_code))
+            return (await cursor.fetchone())['count'] > 0
+
+    async def get_leaderboard(self, limit: int = 10) -> List[Dict]:
+        """리더보드 조회"""
+        async with self.connection() as conn:
+            cursor = await conn.execute('''
+                SELECT user_id, total_xp, approved_count, total_submissions
+                FROM users
+                ORDER BY total_xp DESC, user_id
+                LIMIT %s
+            ''', (limit,))
+            return await cursor.fetchall()
+
+    async def get_user_xp_map(self) -> Dict[int, int]:
+        """전체 유저의 user_id → total_xp (역할 일괄 동기화용, 쿼리 1회)"""
+        async with self.connection() as conn:
+            async with conn.cursor(row_factory=tuple_row) as cursor:
+                await cursor.execute('SELECT user_id, total_xp FROM users')
+                return dict(await cursor.fetchall())
+
+    async def get_user_rank(self, user_id: int) -> Optional[Dict]:
+        """유저 한 명의 정확한 순위, 바로 위/아래 이웃, 다음 순위까지 필요한 XP (등록되지 않은 유저는 None)"""
+        async with self.connection() as conn:
+            cursor = await conn.execute(USER_RANK_SQL, {'user_id': user_id})
+            return build_user_rank(await cursor.fetchone())
+
+    def get_user_tier(self, total_xp: int) -> int:
+        """XP에 따른 티어 계산 (DB 조회 없음)"""
+        return tier_for_xp(total_xp)
+
+    async def get_pending_submissions(self) -> List[Dict]:
+        """대기 중인 제출 목록 (오래된 순 전체)"""
+        return [row async for row in self.iter_submissions(status='pending')]
+
+    async def get_pending_submissions_page(
+        self, after: Optional[Tuple[datetime, int]] = None, limit: int = 200, reverse: bool = False
+    ) -> List[Dict]:
+        """대기 중인 제출 한 페이지. after는 직전 페이지 마지막 행의 (submitted_at, submission_id).
+
+        reverse면 after 이전 행을 가까운 순으로 (이전 페이지용).
+        """
+        return await self._fetch_submissions(
+            *submissions_query(status='pending', after=after, limit=limit, newest_first=reverse)
+        )
+
+    async def set_admin_message(self, submission_id: int, channel_id: int, message_id: int) -> None:
+        """관리자 채널에 올린 티켓 메시지 위치 기록"""
+        async with self.connection() as conn:
+            await conn.execute('''
+                UPDATE submissions SET admin_channel_id = %s, admin_message_id = %s
+                WHERE submission_id = %s
+            ''', (channel_id, message_id, submission_id))
+
+    async def enqueue_admin_tickets(self, submission_ids: List[int]) -> int:
+        """누락된 관리자 티켓을 아웃박스에 다시 예약. 예약한 수 반환."""
+        if not submission_ids:
+            return 0
+        async with self.connection() as conn:
+            cursor = await conn.execute(ENQUEUE_ADMIN_TICKETS_SQL, (submission_ids,))
+            return cursor.rowcount
+
+    async def get_xp_logs(self, user_id: int, limit: int = 15) -> List[Dict]:
+        """사용자의 XP 획득 이력 조회 (최신순)"""
+        async with self.connection() as conn:
+            cursor = await conn.execute(
+                '''
+                SELECT mission_name, xp_amount, created_at
+                FROM xp_logs
+                WHERE user_id = %s
+                ORDER BY created_at DESC
+                LIMIT %s
+                ''',
+                (user_id, limit),
+            )
+            return await cursor.fetchall()
+
+    async def copy_export(self, out, table: str, fmt: str = 'csv', since: Optional[datetime] = None,
+                          until: Optional[datetime] = None, user_id: Optional[int] = None) -> int:
+        """테이블을 COPY ... TO STDOUT으로 out(바이너리 파일 객체)에 흘려 씀. 내보낸 행 수 반환.
+
+        데이터는 COPY 메시지 단위로 받아 바로 쓰므로 테이블 크기와 관계없이 메모리가 일정하다.
+        """
+        sql, params = export_copy_query(table, fmt, since, until, user_id)
+        async with self.connection() as conn:
+            async with conn.cursor() as cursor:
+                async with cursor.copy(sql, params or None) as copy:
+                    async for data in copy:
+                        out.write(data)
+                return cursor.rowcount
+
+    async def get_users_page(
+        self, after: Optional[Tuple[int, int]] = None, limit: int = 25, reverse: bool = False
+    ) -> List[Dict]:
+        """수동 롤 부여용 유저 목록 한 페이지 (total_xp 내림차순).
+
+        after는 직전 페이지 마지막 행의 (total_xp, user_id). reverse면 after 이전 행을 가까운 순으로.
+        """
+        async with self.connection() as conn:
+            cursor = await conn.execute(*users_page_query(after, limit, reverse))
+            rows = await cursor.fetchall()
+        fill_missing_tiers(rows)
+        return rows
+
+    async def sync_all_users_tier(self) -> int:
+        """total_xp와 어긋난 tier, tier_name을 UPDATE 한 번으로 동기화. 바로잡은 행 수 반환."""
+        async with self.connection() as conn:
+            try:
+                cursor = await conn.execute(SYNC_ALL_TIERS_SQL)
+                fixed = cursor.rowcount
+            except Exception as e:
+                await conn.rollback()
+                print(f"❌ sync_all_users_tier 오류: {e}")
+                return 0
+        if fixed:
+            # 어떤 행이 바뀌었는지 모르므로 전체 무효화
+            self._user_cache.clear()
+        return fixed
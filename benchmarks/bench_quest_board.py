@@ -0,0 +1,179 @@
+"""/sz 퀘스트 보드 1회 렌더당 DB 쿼리 수 회귀 벤치마크.
+
+봇이 실제로 쓰는 AsyncDatabase.get_quest_board_data와, 쿼리 통합 이전 구현
+(get_or_create_user → get_rejected_submissions → 미션별 is_quest_completed /
+get_approved_count 를 호출마다 연결을 빌려 submissions / completed_quests에서 직접 집계)의
+SQL을 그대로 옮긴 기준 경로를 같은 유저·같은 풀로 실행하고, 렌더 1회당 실행된 SQL 문 수,
+풀 체크아웃 수, 소요 시간을 비교한다. 현재 구현이 1쿼리를 넘으면 종료 코드 1로 실패한다.
+
+사용법 (DATABASE_URL 필요):
+    python benchmarks/bench_quest_board.py [--user-id 123] [--renders 20]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_database import AsyncDatabase  # noqa: E402
+from database import QUEST_INFO  # noqa: E402
+
+MAX_BOARD_QUERIES = 1
+
+
+class CountingCursor(psycopg.AsyncCursor):
+    """execute 호출 수를 세는 커서 (conn.execute도 이 커서를 거친다)"""
+    executed = 0
+
+    async def execute(self, query, params=None, **kwargs):
+        CountingCursor.executed += 1
+        return await super().execute(query, params, **kwargs)
+
+
+# ---- 쿼리 통합 이전 구현 (user-005 이전 database.py의 SQL을 그대로 옮김) ----
+
+async def legacy_get_user(db: AsyncDatabase, user_id: int):
+    async with db.connection() as conn:
+        cursor = await conn.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
+        return await cursor.fetchone()
+
+
+async def legacy_register_user(db: AsyncDatabase, user_id: int) -> None:
+    async with db.connection() as conn:
+        await conn.execute('''
+            INSERT INTO users (user_id, tier, tier_name)
+            VALUES (%s, 1, 'Code SZ')
+            ON CONFLICT (user_id) DO NOTHING
+        ''', (user_id,))
+
+
+async def legacy_get_or_create_user(db: AsyncDatabase, user_id: int):
+    user = await legacy_get_user(db, user_id)
+    if not user:
+        await legacy_register_user(db, user_id)
+        user = await legacy_get_user(db, user_id)
+    return user
+
+
+async def legacy_get_rejected_submissions(db: AsyncDatabase, user_id: int):
+    async with db.connection() as conn:
+        cursor = await conn.execute('''
+            SELECT * FROM submissions
+            WHERE user_id = %s AND status = 'rejected'
+            ORDER BY submitted_at DESC
+        ''', (user_id,))
+        return await cursor.fetchall()
+
+
+async def legacy_get_approved_count(db: AsyncDatabase, user_id: int, mission_code: str) -> int:
+    async with db.connection() as conn:
+        cursor = await conn.execute('''
+            SELECT COUNT(*) AS count FROM submissions
+            WHERE user_id = %s AND mission_code = %s AND status = 'approved'
+        ''', (user_id, mission_code))
+        return (await cursor.fetchone())['count']
+
+
+async def legacy_is_quest_completed(db: AsyncDatabase, user_id: int, mission_code: str) -> bool:
+    async with db.connection() as conn:
+        cursor = await conn.execute('''
+            SELECT COUNT(*) AS count FROM completed_quests
+            WHERE user_id = %s AND mission_code = %s
+        ''', (user_id, mission_code))
+        return (await cursor.fetchone())['count'] > 0
+
+
+async def legacy_board(db: AsyncDatabase, user_id: int) -> dict:
+    """쿼리 통합 이전의 get_quest_board_data 구현"""
+    user = await legacy_get_or_create_user(db, user_id)
+    rejected_submissions = await legacy_get_rejected_submissions(db, user_id)
+    one_time, repeatable, milestone = {}, {}, {}
+    for code, info in QUEST_INFO.items():
+        if info['type'] == 'one-time':
+            one_time[code] = await legacy_is_quest_completed(db, user_id, code)
+        elif info['type'] == 'repeatable':
+            repeatable[code] = await legacy_get_approved_count(db, user_id, code)
+        elif info['type'] == 'milestone':
+            milestone[code] = {
+                'completed': await legacy_is_quest_completed(db, user_id, code),
+                'count_b': await legacy_get_approved_count(db, user_id, 'B') if code in ('D', 'E') else 0,
+                'count_c': await legacy_get_approved_count(db, user_id, 'C') if code in ('F', 'G') else 0,
+            }
+    return {
+        'user': user,
+        'rejected_submissions': rejected_submissions,
+        'one_time': one_time,
+        'repeatable': repeatable,
+        'milestone': milestone,
+    }
+
+
+async def current_board(db: AsyncDatabase, user_id: int) -> dict:
+    return await db.get_quest_board_data(user_id)
+
+
+async def measure(db: AsyncDatabase, render, user_id: int, renders: int) -> dict:
+    await render(db, user_id)  # 워밍업 (유저 생성, 연결 확보)
+    CountingCursor.executed = 0
+    checkouts_before = db.pool_stats().get('requests_num', 0)
+    started = time.perf_counter()
+    for _ in range(renders):
+        await render(db, user_id)
+    elapsed = time.perf_counter() - started
+    return {
+        'queries': CountingCursor.executed / renders,
+        'checkouts': (db.pool_stats().get('requests_num', 0) - checkouts_before) / renders,
+        'ms': elapsed * 1000 / renders,
+    }
+
+
+async def run(user_id: int, renders: int) -> dict:
+    db = AsyncDatabase()
+    # 봇과 같은 풀 설정에 쿼리 수를 세는 커서만 끼움
+    db.pool = AsyncConnectionPool(
+        db.connection_string,
+        min_size=1,
+        max_size=2,
+        kwargs={'row_factory': dict_row, 'cursor_factory': CountingCursor},
+        open=False,
+    )
+    await db.open()
+    await db.ensure_schema()
+    try:
+        return {
+            'legacy': await measure(db, legacy_board, user_id, renders),
+            'current': await measure(db, current_board, user_id, renders),
+        }
+    finally:
+        await db.close()
+
+
+def main() -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user-id', type=int, default=1)
+    parser.add_argument('--renders', type=int, default=20)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.user_id, args.renders))
+
+    print(f"{'path':<8} | {'queries/render':>14} | {'checkouts/render':>16} | {'ms/render':>9}")
+    for name, r in results.items():
+        print(f"{name:<8} | {r['queries']:>14.1f} | {r['checkouts']:>16.1f} | {r['ms']:>9.2f}")
+
+    if results['current']['queries'] > MAX_BOARD_QUERIES:
+        print(f"❌ 보드 렌더당 쿼리 수가 {MAX_BOARD_QUERIES}회를 넘었습니다.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+def approx_size(value: Any) -> int:
+    """값의 대략적인 메모리 사용량(바이트). dict/list/tuple/set은 안쪽 항목까지 합산."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+
+class TTLCache:
+    """크기 제한 LRU + TTL 캐시 (적중/미스 통계 포함).
+
+    가득 차면 가장 오래 사용하지 않은 항목부터 내보내고, 만료된 항목은 조회 시점에 제거한다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        if maxsize < 1:
+            raise ValueError(f"maxsize는 1 이상이어야 합니다. maxsize={maxsize}")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """캐시 조회 (없거나 만료됐으면 default)"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """캐시 저장 (ttl 생략 시 기본 TTL)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """항목 제거 후 값 반환 (무효화용)"""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key, _MISSING)
+        return entry is not _MISSING and entry[1] > time.monotonic()
+
+    def approx_bytes(self) -> int:
+        """캐시가 들고 있는 키/값의 대략적인 메모리 사용량 (순수 데이터 값에만 의미 있음)"""
+        with self._lock:
+            entries = list(self._data.items())
+        return sys.getsizeof(self._data) + sum(approx_size(key) + approx_size(value[0]) for key, value in entries)
+
+    def stats(self) -> Dict:
+        """크기와 누적 적중/미스 카운터"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
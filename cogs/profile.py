@@ -1,25 +1,31 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from database import Database, QUEST_INFO, TIER_SYSTEM
-import asyncio
+from async_database import AsyncDatabase
+from database import QUEST_INFO, TIER_SYSTEM
+from services.command_sync import sync_command_tree
+from services.export import UPLOAD_MARGIN, export_filename, export_to_gzip, parse_date_range, split_file
+from services.pagination import KeysetPager, PageButton, register_pager, send_first_page
 import logging
+import os
 from datetime import datetime
+from typing import Literal, Optional
 
 logger = logging.getLogger(__name__)
 
 class ProfileCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = Database()
+        self.db: AsyncDatabase = bot.db
     
     @app_commands.command(name="ranking", description="View the Spot Zero agent leaderboard")
     async def ranking(self, interaction: discord.Interaction):
         """랭킹 보드 표시 (Cyberpunk Hall of Fame 스타일)"""
         await interaction.response.defer()
 
+        cache = self.bot.leaderboard_cache
         try:
-            leaderboard = await asyncio.to_thread(self.db.get_leaderboard, 10)
+            leaderboard = await cache.get_top()
         except Exception as e:
             logger.error(
                 "ranking 리더보드 조회 실패 user_id=%s error=%s",
@@ -37,6 +43,70 @@ class ProfileCog(commands.Cog):
             await interaction.followup.send("No leaderboard data available.", ephemeral=True)
             return
 
+        guild_id = interaction.guild.id if interaction.guild else None
+        embed = cache.get_embed(guild_id)
+        if embed is None:
+            embed = await self._build_leaderboard_embed(interaction, leaderboard)
+            cache.set_embed(guild_id, embed, leaderboard)
+        
+        # 사용자 자신의 순위 (10위 밖이면 표시)
+        user_in_top_10 = any(entry['user_id'] == interaction.user.id for entry in leaderboard[:10])
+
+        if not user_in_top_10:
+            try:
+                my_rank = await cache.get_user_rank(interaction.user.id)
+            except Exception as e:
+                logger.warning(
+                    "ranking 본인 순위 조회 실패 user_id=%s error=%s",
+                    interaction.user.id,
+                    e,
+                )
+                my_rank = None
+            
+            if my_rank:
+                user_xp = my_rank['total_xp']
+                tier = self.db.get_user_tier(user_xp)
+                tier_info = TIER_SYSTEM[tier]
+                
+                value = (
+                    f"> **#{my_rank['rank']}** | **{interaction.user.display_name}**\n"
+                    f"> `[{tier_info['name']}] • {user_xp:,} XP`"
+                )
+                if my_rank['xp_to_next_rank']:
+                    value += f"\n> `{my_rank['xp_to_next_rank']:,} XP to #{my_rank['rank'] - 1}`"
+                embed.add_field(
+                    name="━━━━━━━━━━━━━━━━━━━━",
+                    value=value,
+                    inline=False
+                )
+        
+        embed.set_footer(text="Complete more missions to climb the ranks!")
+
+        try:
+            await interaction.followup.send(embed=embed)
+        except Exception as e:
+            logger.exception(
+                "ranking 응답 전송 실패 user_id=%s error=%s",
+                interaction.user.id,
+                e,
+            )
+            try:
+                await interaction.followup.send(
+                    "❌ 랭킹을 표시하는 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
+                    ephemeral=True,
+                )
+            except Exception:
+                pass
+        return
+
+    async def _build_leaderboard_embed(self, interaction: discord.Interaction, leaderboard: list) -> discord.Embed:
+        """상위 10명 임베드 생성 (유저별 순위 필드는 호출 측에서 추가)"""
+        # 표시 이름은 캐시 → 게이트웨이 일괄 조회 → REST 순으로 한 번에 해석
+        names = await self.bot.user_resolver.display_names(
+            [entry['user_id'] for entry in leaderboard[:10]],
+            interaction.guild,
+        )
+        
         embed = discord.Embed(
             title="🏆 Spot Zero: Agent Leaderboard",
             description="> Top agents ranked by clearance level and mission completion.",
@@ -59,11 +129,7 @@ class ProfileCog(commands.Cog):
             tier = self.db.get_user_tier(total_xp)
             tier_info = TIER_SYSTEM[tier]
             
-            try:
-                user = await self.bot.fetch_user(user_id)
-                username = user.display_name
-            except:
-                username = f"User {user_id}"
+            username = names[user_id]
             
             top3_text += (
                 f"> **{medals[idx]} {place_names[idx]}** | **{username}**\n"
@@ -87,11 +153,7 @@ class ProfileCog(commands.Cog):
                 tier = self.db.get_user_tier(total_xp)
                 tier_info = TIER_SYSTEM[tier]
                 
-                try:
-                    user = await self.bot.fetch_user(user_id)
-                    username = user.display_name.replace('`', '')  # Code block 내 특수문자 제거
-                except:
-                    username = f"User_{user_id}"
+                username = names[user_id].replace('`', '')  # Code block 내 특수문자 제거
                 
                 rank_num = idx + 1
                 code_block_text += f"#{rank_num:02d} | {total_xp:>6,} XP | {username}\n"
@@ -103,69 +165,16 @@ class ProfileCog(commands.Cog):
                     inline=False
                 )
         
-        # 사용자 자신의 순위 (10위 밖이면 표시)
-        user_in_top_10 = any(entry['user_id'] == interaction.user.id for entry in leaderboard[:10])
-
-        if not user_in_top_10:
-            try:
-                all_users = await asyncio.to_thread(self.db.get_leaderboard, 1000)
-            except Exception as e:
-                logger.warning(
-                    "ranking 본인 순위 조회 실패 user_id=%s error=%s",
-                    interaction.user.id,
-                    e,
-                )
-                all_users = []
-            user_rank = None
-            user_xp = None
-
-            for idx, entry in enumerate(all_users, 1):
-                if entry['user_id'] == interaction.user.id:
-                    user_rank = idx
-                    user_xp = entry['total_xp']
-                    break
-            
-            if user_rank:
-                tier = self.db.get_user_tier(user_xp)
-                tier_info = TIER_SYSTEM[tier]
-                
-                embed.add_field(
-                    name="━━━━━━━━━━━━━━━━━━━━",
-                    value=(
-                        f"> **#{user_rank}** | **{interaction.user.display_name}**\n"
-                        f"> `[{tier_info['name']}] • {user_xp:,} XP`"
-                    ),
-                    inline=False
-                )
-        
-        embed.set_footer(text="Complete more missions to climb the ranks!")
-
-        try:
-            await interaction.followup.send(embed=embed)
-        except Exception as e:
-            logger.exception(
-                "ranking 응답 전송 실패 user_id=%s error=%s",
-                interaction.user.id,
-                e,
-            )
-            try:
-                await interaction.followup.send(
-                    "❌ 랭킹을 표시하는 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요.",
-                    ephemeral=True,
-                )
-            except Exception:
-                pass
-        return
+        return embed
 
     @app_commands.command(name="log", description="View your recent XP acquisition history")
     async def log(self, interaction: discord.Interaction):
         """XP 획득 이력 표시"""
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        # psycopg2는 blocking이므로 thread로 분리
         try:
-            user = await asyncio.to_thread(self.db.get_or_create_user, interaction.user.id)
-            xp_logs = await asyncio.to_thread(self.db.get_xp_logs, interaction.user.id, 15)
+            user = await self.db.get_or_create_user(interaction.user.id)
+            xp_logs = await self.db.get_xp_logs(interaction.user.id, 15)
         except Exception as e:
             logger.error(
                 "log XP 이력 조회 실패 user_id=%s error=%s",
@@ -212,10 +221,10 @@ class ProfileCog(commands.Cog):
     @app_commands.command(name="users_tier", description="[Admin] List users with XP and tier for manual role assignment")
     @app_commands.checks.has_permissions(administrator=True)
     async def users_tier(self, interaction: discord.Interaction):
-        """관리자 전용: user_id, total_xp, tier, tier_name 목록 (수동 롤 부여용)"""
+        """관리자 전용: user_id, total_xp, tier, tier_name 목록 (수동 롤 부여용, 페이지 단위)"""
         await interaction.response.defer(ephemeral=True)
         try:
-            rows = await asyncio.to_thread(self.db.get_users_for_role_audit)
+            await send_first_page(interaction, USERS_TIER)
         except Exception as e:
             logger.error(
                 "users_tier 조회 실패 user_id=%s error=%s",
@@ -224,26 +233,137 @@ class ProfileCog(commands.Cog):
                 exc_info=True,
             )
             await interaction.followup.send(f"❌ 조회 실패: {e}", ephemeral=True)
+
+    @app_commands.command(name="cache_stats", description="[Admin] Show cache hit/miss counters and DB pool stats")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def cache_stats(self, interaction: discord.Interaction):
+        """관리자 전용: 캐시 적중/미스 및 DB 연결 풀 상태"""
+        sections = {
+            'leaderboard': self.bot.leaderboard_cache.stats(),
+            'user_cache': self.db.user_cache_stats(),
+            'user_resolver': self.bot.user_resolver.stats(),
+            'tier_roles': self.bot.tier_roles.stats(),
+            'role_scheduler': self.bot.role_scheduler.stats(),
+            'role_sync': self.bot.role_sync.stats(),
+            'outbox': {**self.bot.outbox.stats(), **await self.db.get_outbox_counts()},
+            'db_pool': self.db.pool_stats(),
+        }
+        embed = discord.Embed(title="📈 Cache / Pool Stats", color=discord.Color.blue())
+        for name, stats in sections.items():
+            lines = [f"{key}: {value}" for key, value in stats.items()]
+            embed.add_field(name=name, value="```\n" + "\n".join(lines)[:1000] + "\n```", inline=False)
+        problems = self.bot.tier_roles.problems(interaction.guild) if interaction.guild else []
+        if problems:
+            embed.add_field(name="⚠️ tier_role_problems", value="\n".join(problems)[:1000], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+    @app_commands.command(name="export", description="[Admin] Export a table as a gzip-compressed CSV/JSONL file")
+    @app_commands.describe(
+        table="내보낼 테이블",
+        format="csv 또는 jsonl",
+        since="시작일 (YYYY-MM-DD, 포함)",
+        until="종료일 (YYYY-MM-DD, 포함)",
+        user="특정 유저만",
+    )
+    @app_commands.checks.has_permissions(administrator=True)
+    async def export(
+        self,
+        interaction: discord.Interaction,
+        table: Literal['submissions', 'xp_logs', 'users'],
+        format: Literal['csv', 'jsonl'] = 'csv',
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        user: Optional[discord.User] = None,
+    ):
+        """관리자 전용: COPY 스트림을 gzip 파일로 받아 첨부 (업로드 한도를 넘으면 조각으로 나눠 전송)"""
+        try:
+            start, end = parse_date_range(since, until)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ 날짜 형식 오류 (YYYY-MM-DD): {e}", ephemeral=True)
             return
-        if not rows:
-            await interaction.followup.send("등록된 유저가 없습니다.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+
+        paths = []
+        try:
+            path, rows = await export_to_gzip(self.db, table, format, start, end, user.id if user else None)
+            paths.append(path)
+            limit = (interaction.guild.filesize_limit if interaction.guild else 10 * 1024 * 1024) - UPLOAD_MARGIN
+            parts = split_file(path, limit)
+            paths.extend(p for p in parts if p != path)
+
+            filename = export_filename(table, format)
+            summary = f"✅ `{table}` {rows:,}행 내보내기 완료 ({os.path.getsize(path) / 1024:,.1f} KiB, gzip)"
+            if len(parts) == 1:
+                await interaction.followup.send(summary, file=discord.File(path, filename=filename), ephemeral=True)
+                return
+            await interaction.followup.send(
+                f"{summary}\n업로드 한도를 넘어 {len(parts)}개 조각으로 나눠 보냅니다. "
+                f"`cat {filename}.part* > {filename}` 으로 합치세요.",
+                ephemeral=True,
+            )
+            for index, part in enumerate(parts, 1):
+                await interaction.followup.send(
+                    file=discord.File(part, filename=f"{filename}.part{index:03d}"), ephemeral=True
+                )
+        except Exception as e:
+            logger.error("export 실패 table=%s user_id=%s error=%s", table, interaction.user.id, e, exc_info=True)
+            await interaction.followup.send(f"❌ 내보내기 실패: {e}", ephemeral=True)
+        finally:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @app_commands.command(name="sync_commands", description="[Admin] Force re-sync of slash commands with Discord")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def sync_commands(self, interaction: discord.Interaction):
+        """관리자 전용: 트리 해시와 관계없이 슬래시 명령어 강제 동기화"""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            synced = await sync_command_tree(self.bot, force=True)
+        except Exception as e:
+            logger.error("명령어 강제 동기화 실패 user_id=%s error=%s", interaction.user.id, e, exc_info=True)
+            await interaction.followup.send(f"❌ 동기화 실패: {e}", ephemeral=True)
             return
-        lines = ["user_id       | total_xp | tier | tier_name", "--------------+----------+------+------------------"]
-        for r in rows[:40]:
-            tier = r.get('tier') if r.get('tier') is not None else '?'
-            tier_name = r.get('tier_name') or '-'
-            lines.append(f"{r['user_id']:<13} | {r['total_xp']:>8} | Lv.{tier} | {tier_name}")
-        text = "```\n" + "\n".join(lines) + "\n```"
-        if len(rows) > 40:
-            text += f"\n*(상위 40명만 표시, 전체 {len(rows)}명)*"
+        await interaction.followup.send(f"✅ 슬래시 명령어 {synced}개를 동기화했습니다.", ephemeral=True)
+
+
+class UsersTierPager(KeysetPager):
+    """/users_tier: 유저 목록 (total_xp 내림차순)"""
+    kind = 'users_tier'
+    page_size = 25
+
+    async def fetch(self, bot, after, limit, reverse):
+        return await bot.db.get_users_page(after, limit, reverse)
+
+    def cursor(self, row):
+        return row['total_xp'], row['user_id']
+
+    def render(self, rows, has_prev, has_next):
+        if rows:
+            lines = ["user_id       | total_xp | tier | tier_name", "--------------+----------+------+------------------"]
+            for r in rows:
+                tier = r.get('tier') if r.get('tier') is not None else '?'
+                tier_name = r.get('tier_name') or '-'
+                lines.append(f"{r['user_id']:<13} | {r['total_xp']:>8} | Lv.{tier} | {tier_name}")
+            text = "```\n" + "\n".join(lines) + "\n```"
+        else:
+            text = "등록된 유저가 없습니다."
         embed = discord.Embed(
             title="📋 Users × Tier (수동 롤 부여 참고)",
             description=text,
             color=discord.Color.blue(),
         )
         embed.set_footer(text="롤이 자동 부여되지 않은 유저는 위 tier_name에 맞는 역할을 수동으로 부여하세요.")
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        return embed
+
+
+USERS_TIER = UsersTierPager()
 
 
 async def setup(bot: commands.Bot):
+    bot.add_dynamic_items(PageButton)
+    register_pager(USERS_TIER)
     await bot.add_cog(ProfileCog(bot))
@@ -2,9 +2,13 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ui import Modal, Select, View
-from database import Database, QUEST_INFO, TIER_SYSTEM
+from async_database import AsyncDatabase
+from database import QUEST_INFO, TIER_SYSTEM, UserSnapshot
+from services.pagination import KeysetPager, PageButton, refresh_page, register_pager, send_first_page
+from services.ticket_resync import SUBMISSION_ID_FIELD, admin_channel_id
+from datetime import datetime, timedelta
+from typing import Optional
 import os
-import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,15 +30,15 @@ def draw_progress_bar(current_xp: int, target_xp: int, bar_length: int = 10) ->
 class QuestsCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = Database()
+        self.db: AsyncDatabase = bot.db
     
     @app_commands.command(name="sz", description="Open your Agent Status Board and submit quest proof")
     async def sz(self, interaction: discord.Interaction):
-        """퀘스트 보드 표시 및 제출 모달 (Sci-Fi RPG 스타일). DB 조회는 스레드에서 수행해 이벤트 루프 블로킹 방지."""
+        """퀘스트 보드 표시 및 제출 모달 (Sci-Fi RPG 스타일)"""
         await interaction.response.defer(ephemeral=True)
 
         try:
-            data = await asyncio.to_thread(self.db.get_quest_board_data, interaction.user.id)
+            data = await self.db.get_quest_board_data(interaction.user.id)
         except Exception as e:
             logger.error(
                 "sz 보드 데이터 조회 실패 user_id=%s error=%s",
@@ -49,7 +53,6 @@ class QuestsCog(commands.Cog):
             return
 
         user = data['user']
-        # rejected_submissions는 보드에 표시하지 않지만 추후 확장용으로 반환됨
 
         # Sci-Fi RPG 스타일 임베드
         embed = discord.Embed(
@@ -157,15 +160,29 @@ class QuestsCog(commands.Cog):
         guild_icon = interaction.guild.icon.url if interaction.guild and interaction.guild.icon else None
         embed.set_footer(text="Select a mission below to submit proof.", icon_url=guild_icon)
 
-        view = QuestSelectView(interaction.user.id, self.db, self.bot)
+        # 보드 조회 결과를 스냅샷으로 고정해 선택/모달 단계에서 다시 조회하지 않음
+        snapshot = UserSnapshot.from_board(data)
+        view = QuestSelectView(snapshot, self.db, self.bot)
         await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
+    @app_commands.command(name="queue", description="[Admin] Review pending submissions page by page")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def queue(self, interaction: discord.Interaction):
+        """관리자 전용: 대기 중 제출을 페이지 단위로 보고 바로 승인/거부"""
+        await interaction.response.defer(ephemeral=True)
+        try:
+            await send_first_page(interaction, PENDING_QUEUE)
+        except Exception as e:
+            logger.error("queue 조회 실패 user_id=%s error=%s", interaction.user.id, e, exc_info=True)
+            await interaction.followup.send(f"❌ 조회 실패: {e}", ephemeral=True)
+
 
 class QuestSelectView(View):
     """퀘스트 선택 드롭다운 메뉴가 포함된 View"""
-    def __init__(self, user_id: int, db: Database, bot: commands.Bot):
+    def __init__(self, snapshot: UserSnapshot, db: AsyncDatabase, bot: commands.Bot):
         super().__init__(timeout=300)  # 5분 타임아웃
-        self.user_id = user_id
+        self.snapshot = snapshot
+        self.user_id = snapshot.user_id
         self.db = db
         self.bot = bot
         
@@ -175,7 +192,7 @@ class QuestSelectView(View):
             if info['type'] in ['one-time', 'repeatable']:
                 # 원타임 퀘스트는 완료하지 않은 것만
                 if info['type'] == 'one-time':
-                    if not self.db.is_quest_completed(user_id, code):
+                    if not snapshot.has_completed(code):
                         available_quests.append((code, info))
                 else:
                     # 반복 가능한 퀘스트는 항상 제출 가능
@@ -208,6 +225,7 @@ class QuestSelectView(View):
             self.quest_select = QuestSelect(
                 placeholder="제출할 퀘스트를 선택하세요",
                 options=select_options,
+                snapshot=snapshot,
                 db=self.db,
                 bot=self.bot
             )
@@ -221,8 +239,9 @@ class QuestSelectView(View):
 
 class QuestSelect(Select):
     """퀘스트 선택 드롭다운"""
-    def __init__(self, placeholder: str, options: list, db: Database, bot: commands.Bot):
+    def __init__(self, placeholder: str, options: list, snapshot: UserSnapshot, db: AsyncDatabase, bot: commands.Bot):
         super().__init__(placeholder=placeholder, options=options, min_values=1, max_values=1)
+        self.snapshot = snapshot
         self.db = db
         self.bot = bot
     
@@ -238,9 +257,9 @@ class QuestSelect(Select):
             )
             return
         
-        # 원타임 퀘스트 중복 체크
+        # 원타임 퀘스트 중복 체크 (스냅샷 기준, 최종 확인은 제출 INSERT에서)
         if quest_info['type'] == 'one-time':
-            if self.db.is_quest_completed(interaction.user.id, selected_code):
+            if self.snapshot.has_completed(selected_code):
                 await interaction.response.send_message(
                     f"❌ {quest_info['name']}은(는) 이미 완료한 원타임 퀘스트입니다.",
                     ephemeral=True
@@ -248,13 +267,13 @@ class QuestSelect(Select):
                 return
         
         # 모달 열기
-        modal = SubmissionModal(selected_code, quest_info, self.db, self.bot)
+        modal = SubmissionModal(selected_code, quest_info, self.snapshot, self.db, self.bot)
         await interaction.response.send_modal(modal)
 
 
 class SubmissionModal(Modal):
     """퀘스트 제출 모달"""
-    def __init__(self, mission_code: str, quest_info: dict, db: Database, bot: commands.Bot):
+    def __init__(self, mission_code: str, quest_info: dict, snapshot: UserSnapshot, db: AsyncDatabase, bot: commands.Bot):
         # 모달 제목 설정
         quest_name = quest_info['name']
         if mission_code == 'A':
@@ -271,6 +290,7 @@ class SubmissionModal(Modal):
         super().__init__(title=title)
         self.mission_code = mission_code
         self.quest_info = quest_info
+        self.snapshot = snapshot
         self.db = db
         self.bot = bot
         
@@ -296,18 +316,17 @@ class SubmissionModal(Modal):
                 )
                 return
             
-            # 원타임 퀘스트 중복 체크 (한 번 더 확인)
-            if self.quest_info['type'] == 'one-time':
-                if self.db.is_quest_completed(interaction.user.id, self.mission_code):
-                    await interaction.response.send_message(
-                        f"❌ {self.quest_info['name']}은(는) 이미 완료한 원타임 퀘스트입니다.",
-                        ephemeral=True
-                    )
-                    return
+            # 원타임 퀘스트 중복 체크 (스냅샷 기준)
+            if self.quest_info['type'] == 'one-time' and self.snapshot.has_completed(self.mission_code):
+                await interaction.response.send_message(
+                    f"❌ {self.quest_info['name']}은(는) 이미 완료한 원타임 퀘스트입니다.",
+                    ephemeral=True
+                )
+                return
             
-            # 제출 생성
+            # 제출 생성 (완료 여부 최종 확인과 INSERT가 한 문장, 관리자 티켓은 같은 트랜잭션에서 아웃박스에 기록됨)
             try:
-                submission_id = self.db.create_submission(
+                submission_id = await self.db.create_submission(
                     interaction.user.id,
                     self.mission_code,
                     link
@@ -326,89 +345,21 @@ class SubmissionModal(Modal):
                 )
                 return
             
-            # 사용자에게 먼저 응답 (3초 이내 응답 필요)
+            if submission_id is None:
+                # 스냅샷 이후 다른 경로로 완료된 원타임 퀘스트
+                await interaction.response.send_message(
+                    f"❌ {self.quest_info['name']}은(는) 이미 완료한 원타임 퀘스트입니다.",
+                    ephemeral=True
+                )
+                return
+            
+            # 티켓 전송은 디스패처가 백그라운드에서 처리
+            self.bot.outbox.wake()
+            
             await interaction.response.send_message(
                 "✅ **Submission received!** Admins will review it soon.",
                 ephemeral=True
             )
-            
-            # 관리자 승인 채널로 전송 (응답 후 비동기로 처리)
-            try:
-                admin_channel_id_str = os.getenv('ADMIN_CHANNEL_ID', '0')
-                if not admin_channel_id_str or admin_channel_id_str == 'your_channel_id_here':
-                    logger.warning("ADMIN_CHANNEL_ID가 설정되지 않음. 제출 user_id=%s", interaction.user.id)
-                    # 관리자 채널이 없어도 제출은 성공했으므로 사용자에게는 성공 메시지 표시
-                    return
-                
-                admin_channel_id = int(admin_channel_id_str)
-                admin_channel = self.bot.get_channel(admin_channel_id)
-                
-                if not admin_channel:
-                    logger.warning(
-                        "관리자 채널을 찾을 수 없음 channel_id=%s 제출 user_id=%s",
-                        admin_channel_id,
-                        interaction.user.id,
-                    )
-                    # 채널을 찾지 못해도 제출은 성공했으므로 계속 진행
-                    return
-                
-                # Ticket 스타일 임베드 생성
-                embed = discord.Embed(
-                    title="🚨 New Quest Submission",
-                    color=discord.Color.orange(),  # Orange (Pending state)
-                    timestamp=discord.utils.utcnow()
-                )
-                
-                # 사용자 정보 (클릭 가능한 멘션)
-                user_mention = f"<@{interaction.user.id}>"
-                embed.add_field(
-                    name="👤 User",
-                    value=f"{user_mention}\nID: `{interaction.user.id}`",
-                    inline=True
-                )
-                
-                # 미션 정보
-                mission_label = f"Mission {self.mission_code}"
-                embed.add_field(
-                    name="🎯 Mission",
-                    value=f"**{mission_label}**\n{self.quest_info['name']}\n**Reward:** {self.quest_info['xp']} XP",
-                    inline=True
-                )
-                
-                # 증거 링크 (강조)
-                embed.add_field(
-                    name="🔗 Proof",
-                    value=f"[Click here]({link})\n`{link}`",
-                    inline=False
-                )
-                
-                # 제출 ID
-                embed.add_field(
-                    name="📋 Submission ID",
-                    value=f"`#{submission_id}`",
-                    inline=True
-                )
-                
-                embed.set_footer(text="Pending Review • Click a button below to process")
-                
-                view = AdminApprovalView(submission_id, self.db, self.bot)
-                await admin_channel.send(embed=embed, view=view)
-                
-            except ValueError:
-                logger.warning(
-                    "ADMIN_CHANNEL_ID 유효하지 않음 value=%s user_id=%s",
-                    admin_channel_id_str,
-                    interaction.user.id,
-                )
-            except Exception as e:
-                logger.error(
-                    "관리자 채널 전송 실패 user_id=%s submission_id=%s error=%s",
-                    interaction.user.id,
-                    submission_id,
-                    e,
-                    exc_info=True,
-                )
-                # 관리자 채널 전송 실패해도 제출은 성공했으므로 사용자에게는 성공 메시지 표시
         
         except Exception as e:
             logger.exception(
@@ -433,235 +384,248 @@ class SubmissionModal(Modal):
                     )
 
 
-class AdminApprovalView(discord.ui.View):
-    """관리자 승인/거부 버튼이 있는 View (Persistent)"""
-    def __init__(self, submission_id: int, db: Database, bot: commands.Bot):
-        super().__init__(timeout=None)  # Persistent View
-        self.submission_id = submission_id
-        self.db = db
-        self.bot = bot
-    
-    @discord.ui.button(label="✅ Approve", style=discord.ButtonStyle.green, custom_id="approve_btn")
-    async def approve_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """승인 버튼 처리"""
-        # 관리자 권한 체크
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                "❌ 관리자만 승인할 수 있습니다.",
+def closed_ticket_embed(original: discord.Embed, approved: bool, footer: str, extra_field=None) -> discord.Embed:
+    """처리 완료된 티켓 임베드 (원본 필드 복사 + 결과 필드 + 처리자)"""
+    embed = discord.Embed(
+        title="✅ Submission Approved" if approved else "❌ Submission Rejected",
+        color=0x00FF00 if approved else 0xFF0000,  # Green / Red
+        timestamp=original.timestamp
+    )
+    for field in original.fields:
+        embed.add_field(name=field.name, value=field.value, inline=field.inline)
+    if extra_field:
+        name, value = extra_field
+        embed.add_field(name=name, value=value, inline=False)
+    embed.set_footer(text=footer)
+    return embed
+
+
+def closed_ticket_view(approved: bool) -> discord.ui.View:
+    """버튼 비활성화된 View"""
+    view = discord.ui.View()
+    view.add_item(
+        discord.ui.Button(
+            label="✅ Approved" if approved else "✅ Approve",
+            style=discord.ButtonStyle.green,
+            disabled=True
+        )
+    )
+    view.add_item(
+        discord.ui.Button(
+            label="❌ Reject" if approved else "❌ Rejected",
+            style=discord.ButtonStyle.red,
+            disabled=True
+        )
+    )
+    return view
+
+
+async def fetch_ticket_message(bot: commands.Bot, submission_id: int):
+    """관리자 채널에 올라간 티켓 메시지 (기록이 없거나 지워졌으면 None)"""
+    submission = await bot.db.get_submission(submission_id)
+    if not submission or not submission.get('admin_message_id'):
+        return None
+    try:
+        channel = bot.get_channel(submission['admin_channel_id']) or await bot.fetch_channel(submission['admin_channel_id'])
+        return await channel.fetch_message(submission['admin_message_id'])
+    except discord.HTTPException as e:
+        logger.warning("티켓 메시지 조회 실패 submission_id=%s error=%s", submission_id, e)
+        return None
+
+
+async def close_ticket(interaction: discord.Interaction, submission_id: int, in_queue: bool, approved: bool, extra_field=None):
+    """티켓 메시지를 처리 완료 상태로 바꿈. 대기열에서 처리했으면 채널의 티켓을 찾아 바꾸고 대기열 페이지를 새로 그림."""
+    verb = "Approved" if approved else "Rejected"
+    message = await fetch_ticket_message(interaction.client, submission_id) if in_queue else interaction.message
+    if message is not None and message.embeds:
+        embed = closed_ticket_embed(
+            message.embeds[0], approved, f"{verb} by {interaction.user.display_name}", extra_field
+        )
+        await message.edit(embed=embed, view=closed_ticket_view(approved))
+    if in_queue:
+        await refresh_page(interaction, PENDING_QUEUE.kind)
+
+
+async def handle_approve(interaction: discord.Interaction, submission_id: int, in_queue: bool = False):
+    """승인 버튼 처리 (in_queue면 /queue 목록에서 누른 버튼)"""
+    bot = interaction.client
+    db: AsyncDatabase = bot.db
+
+    # 관리자 권한 체크
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message(
+            "❌ 관리자만 승인할 수 있습니다.",
+            ephemeral=True
+        )
+        return
+
+    # 응답 지연 (데이터베이스 작업 시간 확보)
+    await interaction.response.defer()
+
+    try:
+        # 데이터베이스에서 승인 처리 (결과에 유저/미션/마일스톤 정보가 모두 포함됨)
+        success, message, result = await db.approve_submission(submission_id)
+
+        if not success:
+            if in_queue:
+                # 이미 처리된 제출 등은 목록에서 빠지도록 다시 그림
+                await refresh_page(interaction, PENDING_QUEUE.kind)
+            await interaction.followup.send(
+                f"❌ 승인 처리 실패: {message}",
                 ephemeral=True
             )
             return
-        
-        # 응답 지연 (데이터베이스 작업 시간 확보)
-        await interaction.response.defer()
-        
-        try:
-            # 데이터베이스에서 승인 처리
-            success, message, milestone_rewards = self.db.approve_submission(self.submission_id)
-            
-            if not success:
-                await interaction.followup.send(
-                    f"❌ 승인 처리 실패: {message}",
-                    ephemeral=True
-                )
-                return
-            
-            # 제출 정보 조회
-            submission = self.db.get_submission(self.submission_id)
-            if not submission:
-                await interaction.followup.send(
-                    "❌ 제출 정보를 찾을 수 없습니다.",
-                    ephemeral=True
-                )
-                return
-            
-            user_id = submission['user_id']
-            mission_code = submission['mission_code']
-            quest_info = QUEST_INFO.get(mission_code)
-            
-            if not quest_info:
-                await interaction.followup.send(
-                    "❌ 유효하지 않은 미션 코드입니다.",
-                    ephemeral=True
-                )
-                return
-            
-            # 원본 임베드 가져오기
-            original_embed = interaction.message.embeds[0]
-            
-            # 승인된 임베드 생성
-            approved_embed = discord.Embed(
-                title="✅ Submission Approved",
-                color=0x00FF00,  # Green
-                timestamp=original_embed.timestamp
-            )
-            
-            # 원본 필드 복사 및 수정
-            for field in original_embed.fields:
-                approved_embed.add_field(
-                    name=field.name,
-                    value=field.value,
-                    inline=field.inline
-                )
-            
-            # 마일스톤 보상이 있다면 추가
-            if milestone_rewards:
-                milestone_text = "\n".join([
-                    f"🎯 **{QUEST_INFO[r['mission']]['name']}**: +{r['xp']} XP"
-                    for r in milestone_rewards
-                ])
-                approved_embed.add_field(
-                    name="🎉 Milestone Achieved!",
-                    value=milestone_text,
-                    inline=False
-                )
-            
-            # Footer에 승인자 정보 추가
-            approved_embed.set_footer(text=f"Approved by {interaction.user.display_name}")
-            
-            # 버튼 비활성화된 View 생성
-            disabled_view = discord.ui.View()
-            disabled_view.add_item(
-                discord.ui.Button(
-                    label="✅ Approved",
-                    style=discord.ButtonStyle.green,
-                    disabled=True
-                )
-            )
-            disabled_view.add_item(
-                discord.ui.Button(
-                    label="❌ Reject",
-                    style=discord.ButtonStyle.red,
-                    disabled=True
-                )
-            )
-            
-            # 메시지 수정
-            await interaction.message.edit(embed=approved_embed, view=disabled_view)
-            
-            # 사용자에게 DM 전송
-            try:
-                user = await self.bot.fetch_user(user_id)
-                dm_embed = discord.Embed(
-                    title="🎉 Submission Approved!",
-                    description=f"Your submission for **{quest_info['name']}** has been approved!",
-                    color=discord.Color.green()
-                )
-                dm_embed.add_field(
-                    name="XP Earned",
-                    value=f"+{quest_info['xp']} XP",
-                    inline=True
-                )
-                
-                # 마일스톤 보상이 있다면 추가
-                if milestone_rewards:
-                    total_milestone_xp = sum(r['xp'] for r in milestone_rewards)
-                    milestone_text = "\n".join([
-                        f"🎯 {QUEST_INFO[r['mission']]['name']}: +{r['xp']} XP"
-                        for r in milestone_rewards
-                    ])
-                    dm_embed.add_field(
-                        name="🎉 Milestone Achieved!",
-                        value=f"{milestone_text}\n\n**Total Bonus:** +{total_milestone_xp} XP",
-                        inline=False
-                    )
-                
-                await user.send(embed=dm_embed)
-            except Exception as e:
-                logger.error(
-                    "승인 알림 DM 전송 실패 user_id=%s submission_id=%s error=%s",
-                    user_id,
-                    self.submission_id,
-                    e,
-                    exc_info=True,
-                )
 
-            # 역할 업데이트
-            if interaction.guild:
-                await self._update_user_roles(user_id, interaction.guild)
-            
-            # 성공 메시지
+        user_id = result['user_id']
+        mission_code = result['mission_code']
+        milestone_rewards = result['milestones']
+        quest_info = QUEST_INFO.get(mission_code)
+
+        if not quest_info:
             await interaction.followup.send(
-                "✅ Submission approved successfully!",
+                "❌ 유효하지 않은 미션 코드입니다.",
                 ephemeral=True
             )
-            
-        except Exception as e:
-            logger.exception(
-                "승인 처리 중 오류 submission_id=%s admin_id=%s error=%s",
-                self.submission_id,
-                interaction.user.id,
-                e,
-            )
-            await interaction.followup.send(
-                f"❌ 승인 처리 중 오류가 발생했습니다: {str(e)}",
-                ephemeral=True
+            return
+
+        # 마일스톤 보상이 있다면 추가
+        milestone_field = None
+        if milestone_rewards:
+            milestone_text = "\n".join([
+                f"🎯 **{QUEST_INFO[r['mission']]['name']}**: +{r['xp']} XP"
+                for r in milestone_rewards
+            ])
+            milestone_field = ("🎉 Milestone Achieved!", milestone_text)
+
+        # 티켓 메시지 수정
+        await close_ticket(interaction, submission_id, in_queue, True, milestone_field)
+
+        # 유저 DM은 승인 트랜잭션에서 아웃박스에 기록됨 - 디스패처만 깨움
+        bot.outbox.wake()
+
+        # 역할 업데이트 (같은 유저의 연속 승인은 합쳐서 마지막 XP 기준으로 한 번만 반영)
+        if interaction.guild:
+            bot.role_sync.request(user_id, interaction.guild, total_xp=result['total_xp'])
+
+        # 성공 메시지
+        await interaction.followup.send(
+            "✅ Submission approved successfully!",
+            ephemeral=True
+        )
+
+    except Exception as e:
+        logger.exception(
+            "승인 처리 중 오류 submission_id=%s admin_id=%s error=%s",
+            submission_id,
+            interaction.user.id,
+            e,
+        )
+        await interaction.followup.send(
+            f"❌ 승인 처리 중 오류가 발생했습니다: {str(e)}",
+            ephemeral=True
+        )
+
+
+async def handle_reject(interaction: discord.Interaction, submission_id: int, in_queue: bool = False):
+    """거부 버튼 처리 (in_queue면 /queue 목록에서 누른 버튼)"""
+    bot = interaction.client
+
+    # 관리자 권한 체크
+    if not interaction.user.guild_permissions.administrator:
+        await interaction.response.send_message(
+            "❌ 관리자만 거부할 수 있습니다.",
+            ephemeral=True
+        )
+        return
+
+    # 반려 사유 입력 모달 표시
+    modal = RejectionReasonModal(submission_id, bot.db, bot, in_queue)
+    await interaction.response.send_modal(modal)
+
+
+class ApproveButton(discord.ui.DynamicItem[discord.ui.Button], template=r'sz:approve:(?P<submission_id>[0-9]+)(?P<queue>:q)?'):
+    """승인 버튼 (custom_id에 제출 ID를 담아 재시작 후에도 동작). 끝의 :q는 /queue 목록에서 누른 버튼."""
+    def __init__(self, submission_id: int, in_queue: bool = False, row: Optional[int] = None):
+        super().__init__(
+            discord.ui.Button(
+                label=f"✅ #{submission_id}" if in_queue else "✅ Approve",
+                style=discord.ButtonStyle.green,
+                custom_id=f"sz:approve:{submission_id}" + (":q" if in_queue else ""),
+                row=row,
             )
-    
-    @discord.ui.button(label="❌ Reject", style=discord.ButtonStyle.red, custom_id="reject_btn")
-    async def reject_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """거부 버튼 처리"""
-        # 관리자 권한 체크
-        if not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                "❌ 관리자만 거부할 수 있습니다.",
-                ephemeral=True
+        )
+        self.submission_id = submission_id
+        self.in_queue = in_queue
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match['submission_id']), in_queue=match['queue'] is not None)
+
+    async def callback(self, interaction: discord.Interaction):
+        await handle_approve(interaction, self.submission_id, self.in_queue)
+
+
+class RejectButton(discord.ui.DynamicItem[discord.ui.Button], template=r'sz:reject:(?P<submission_id>[0-9]+)(?P<queue>:q)?'):
+    """거부 버튼 (custom_id에 제출 ID를 담아 재시작 후에도 동작). 끝의 :q는 /queue 목록에서 누른 버튼."""
+    def __init__(self, submission_id: int, in_queue: bool = False, row: Optional[int] = None):
+        super().__init__(
+            discord.ui.Button(
+                label=f"❌ #{submission_id}" if in_queue else "❌ Reject",
+                style=discord.ButtonStyle.red,
+                custom_id=f"sz:reject:{submission_id}" + (":q" if in_queue else ""),
+                row=row,
             )
-            return
-        
-        # 반려 사유 입력 모달 표시
-        modal = RejectionReasonModal(self.submission_id, self.db, self.bot)
-        await interaction.response.send_modal(modal)
-    
-    async def _update_user_roles(self, user_id: int, guild: discord.Guild):
-        """사용자 역할 업데이트"""
-        user = self.db.get_user(user_id)
-        if not user:
-            return
-        
-        member = guild.get_member(user_id)
-        if not member:
-            return
-        
-        total_xp = user['total_xp']
-        current_tier = self.db.get_user_tier(total_xp)
-        
-        # 모든 티어 역할 찾기
-        tier_roles = {}
-        for tier_level, tier_info in TIER_SYSTEM.items():
-            role = discord.utils.get(guild.roles, name=tier_info['role_name'])
-            if role:
-                tier_roles[tier_level] = role
-        
-        # 현재 티어 이하의 모든 역할 부여
-        roles_to_add = []
-        for tier_level in range(1, current_tier + 1):
-            if tier_level in tier_roles:
-                roles_to_add.append(tier_roles[tier_level])
-        
-        # 역할 추가 (없는 것만)
-        for role in roles_to_add:
-            if role not in member.roles:
-                try:
-                    await member.add_roles(role, reason=f"티어 업그레이드: Lv.{current_tier}")
-                except:
-                    pass
-        
-        # 현재 티어보다 높은 역할 제거
-        for tier_level in range(current_tier + 1, 6):
-            if tier_level in tier_roles:
-                role = tier_roles[tier_level]
-                if role in member.roles:
-                    try:
-                        await member.remove_roles(role, reason=f"티어 다운그레이드")
-                    except:
-                        pass
+        )
+        self.submission_id = submission_id
+        self.in_queue = in_queue
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(int(match['submission_id']), in_queue=match['queue'] is not None)
+
+    async def callback(self, interaction: discord.Interaction):
+        await handle_reject(interaction, self.submission_id, self.in_queue)
+
+
+class LegacyTicketButton(discord.ui.DynamicItem[discord.ui.Button], template=r'(?P<action>approve|reject)_btn'):
+    """이전 형식(approve_btn/reject_btn) 티켓 버튼. 제출 ID는 임베드의 Submission ID 필드에서 읽음."""
+    def __init__(self, action: str, submission_id: int):
+        super().__init__(discord.ui.Button(custom_id=f"{action}_btn"))
+        self.action = action
+        self.submission_id = submission_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        embeds = interaction.message.embeds if interaction.message else []
+        for field in (embeds[0].fields if embeds else []):
+            if field.name == SUBMISSION_ID_FIELD:
+                return cls(match['action'], int(field.value.strip('`#')))
+        raise ValueError("티켓 임베드에서 제출 ID를 찾을 수 없습니다.")
+
+    async def callback(self, interaction: discord.Interaction):
+        if self.action == 'approve':
+            await handle_approve(interaction, self.submission_id)
+        else:
+            await handle_reject(interaction, self.submission_id)
+
+
+class AdminApprovalView(discord.ui.View):
+    """관리자 승인/거부 버튼 View.
+
+    버튼은 모두 DynamicItem이라 봇이 메시지별 View를 보관하지 않고, 시작 시 한 번 등록한
+    핸들러가 custom_id에서 제출 ID를 읽어 처리한다.
+    """
+    def __init__(self, submission_id: int):
+        super().__init__(timeout=None)
+        self.add_item(ApproveButton(submission_id))
+        self.add_item(RejectButton(submission_id))
 
 
 class RejectionReasonModal(Modal, title="반려 사유 작성"):
-    def __init__(self, submission_id: int, db: Database, bot: commands.Bot):
+    def __init__(self, submission_id: int, db: AsyncDatabase, bot: commands.Bot, in_queue: bool = False):
         super().__init__()
         self.submission_id = submission_id
+        self.in_queue = in_queue
         self.db = db
         self.bot = bot
         
@@ -689,98 +653,23 @@ class RejectionReasonModal(Modal, title="반려 사유 작성"):
         await interaction.response.defer()
         
         try:
-            # 반려 처리
-            self.db.reject_submission(self.submission_id, reason)
-            
-            submission = self.db.get_submission(self.submission_id)
-            if not submission:
+            # 반려 처리 (유저 DM은 같은 트랜잭션에서 아웃박스에 기록됨)
+            if not await self.db.reject_submission(self.submission_id, reason):
+                if self.in_queue:
+                    # 이미 처리된 제출 등은 목록에서 빠지도록 다시 그림
+                    await refresh_page(interaction, PENDING_QUEUE.kind)
                 await interaction.followup.send(
-                    "❌ 제출 정보를 찾을 수 없습니다.",
+                    "❌ 거부 처리 실패: 이미 처리되었거나 찾을 수 없는 제출입니다.",
                     ephemeral=True
                 )
                 return
+            self.bot.outbox.wake()
             
-            user_id = submission['user_id']
-            mission_code = submission['mission_code']
-            quest_info = QUEST_INFO.get(mission_code, {})
-            quest_name = quest_info.get('name', f"Mission {mission_code}")
-            
-            # 원본 임베드 가져오기
-            original_embed = interaction.message.embeds[0]
-            
-            # 거부된 임베드 생성
-            rejected_embed = discord.Embed(
-                title="❌ Submission Rejected",
-                color=0xFF0000,  # Red
-                timestamp=original_embed.timestamp
+            # 티켓 메시지 수정 (반려 사유 추가)
+            await close_ticket(
+                interaction, self.submission_id, self.in_queue, False, ("❌ Rejection Reason", reason)
             )
             
-            # 원본 필드 복사
-            for field in original_embed.fields:
-                rejected_embed.add_field(
-                    name=field.name,
-                    value=field.value,
-                    inline=field.inline
-                )
-            
-            # 반려 사유 추가
-            rejected_embed.add_field(
-                name="❌ Rejection Reason",
-                value=reason,
-                inline=False
-            )
-            
-            # Footer에 거부자 정보 추가
-            rejected_embed.set_footer(text=f"Rejected by {interaction.user.display_name}")
-            
-            # 버튼 비활성화된 View 생성
-            disabled_view = discord.ui.View()
-            disabled_view.add_item(
-                discord.ui.Button(
-                    label="✅ Approve",
-                    style=discord.ButtonStyle.green,
-                    disabled=True
-                )
-            )
-            disabled_view.add_item(
-                discord.ui.Button(
-                    label="❌ Rejected",
-                    style=discord.ButtonStyle.red,
-                    disabled=True
-                )
-            )
-            
-            # 메시지 수정
-            await interaction.message.edit(embed=rejected_embed, view=disabled_view)
-            
-            # 사용자에게 DM 전송
-            try:
-                user = await self.bot.fetch_user(user_id)
-                dm_embed = discord.Embed(
-                    title="⚠️ Submission Rejected",
-                    description=f"Your submission for **{quest_name}** was rejected.",
-                    color=discord.Color.red()
-                )
-                dm_embed.add_field(
-                    name="Reason",
-                    value=reason,
-                    inline=False
-                )
-                dm_embed.add_field(
-                    name="Next Steps",
-                    value="Please check the guidelines and try again using `/sz` command.",
-                    inline=False
-                )
-                await user.send(embed=dm_embed)
-            except Exception as e:
-                logger.error(
-                    "반려 알림 DM 전송 실패 user_id=%s submission_id=%s error=%s",
-                    user_id,
-                    self.submission_id,
-                    e,
-                    exc_info=True,
-                )
-            
             # 성공 메시지
             await interaction.followup.send(
                 "✅ Submission rejected. User has been notified.",
@@ -798,51 +687,180 @@ class RejectionReasonModal(Modal, title="반려 사유 작성"):
                 f"❌ 거부 처리 중 오류가 발생했습니다: {str(e)}",
                 ephemeral=True
             )
+
+
+async def send_admin_ticket(bot: commands.Bot, payload: dict):
+    """아웃박스 'admin_ticket': 관리자 승인 채널에 티켓 전송"""
+    channel_id = admin_channel_id()
+    if channel_id is None:
+        raise LookupError("ADMIN_CHANNEL_ID가 설정되지 않음")
+    admin_channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+    user_id = payload['user_id']
+    mission_code = payload['mission_code']
+    submission_id = payload['submission_id']
+    link = payload['link']
+    quest_info = QUEST_INFO[mission_code]
+
+    # Ticket 스타일 임베드 생성
+    embed = discord.Embed(
+        title="🚨 New Quest Submission",
+        color=discord.Color.orange(),  # Orange (Pending state)
+        timestamp=discord.utils.utcnow()
+    )
     
-    async def _update_user_roles(self, user_id: int, guild: discord.Guild):
-        """사용자 역할 업데이트"""
-        user = self.db.get_user(user_id)
-        if not user:
-            return
-        
-        member = guild.get_member(user_id)
-        if not member:
-            return
-        
-        total_xp = user['total_xp']
-        current_tier = self.db.get_user_tier(total_xp)
-        
-        # 모든 티어 역할 찾기
-        tier_roles = {}
-        for tier_level, tier_info in TIER_SYSTEM.items():
-            role = discord.utils.get(guild.roles, name=tier_info['role_name'])
-            if role:
-                tier_roles[tier_level] = role
-        
-        # 현재 티어 이하의 모든 역할 부여
-        roles_to_add = []
-        for tier_level in range(1, current_tier + 1):
-            if tier_level in tier_roles:
-                roles_to_add.append(tier_roles[tier_level])
-        
-        # 역할 추가 (없는 것만)
-        for role in roles_to_add:
-            if role not in member.roles:
-                try:
-                    await member.add_roles(role, reason=f"티어 업그레이드: Lv.{current_tier}")
-                except:
-                    pass
-        
-        # 현재 티어보다 높은 역할 제거
-        for tier_level in range(current_tier + 1, 6):
-            if tier_level in tier_roles:
-                role = tier_roles[tier_level]
-                if role in member.roles:
-                    try:
-                        await member.remove_roles(role, reason=f"티어 다운그레이드")
-                    except:
-                        pass
+    # 사용자 정보 (클릭 가능한 멘션)
+    embed.add_field(
+        name="👤 User",
+        value=f"<@{user_id}>\nID: `{user_id}`",
+        inline=True
+    )
+    
+    # 미션 정보
+    embed.add_field(
+        name="🎯 Mission",
+        value=f"**Mission {mission_code}**\n{quest_info['name']}\n**Reward:** {quest_info['xp']} XP",
+        inline=True
+    )
+    
+    # 증거 링크 (강조)
+    embed.add_field(
+        name="🔗 Proof",
+        value=f"[Click here]({link})\n`{link}`",
+        inline=False
+    )
+    
+    # 제출 ID (이전 형식 버튼과 티켓 재동기화가 이 필드에서 제출 ID를 읽음)
+    embed.add_field(
+        name=SUBMISSION_ID_FIELD,
+        value=f"`#{submission_id}`",
+        inline=True
+    )
+    
+    embed.set_footer(text="Pending Review • Click a button below to process")
+    message = await admin_channel.send(embed=embed, view=AdminApprovalView(submission_id))
+    # 재시작 후 티켓 재동기화에서 누락 여부를 판별할 수 있도록 메시지 위치 기록
+    await bot.db.set_admin_message(submission_id, admin_channel.id, message.id)
+
+
+async def send_approval_dm(bot: commands.Bot, payload: dict):
+    """아웃박스 'approval_dm': 승인 알림 DM"""
+    user_id = payload['user_id']
+    # 없는 유저는 UserNotFound(dead), 일시적 조회 실패는 HTTPException으로 재시도
+    user = await bot.user_resolver.require(user_id)
+    quest_info = QUEST_INFO[payload['mission_code']]
+    milestone_rewards = payload['milestones']
+
+    dm_embed = discord.Embed(
+        title="🎉 Submission Approved!",
+        description=f"Your submission for **{quest_info['name']}** has been approved!",
+        color=discord.Color.green()
+    )
+    dm_embed.add_field(
+        name="XP Earned",
+        value=f"+{payload['xp_earned']} XP",
+        inline=True
+    )
+
+    # 마일스톤 보상이 있다면 추가
+    if milestone_rewards:
+        total_milestone_xp = sum(r['xp'] for r in milestone_rewards)
+        milestone_text = "\n".join([
+            f"🎯 {QUEST_INFO[r['mission']]['name']}: +{r['xp']} XP"
+            for r in milestone_rewards
+        ])
+        dm_embed.add_field(
+            name="🎉 Milestone Achieved!",
+            value=f"{milestone_text}\n\n**Total Bonus:** +{total_milestone_xp} XP",
+            inline=False
+        )
+
+    await user.send(embed=dm_embed)
+
+
+async def send_rejection_dm(bot: commands.Bot, payload: dict):
+    """아웃박스 'rejection_dm': 반려 알림 DM"""
+    user_id = payload['user_id']
+    # 없는 유저는 UserNotFound(dead), 일시적 조회 실패는 HTTPException으로 재시도
+    user = await bot.user_resolver.require(user_id)
+    mission_code = payload['mission_code']
+    quest_name = QUEST_INFO.get(mission_code, {}).get('name', f"Mission {mission_code}")
+
+    dm_embed = discord.Embed(
+        title="⚠️ Submission Rejected",
+        description=f"Your submission for **{quest_name}** was rejected.",
+        color=discord.Color.red()
+    )
+    dm_embed.add_field(
+        name="Reason",
+        value=payload['reason'],
+        inline=False
+    )
+    dm_embed.add_field(
+        name="Next Steps",
+        value="Please check the guidelines and try again using `/sz` command.",
+        inline=False
+    )
+    await user.send(embed=dm_embed)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class PendingQueuePager(KeysetPager):
+    """/queue: 대기 중 제출 (오래된 순). 행마다 승인/거부 버튼."""
+    kind = 'queue'
+    page_size = 4  # 행 버튼 4줄 + 이동 버튼 1줄 (메시지당 최대 5줄)
+
+    async def fetch(self, bot, after, limit, reverse):
+        return await bot.db.get_pending_submissions_page(after, limit, reverse)
+
+    def cursor(self, row):
+        return row['submitted_at'], row['submission_id']
+
+    def encode(self, cursor):
+        # submitted_at(타임존 없는 UTC)은 마이크로초 정수로 custom_id에 담음
+        submitted_at, submission_id = cursor
+        return f"{(submitted_at - _EPOCH) // timedelta(microseconds=1)}.{submission_id}"
+
+    def decode(self, token):
+        micros, submission_id = token.split('.')
+        return _EPOCH + timedelta(microseconds=int(micros)), int(submission_id)
+
+    def render(self, rows, has_prev, has_next):
+        embed = discord.Embed(title="🗂️ Pending Submissions", color=discord.Color.orange())
+        if not rows:
+            embed.description = "대기 중인 제출이 없습니다." if not has_prev else "이 뒤로는 대기 중인 제출이 없습니다."
+        for row in rows:
+            quest_info = QUEST_INFO.get(row['mission_code'], {'name': row['mission_code'], 'xp': 0})
+            submitted = int((row['submitted_at'] - _EPOCH).total_seconds())
+            embed.add_field(
+                name=f"#{row['submission_id']} · Mission {row['mission_code']}: {quest_info['name']} ({quest_info['xp']} XP)",
+                value=f"<@{row['user_id']}> · <t:{submitted}:R>\n🔗 {row['link'][:200]}",
+                inline=False,
+            )
+        embed.set_footer(text="승인/거부하면 관리자 채널 티켓도 함께 갱신됩니다.")
+        return embed
+
+    def row_items(self, rows):
+        items = []
+        for index, row in enumerate(rows):
+            items.append(ApproveButton(row['submission_id'], in_queue=True, row=index))
+            items.append(RejectButton(row['submission_id'], in_queue=True, row=index))
+        return items
+
+
+PENDING_QUEUE = PendingQueuePager()
 
 
 async def setup(bot: commands.Bot):
+    # 승인/거부/목록 이동 버튼 핸들러는 여기서 한 번만 등록 (대기 중인 티켓 수와 관계없이 메모리 일정)
+    bot.add_dynamic_items(ApproveButton, RejectButton, LegacyTicketButton, PageButton)
+    register_pager(PENDING_QUEUE)
+    # 제출/승인/반려 트랜잭션이 남긴 아웃박스 알림 전송 핸들러
+    bot.outbox.register(
+        'admin_ticket', send_admin_ticket, rate_per_sec=float(os.getenv('ADMIN_TICKET_RATE', '1'))
+    )
+    bot.outbox.register('approval_dm', send_approval_dm)
+    bot.outbox.register('rejection_dm', send_rejection_dm)
     await bot.add_cog(QuestsCog(bot))
@@ -1,10 +1,15 @@
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Optional, List, Dict, Tuple
+import threading
+from bisect import bisect_right
+from psycopg2.extras import RealDictCursor, execute_values
+from typing import FrozenSet, Iterable, Iterator, NamedTuple, Optional, List, Dict, Tuple
 from datetime import datetime
+import csv
 import json
 
+import migrate
+from db_pool import ConnectionPool
+
 # 퀘스트 정보 정의
 QUEST_INFO = {
     'A': {
@@ -33,152 +38,791 @@ TIER_SYSTEM = {
     5: {'name': 'SZ Partner', 'xp_required': 2500, 'role_name': 'SZ Partner'},
 }
 
+# 반복 미션 승인 누적 수에 따른 마일스톤 (승인 수가 정확히 threshold가 되는 순간 지급)
+MILESTONES = {
+    'B': [('D', 5), ('E', 10)],
+    'C': [('F', 3), ('G', 6)],
+}
+
+
+def _compile_tiers() -> Tuple[List[int], List[int]]:
+    """TIER_SYSTEM을 (XP 기준값 오름차순, 해당 구간의 티어) 배열로 변환.
+
+    구간의 티어는 그 기준값 이하를 만족하는 가장 높은 레벨이므로 bisect 한 번으로 get_user_tier와
+    같은 결과를 얻는다.
+    """
+    thresholds, levels = [], []
+    best = 1
+    for xp_required, level in sorted((info['xp_required'], level) for level, info in TIER_SYSTEM.items()):
+        best = max(best, level)
+        thresholds.append(xp_required)
+        levels.append(best)
+    return thresholds, levels
+
+
+_TIER_THRESHOLDS, _TIER_LEVELS = _compile_tiers()
+
+
+def tier_for_xp(total_xp: int) -> int:
+    """XP에 따른 티어 (조건을 만족하는 가장 높은 레벨, 없으면 1)"""
+    index = bisect_right(_TIER_THRESHOLDS, total_xp)
+    return _TIER_LEVELS[index - 1] if index else 1
+
+
+def tiers_for_xp(xp_values: Iterable[int]) -> List[int]:
+    """XP 목록을 한 번에 티어 목록으로 변환"""
+    thresholds, levels = _TIER_THRESHOLDS, _TIER_LEVELS
+    tiers = []
+    for total_xp in xp_values:
+        index = bisect_right(thresholds, total_xp)
+        tiers.append(levels[index - 1] if index else 1)
+    return tiers
+
+
+def tier_case_sql(xp_expr: str, field: str = 'level') -> str:
+    """TIER_SYSTEM을 SQL CASE 식으로 변환 (get_user_tier와 같은 규칙: 조건을 만족하는 가장 높은 레벨).
+
+    field='level'이면 티어 번호, 'name'이면 티어 이름을 돌려주는 식을 만든다.
+    """
+    def value(level: int) -> str:
+        if field == 'name':
+            return "'" + TIER_SYSTEM[level]['name'].replace("'", "''") + "'"
+        return str(level)
+
+    whens = ' '.join(
+        f"WHEN {xp_expr} >= {info['xp_required']} THEN {value(level)}"
+        for level, info in sorted(TIER_SYSTEM.items(), reverse=True)
+    )
+    return f"CASE {whens} ELSE {value(1)} END"
+
+
+# 승인 대상 제출과 해당 유저 행을 함께 잠금 (동시에 승인 버튼을 눌러도 한 쪽만 진행됨)
+APPROVE_LOCK_SQL = '''
+    SELECT s.user_id, s.mission_code, s.status,
+           EXISTS (
+               SELECT 1 FROM completed_quests c
+               WHERE c.user_id = s.user_id AND c.mission_code = s.mission_code
+           ) AS already_completed
+    FROM submissions s
+    JOIN users u ON u.user_id = s.user_id
+    WHERE s.submission_id = %s
+    FOR UPDATE OF s, u
+'''
+
+# 승인 시 유저별 미션 카운터 증가 (증가 후 값을 돌려받아 마일스톤 판정에 사용)
+INCREMENT_MISSION_STAT_SQL = '''
+    INSERT INTO user_mission_stats (user_id, mission_code, approved_count)
+    VALUES (%s, %s, 1)
+    ON CONFLICT (user_id, mission_code) DO UPDATE
+    SET approved_count = user_mission_stats.approved_count + 1
+    RETURNING approved_count
+'''
+
+# user_mission_stats를 submissions 기준으로 다시 계산 (어긋난 행만 갱신, 남는 행은 삭제)
+REBUILD_MISSION_STATS_SQL = '''
+    WITH actual AS (
+        SELECT user_id, mission_code, COUNT(*)::int AS approved_count
+        FROM submissions
+        WHERE status = 'approved'
+        GROUP BY user_id, mission_code
+    ),
+    upserted AS (
+        INSERT INTO user_mission_stats (user_id, mission_code, approved_count)
+        SELECT user_id, mission_code, approved_count FROM actual
+        ON CONFLICT (user_id, mission_code) DO UPDATE
+        SET approved_count = EXCLUDED.approved_count
+        WHERE user_mission_stats.approved_count <> EXCLUDED.approved_count
+        RETURNING 1
+    ),
+    deleted AS (
+        DELETE FROM user_mission_stats s
+        WHERE NOT EXISTS (
+            SELECT 1 FROM actual a
+            WHERE a.user_id = s.user_id AND a.mission_code = s.mission_code
+        )
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM upserted) AS repaired,
+           (SELECT COUNT(*) FROM deleted) AS removed
+'''
+
+# XP 가산과 티어 재계산을 UPDATE 한 번으로 처리
+APPROVE_USER_UPDATE_SQL = '''
+    UPDATE users
+    SET total_xp = total_xp + %(xp)s,
+        approved_count = approved_count + 1,
+        tier = {tier},
+        tier_name = {tier_name}
+    WHERE user_id = %(user_id)s
+    RETURNING total_xp, tier, tier_name, approved_count
+'''.format(
+    tier=tier_case_sql('total_xp + %(xp)s'),
+    tier_name=tier_case_sql('total_xp + %(xp)s', 'name'),
+)
+
+
+# total_xp와 어긋난 tier/tier_name만 한 번에 바로잡음 (rowcount = 어긋났던 행 수)
+SYNC_ALL_TIERS_SQL = '''
+    UPDATE users
+    SET tier = {tier},
+        tier_name = {tier_name}
+    WHERE tier IS DISTINCT FROM {tier}
+       OR tier_name IS DISTINCT FROM {tier_name}
+'''.format(
+    tier=tier_case_sql('total_xp'),
+    tier_name=tier_case_sql('total_xp', 'name'),
+)
+
+
+# 아웃박스 기록 (호출 측 트랜잭션 안에서 실행)
+ENQUEUE_OUTBOX_SQL = '''
+    INSERT INTO outbox (kind, payload) VALUES (%s, %s::jsonb)
+'''
+
+# 전송할 아웃박스 행 가져오기. 가져간 행은 lease 동안 다시 나오지 않으며, 처리 도중 프로세스가
+# 죽으면 lease가 지난 뒤 다시 전송된다 (최소 1회 전송).
+CLAIM_OUTBOX_SQL = '''
+    UPDATE outbox
+    SET attempts = attempts + 1,
+        next_attempt_at = CURRENT_TIMESTAMP + %(lease)s * INTERVAL '1 second'
+    WHERE outbox_id IN (
+        SELECT outbox_id FROM outbox
+        WHERE status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP
+        ORDER BY outbox_id
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING outbox_id, kind, payload, attempts
+'''
+
+REQUEUE_DEAD_OUTBOX_SQL = '''
+    UPDATE outbox
+    SET status = 'pending', attempts = 0, next_attempt_at = CURRENT_TIMESTAMP
+    WHERE status = 'dead'
+'''
+
+# 제출 생성. 원타임 퀘스트는 완료 기록이 없을 때만 INSERT (확인과 삽입을 한 문장으로).
+# 같은 파라미터가 두 번 쓰이므로 psycopg3 서버 측 바인딩에서 타입이 갈리지 않도록 캐스트를 맞춤
+CREATE_SUBMISSION_SQL = '''
+    INSERT INTO submissions (user_id, mission_code, link, status)
+    SELECT %(user_id)s::bigint, %(mission_code)s::varchar, %(link)s, 'pending'
+    WHERE NOT %(one_time)s OR NOT EXISTS (
+        SELECT 1 FROM completed_quests
+        WHERE user_id = %(user_id)s::bigint AND mission_code = %(mission_code)s::varchar
+    )
+    RETURNING submission_id
+'''
+
+# 누락된 관리자 티켓 재전송 예약 (이미 전송 대기 중인 티켓은 건너뜀). rowcount = 예약한 티켓 수
+ENQUEUE_ADMIN_TICKETS_SQL = '''
+    INSERT INTO outbox (kind, payload)
+    SELECT 'admin_ticket', jsonb_build_object(
+        'submission_id', s.submission_id, 'user_id', s.user_id,
+        'mission_code', s.mission_code, 'link', s.link
+    )
+    FROM submissions s
+    WHERE s.submission_id = ANY(%s)
+      AND s.status = 'pending'
+      AND NOT EXISTS (
+          SELECT 1 FROM outbox o
+          WHERE o.kind = 'admin_ticket' AND o.status = 'pending'
+            AND o.payload->>'submission_id' = s.submission_id::text
+      )
+'''
+
+# 제출 목록 키셋 조회 뼈대. 커서는 (submitted_at, submission_id), submissions_query로 조건을 채움
+SUBMISSION_STATUSES = ('pending', 'approved', 'rejected')
+SUBMISSIONS_KEYSET_SQL = '''
+    SELECT * FROM submissions
+    WHERE {where}
+    ORDER BY submitted_at {order}, submission_id {order}
+'''
+
+
+def submissions_query(
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: Optional[int] = None,
+    newest_first: bool = False,
+) -> Tuple[str, Dict]:
+    """submissions 키셋 조회 SQL과 파라미터.
+
+    after는 직전 페이지 마지막 행의 (submitted_at, submission_id). status는 검증 후 리터럴로 넣어
+    대기열 부분 인덱스(idx_submissions_pending_keyset)를 탈 수 있게 한다.
+    """
+    conditions = []
+    params: Dict = {}
+    if user_id is not None:
+        conditions.append('user_id = %(user_id)s')
+        params['user_id'] = user_id
+    if status is not None:
+        if status not in SUBMISSION_STATUSES:
+            raise ValueError(f"알 수 없는 제출 상태입니다. status={status}")
+        conditions.append(f"status = '{status}'")
+    if after is not None:
+        op = '<' if newest_first else '>'
+        conditions.append(f'(submitted_at, submission_id) {op} (%(after_at)s, %(after_id)s)')
+        params['after_at'], params['after_id'] = after
+    order = 'DESC' if newest_first else 'ASC'
+    sql = SUBMISSIONS_KEYSET_SQL.format(where=' AND '.join(conditions) or 'TRUE', order=order)
+    if limit is not None:
+        sql += '    LIMIT %(limit)s\n'
+        params['limit'] = limit
+    return sql, params
+
+
+def submission_cursor(row: Dict) -> Tuple[datetime, int]:
+    """페이지 마지막 행 → 다음 페이지 요청에 넘길 키셋 커서"""
+    return row['submitted_at'], row['submission_id']
+
+
+# 유저 목록 키셋 페이지 (total_xp 내림차순, user_id 오름차순 = idx_users_total_xp_rank 순서).
+# total_xp 범위 조건을 따로 둬서 인덱스 스캔이 커서 위치에서 바로 시작하게 한다.
+USERS_PAGE_SQL = '''
+    SELECT user_id, total_xp, tier, tier_name
+    FROM users
+    {where}
+    ORDER BY total_xp {xp_order}, user_id {id_order}
+    LIMIT %(limit)s
+'''
+USERS_FIRST_PAGE_SQL = USERS_PAGE_SQL.format(where='', xp_order='DESC', id_order='ASC')
+USERS_NEXT_PAGE_SQL = USERS_PAGE_SQL.format(
+    where='WHERE total_xp <= %(after_xp)s AND (total_xp < %(after_xp)s OR user_id > %(after_id)s)',
+    xp_order='DESC', id_order='ASC',
+)
+# 커서 이전 행을 가까운 순으로 (이전 페이지용)
+USERS_PREV_PAGE_SQL = USERS_PAGE_SQL.format(
+    where='WHERE total_xp >= %(after_xp)s AND (total_xp > %(after_xp)s OR user_id < %(after_id)s)',
+    xp_order='ASC', id_order='DESC',
+)
+
+
+def users_page_query(after: Optional[Tuple[int, int]], limit: int, reverse: bool = False) -> Tuple[str, Dict]:
+    """유저 목록 키셋 페이지 SQL과 파라미터. after는 (total_xp, user_id)."""
+    if after is None:
+        return USERS_FIRST_PAGE_SQL, {'limit': limit}
+    params = {'after_xp': after[0], 'after_id': after[1], 'limit': limit}
+    return (USERS_PREV_PAGE_SQL if reverse else USERS_NEXT_PAGE_SQL), params
+
+
+# 내보내기 대상 테이블: (컬럼, 기간 필터 컬럼, 정렬 컬럼)
+EXPORT_TABLES = {
+    'submissions': (
+        'submission_id, user_id, mission_code, link, status, submitted_at, approved_at, rejection_reason',
+        'submitted_at', 'submission_id',
+    ),
+    'xp_logs': ('id, user_id, mission_name, xp_amount, created_at', 'created_at', 'id'),
+    'users': (
+        'user_id, total_submissions, approved_count, total_xp, tier, tier_name, registered_at',
+        'registered_at', 'user_id',
+    ),
+}
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def export_copy_query(
+    table: str,
+    fmt: str = 'csv',
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+) -> Tuple[str, Dict]:
+    """COPY ... TO STDOUT 문과 파라미터. 기간은 since 이상 until 미만."""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"내보낼 수 없는 테이블입니다. table={table}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다. format={fmt}")
+    columns, date_column, order_column = EXPORT_TABLES[table]
+    conditions = []
+    params: Dict = {}
+    if since is not None:
+        conditions.append(f'{date_column} >= %(since)s')
+        params['since'] = since
+    if until is not None:
+        conditions.append(f'{date_column} < %(until)s')
+        params['until'] = until
+    if user_id is not None:
+        conditions.append('user_id = %(user_id)s')
+        params['user_id'] = user_id
+    select = f"SELECT {columns} FROM {table} WHERE {' AND '.join(conditions) or 'TRUE'} ORDER BY {order_column}"
+    if fmt == 'csv':
+        return f"COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER true)", params
+    # JSONL: row_to_json 한 줄씩. 텍스트 형식은 백슬래시를 이스케이프하므로, JSON에 나올 수 없는
+    # 제어 문자를 따옴표/구분자로 지정한 CSV 형식으로 받아 출력을 그대로 유지한다.
+    return (
+        f"COPY (SELECT row_to_json(t) FROM ({select}) t) TO STDOUT "
+        f"WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+    ), params
+
+
+# 일괄 가져오기: CSV 파일별 스테이징 테이블 (트랜잭션 종료 시 삭제). 컬럼은 모두 NULL 허용 - 검증은 병합 전 SQL로.
+IMPORT_COLUMNS = {
+    'users': (('user_id', 'registered_at'), ('user_id',)),
+    'submissions': (
+        ('user_id', 'mission_code', 'link', 'status', 'submitted_at', 'approved_at'),
+        ('user_id', 'mission_code', 'link'),
+    ),
+    'xp_logs': (('user_id', 'mission_name', 'xp_amount', 'created_at'), ('user_id', 'mission_name', 'xp_amount')),
+}
+IMPORT_STAGING_SQL = '''
+    CREATE TEMP TABLE import_users (
+        row_id BIGSERIAL, user_id BIGINT, registered_at TIMESTAMP
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_submissions (
+        row_id BIGSERIAL, user_id BIGINT, mission_code VARCHAR(10), link TEXT, status VARCHAR(20),
+        submitted_at TIMESTAMP, approved_at TIMESTAMP, problem TEXT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_xp_logs (
+        row_id BIGSERIAL, user_id BIGINT, mission_name VARCHAR(255), xp_amount INTEGER,
+        created_at TIMESTAMP, problem TEXT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_quests (
+        mission_code VARCHAR(10) PRIMARY KEY, name TEXT, xp INTEGER, type TEXT
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_milestones (
+        source_code VARCHAR(10), mission_code VARCHAR(10), threshold INTEGER
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE import_ledger (
+        user_id BIGINT, mission_name VARCHAR(255), xp_amount INTEGER, created_at TIMESTAMP
+    ) ON COMMIT DROP;
+'''
+
+# 제출 검증: 기본값 채우고 문제 있는 행에 사유 기록 (사유가 있는 행은 병합하지 않음)
+IMPORT_VALIDATE_SUBMISSIONS_SQL = '''
+    UPDATE import_submissions s
+    SET status = v.status, submitted_at = v.submitted_at, problem = v.problem,
+        approved_at = CASE WHEN v.status = 'approved' THEN COALESCE(s.approved_at, v.submitted_at) END
+    FROM (
+        SELECT s.row_id,
+               COALESCE(s.status, 'approved') AS status,
+               COALESCE(s.submitted_at, CURRENT_TIMESTAMP) AS submitted_at,
+               CASE
+                   WHEN s.user_id IS NULL OR s.mission_code IS NULL OR s.link IS NULL THEN 'missing_field'
+                   WHEN q.mission_code IS NULL THEN 'unknown_mission'
+                   WHEN q.type = 'milestone' THEN 'milestone_mission'
+                   WHEN COALESCE(s.status, 'approved') NOT IN ('pending', 'approved', 'rejected') THEN 'bad_status'
+                   WHEN ROW_NUMBER() OVER (PARTITION BY s.user_id, s.mission_code, s.link ORDER BY s.row_id) > 1
+                        OR EXISTS (
+                            SELECT 1 FROM submissions e
+                            WHERE e.user_id = s.user_id AND e.mission_code = s.mission_code AND e.link = s.link
+                        ) THEN 'duplicate'
+                   WHEN q.type = 'one-time' AND COALESCE(s.status, 'approved') = 'approved' AND (
+                        ROW_NUMBER() OVER (
+                            PARTITION BY s.user_id, s.mission_code, COALESCE(s.status, 'approved') ORDER BY s.row_id
+                        ) > 1
+                        OR EXISTS (
+                            SELECT 1 FROM completed_quests c
+                            WHERE c.user_id = s.user_id AND c.mission_code = s.mission_code
+                        )
+                   ) THEN 'already_completed'
+               END AS problem
+        FROM import_submissions s
+        LEFT JOIN import_quests q ON q.mission_code = s.mission_code
+    ) v
+    WHERE s.row_id = v.row_id
+'''
+IMPORT_VALIDATE_XP_LOGS_SQL = '''
+    UPDATE import_xp_logs
+    SET created_at = COALESCE(created_at, CURRENT_TIMESTAMP),
+        problem = CASE WHEN user_id IS NULL OR mission_name IS NULL OR xp_amount IS NULL THEN 'missing_field' END
+'''
+
+# 병합 (순서대로 실행, 모두 한 트랜잭션)
+IMPORT_MERGE_USERS_SQL = '''
+    INSERT INTO users (user_id, tier, tier_name, registered_at)
+    SELECT user_id, 1, 'Code SZ', COALESCE(MIN(registered_at), CURRENT_TIMESTAMP)
+    FROM (
+        SELECT user_id, registered_at FROM import_users WHERE user_id IS NOT NULL
+        UNION ALL
+        SELECT user_id, NULL FROM import_submissions WHERE problem IS NULL
+        UNION ALL
+        SELECT user_id, NULL FROM import_xp_logs WHERE problem IS NULL
+    ) u
+    GROUP BY user_id
+    ON CONFLICT (user_id) DO NOTHING
+'''
+IMPORT_MERGE_SUBMISSIONS_SQL = '''
+    INSERT INTO submissions (user_id, mission_code, link, status, submitted_at, approved_at)
+    SELECT user_id, mission_code, link, status, submitted_at, approved_at
+    FROM import_submissions
+    WHERE problem IS NULL
+    ORDER BY row_id
+'''
+IMPORT_MERGE_COMPLETIONS_SQL = '''
+    INSERT INTO completed_quests (user_id, mission_code, xp_earned, completed_at)
+    SELECT s.user_id, s.mission_code, q.xp, s.approved_at
+    FROM import_submissions s
+    JOIN import_quests q ON q.mission_code = s.mission_code
+    WHERE s.problem IS NULL AND s.status = 'approved' AND q.type = 'one-time'
+    ON CONFLICT (user_id, mission_code) DO NOTHING
+'''
+IMPORT_MERGE_MISSION_STATS_SQL = '''
+    INSERT INTO user_mission_stats (user_id, mission_code, approved_count)
+    SELECT user_id, mission_code, COUNT(*)::int
+    FROM import_submissions
+    WHERE problem IS NULL AND status = 'approved'
+    GROUP BY user_id, mission_code
+    ON CONFLICT (user_id, mission_code) DO UPDATE
+    SET approved_count = user_mission_stats.approved_count + EXCLUDED.approved_count
+'''
+# 원장(xp_logs)에 들어갈 행: 승인 제출의 미션 XP + 가져온 XP 로그 + 새로 달성한 마일스톤
+IMPORT_LEDGER_SQL = '''
+    INSERT INTO import_ledger (user_id, mission_name, xp_amount, created_at)
+    SELECT s.user_id, 'Mission ' || s.mission_code || ': ' || q.name, q.xp, s.approved_at
+    FROM import_submissions s
+    JOIN import_quests q ON q.mission_code = s.mission_code
+    WHERE s.problem IS NULL AND s.status = 'approved'
+    UNION ALL
+    SELECT user_id, mission_name, xp_amount, created_at
+    FROM import_xp_logs
+    WHERE problem IS NULL
+'''
+IMPORT_MILESTONES_SQL = '''
+    WITH granted AS (
+        INSERT INTO completed_quests (user_id, mission_code, xp_earned)
+        SELECT st.user_id, m.mission_code, q.xp
+        FROM user_mission_stats st
+        JOIN import_milestones m ON m.source_code = st.mission_code AND st.approved_count >= m.threshold
+        JOIN import_quests q ON q.mission_code = m.mission_code
+        WHERE (st.user_id, st.mission_code) IN (
+            SELECT user_id, mission_code FROM import_submissions WHERE problem IS NULL AND status = 'approved'
+        )
+        ON CONFLICT (user_id, mission_code) DO NOTHING
+        RETURNING user_id, mission_code, xp_earned
+    )
+    INSERT INTO import_ledger (user_id, mission_name, xp_amount, created_at)
+    SELECT g.user_id, 'Mission ' || g.mission_code || ': ' || q.name || ' (Milestone)', g.xp_earned, CURRENT_TIMESTAMP
+    FROM granted g
+    JOIN import_quests q ON q.mission_code = g.mission_code
+'''
+IMPORT_MERGE_XP_LOGS_SQL = '''
+    INSERT INTO xp_logs (user_id, mission_name, xp_amount, created_at)
+    SELECT user_id, mission_name, xp_amount, created_at FROM import_ledger
+'''
+# 영향받은 유저의 합계/카운터/링크/티어를 UPDATE 한 번으로 반영
+IMPORT_MERGE_TOTALS_SQL = '''
+    UPDATE users u
+    SET total_xp = u.total_xp + d.xp,
+        total_submissions = u.total_submissions + d.submissions,
+        approved_count = u.approved_count + d.approved,
+        link_list = u.link_list || d.links,
+        tier = {tier},
+        tier_name = {tier_name}
+    FROM (
+        SELECT COALESCE(l.user_id, s.user_id) AS user_id,
+               COALESCE(l.xp, 0) AS xp,
+               COALESCE(s.submissions, 0) AS submissions,
+               COALESCE(s.approved, 0) AS approved,
+               COALESCE(s.links, '{{}}') AS links
+        FROM (SELECT user_id, SUM(xp_amount) AS xp FROM import_ledger GROUP BY user_id) l
+        FULL JOIN (
+            SELECT user_id, COUNT(*) AS submissions,
+                   COUNT(*) FILTER (WHERE status = 'approved') AS approved,
+                   array_agg(link ORDER BY row_id) AS links
+            FROM import_submissions
+            WHERE problem IS NULL
+            GROUP BY user_id
+        ) s ON s.user_id = l.user_id
+    ) d
+    WHERE u.user_id = d.user_id
+'''.format(
+    tier=tier_case_sql('u.total_xp + d.xp'),
+    tier_name=tier_case_sql('u.total_xp + d.xp', 'name'),
+)
+IMPORT_PROBLEMS_SQL = '''
+    SELECT 'submissions' AS source, problem, COUNT(*) AS count, (array_agg(row_id ORDER BY row_id))[1:5] AS rows
+    FROM import_submissions WHERE problem IS NOT NULL GROUP BY problem
+    UNION ALL
+    SELECT 'xp_logs', problem, COUNT(*), (array_agg(row_id ORDER BY row_id))[1:5]
+    FROM import_xp_logs WHERE problem IS NOT NULL GROUP BY problem
+    ORDER BY 1, 2
+'''
+
+
+# 반려 처리 (제출 정보를 돌려받아 알림 기록에 사용)
+REJECT_SUBMISSION_SQL = '''
+    UPDATE submissions
+    SET status = 'rejected', rejection_reason = %s
+    WHERE submission_id = %s AND status = 'pending'
+    RETURNING user_id, mission_code
+'''
+
+
+def outbox_payload(**fields) -> str:
+    """아웃박스 payload 직렬화"""
+    return json.dumps(fields, ensure_ascii=False, default=str)
+
+
+def approval_notice(result: Dict) -> str:
+    """승인 결과 → 유저 DM용 아웃박스 payload"""
+    return outbox_payload(
+        submission_id=result['submission_id'],
+        user_id=result['user_id'],
+        mission_code=result['mission_code'],
+        xp_earned=result['xp_earned'],
+        milestones=result['milestones'],
+    )
+
+
+# bot_state 키-값 저장
+SET_STATE_SQL = '''
+    INSERT INTO bot_state (key, value, updated_at)
+    VALUES (%s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (key) DO UPDATE
+    SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+'''
+
+
+# 봇 밖(CLI)에서 users 행을 바꾼 트랜잭션이 함께 올리는 버전. 봇의 유저 캐시가 이 값을 주기적으로 확인해 비운다.
+USERS_VERSION_KEY = 'users_version'
+BUMP_USERS_VERSION_SQL = f'''
+    INSERT INTO bot_state (key, value, updated_at)
+    VALUES ('{USERS_VERSION_KEY}', '1', CURRENT_TIMESTAMP)
+    ON CONFLICT (key) DO UPDATE
+    SET value = (bot_state.value::bigint + 1)::text, updated_at = EXCLUDED.updated_at
+'''
+
+# 내 순위 조회: 나보다 앞선 유저 수 + 바로 위/아래 이웃 (idx_users_total_xp_rank 사용).
+# 동점은 user_id 오름차순으로 정렬해 get_leaderboard 순서와 일치시킨다.
+USER_RANK_SQL = '''
+    WITH me AS (
+        SELECT user_id, total_xp FROM users WHERE user_id = %(user_id)s
+    )
+    SELECT me.user_id,
+           me.total_xp,
+           (
+               SELECT COUNT(*) FROM users u
+               WHERE u.total_xp > me.total_xp
+                  OR (u.total_xp = me.total_xp AND u.user_id < me.user_id)
+           ) + 1 AS rank,
+           above.user_id AS above_user_id,
+           above.total_xp AS above_total_xp,
+           below.user_id AS below_user_id,
+           below.total_xp AS below_total_xp
+    FROM me
+    LEFT JOIN LATERAL (
+        SELECT u.user_id, u.total_xp FROM users u
+        WHERE u.total_xp > me.total_xp
+           OR (u.total_xp = me.total_xp AND u.user_id < me.user_id)
+        ORDER BY u.total_xp ASC, u.user_id DESC
+        LIMIT 1
+    ) above ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT u.user_id, u.total_xp FROM users u
+        WHERE u.total_xp < me.total_xp
+           OR (u.total_xp = me.total_xp AND u.user_id > me.user_id)
+        ORDER BY u.total_xp DESC, u.user_id ASC
+        LIMIT 1
+    ) below ON TRUE
+'''
+
+
+def build_user_rank(row: Optional[Dict]) -> Optional[Dict]:
+    """USER_RANK_SQL 결과를 get_user_rank 반환 형식으로 변환"""
+    if not row:
+        return None
+    rank = row['rank']
+    above = None
+    if row['above_user_id'] is not None:
+        above = {'user_id': row['above_user_id'], 'total_xp': row['above_total_xp'], 'rank': rank - 1}
+    below = None
+    if row['below_user_id'] is not None:
+        below = {'user_id': row['below_user_id'], 'total_xp': row['below_total_xp'], 'rank': rank + 1}
+    return {
+        'user_id': row['user_id'],
+        'total_xp': row['total_xp'],
+        'rank': rank,
+        'above': above,
+        'below': below,
+        # 바로 위 유저를 확실히 넘어서기 위해 필요한 XP (1위면 None)
+        'xp_to_next_rank': above['total_xp'] - row['total_xp'] + 1 if above else None,
+    }
+
+
+def fill_missing_tiers(rows: List[Dict]) -> None:
+    """tier/tier_name이 비어 있는 행만 total_xp로 채움 (티어 계산은 한 번에)"""
+    missing = [r for r in rows if r.get('tier') is None or r.get('tier_name') is None]
+    for r, tier in zip(missing, tiers_for_xp(r['total_xp'] for r in missing)):
+        r['tier'] = tier
+        r['tier_name'] = TIER_SYSTEM[tier]['name']
+
+
+_REPEATABLE_CODES = [code for code, info in QUEST_INFO.items() if info['type'] == 'repeatable']
+
+# /sz 보드 한 번 렌더에 필요한 모든 데이터를 왕복 1회로 조회하는 쿼리 (승인 수는 user_mission_stats 카운터).
+# inserted CTE가 신규 유저를 만들고, 기존 유저는 UNION ALL 아래쪽에서 읽힌다
+# (같은 문장 안에서는 INSERT 결과가 users 스냅샷에 보이지 않으므로 두 쪽이 겹치지 않음).
+QUEST_BOARD_SQL = '''
+    WITH inserted AS (
+        INSERT INTO users (user_id, tier, tier_name)
+        VALUES (%(user_id)s, 1, 'Code SZ')
+        ON CONFLICT (user_id) DO NOTHING
+        RETURNING *
+    ),
+    board_user AS (
+        SELECT * FROM inserted
+        UNION ALL
+        SELECT * FROM users WHERE user_id = %(user_id)s
+    )
+    SELECT u.*,
+           c.*,
+           COALESCE(
+               (SELECT array_agg(mission_code) FROM completed_quests WHERE user_id = %(user_id)s),
+               '{{}}'
+           ) AS completed_codes
+    FROM board_user u
+    CROSS JOIN (
+        SELECT {approved_counts}
+        FROM user_mission_stats
+        WHERE user_id = %(user_id)s
+    ) c
+'''.format(
+    approved_counts=',\n               '.join(
+        f"COALESCE(SUM(approved_count) FILTER (WHERE mission_code = '{code}'), 0)::int"
+        f" AS approved_{code.lower()}"
+        for code in _REPEATABLE_CODES
+    ),
+)
+
+
+def build_quest_board(row: Dict) -> Dict:
+    """QUEST_BOARD_SQL 결과 한 행을 get_quest_board_data 반환 형식으로 변환"""
+    row = dict(row)
+    completed = set(row.pop('completed_codes') or [])
+    approved = {code: row.pop(f'approved_{code.lower()}') for code in _REPEATABLE_CODES}
+
+    one_time: Dict[str, bool] = {}
+    repeatable: Dict[str, int] = {}
+    milestone: Dict[str, Dict] = {}
+    for code, info in QUEST_INFO.items():
+        if info['type'] == 'one-time':
+            one_time[code] = code in completed
+        elif info['type'] == 'repeatable':
+            repeatable[code] = approved[code]
+        elif info['type'] == 'milestone':
+            milestone[code] = {
+                'completed': code in completed,
+                'count_b': approved['B'] if code in ('D', 'E') else 0,
+                'count_c': approved['C'] if code in ('F', 'G') else 0,
+            }
+    return {
+        'user': row,
+        'one_time': one_time,
+        'repeatable': repeatable,
+        'milestone': milestone,
+    }
+
+
+class UserSnapshot(NamedTuple):
+    """/sz 한 번의 상호작용 동안 보드 → 선택 → 모달로 넘겨지는 유저 상태 (불변).
+
+    UI 단계의 사전 확인은 이 값만 읽고, 최종 판단은 create_submission의 조건부 INSERT가 한다.
+    """
+    user_id: int
+    total_xp: int
+    completed_one_time: FrozenSet[str]
+
+    @classmethod
+    def from_board(cls, board: Dict) -> 'UserSnapshot':
+        """get_quest_board_data 결과로 생성 (추가 조회 없음)"""
+        return cls(
+            user_id=board['user']['user_id'],
+            total_xp=board['user']['total_xp'],
+            completed_one_time=frozenset(code for code, done in board['one_time'].items() if done),
+        )
+
+    def has_completed(self, mission_code: str) -> bool:
+        return mission_code in self.completed_one_time
+
+
 class Database:
     def __init__(self):
         """PostgreSQL 데이터베이스 초기화"""
         self.connection_string = os.getenv('DATABASE_URL') or os.getenv('DATABASE_PUBLIC_URL')
         if not self.connection_string:
             raise ValueError("DATABASE_URL 또는 DATABASE_PUBLIC_URL 환경 변수가 설정되지 않았습니다.")
-        self.init_database()
-    
-    def get_connection(self):
-        """데이터베이스 연결 반환"""
-        conn = psycopg2.connect(self.connection_string)
-        return conn
+        self.pool = ConnectionPool(
+            self.connection_string,
+            minconn=int(os.getenv('DB_POOL_MIN', '1')),
+            maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+            max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+            checkout_timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        )
+        self._schema_lock = threading.Lock()
+        self._schema_verified = False
     
+    def connection(self):
+        """풀에서 연결을 빌려오는 컨텍스트 매니저 (with 블록 종료 시 자동 반납). 첫 사용 시 스키마 확인."""
+        if not self._schema_verified:
+            self.ensure_schema()
+        return self.pool.connection()
+
+    def ensure_schema(self) -> None:
+        """스키마가 최신인지 한 번만 확인하고, 미적용 마이그레이션이 있을 때만 init_database 실행"""
+        with self._schema_lock:
+            if self._schema_verified:
+                return
+            with self.pool.connection() as conn:
+                current = migrate.is_current(conn)
+            if not current:
+                self.init_database()
+            self._schema_verified = True
+
+    def pool_stats(self) -> Dict:
+        """연결 풀 상태 조회"""
+        return self.pool.stats()
+
+    def close(self) -> None:
+        """연결 풀 종료"""
+        self.pool.closeall()
+
     def init_database(self):
-        """데이터베이스 초기화 및 테이블 생성"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # 사용자 테이블 (새로운 구조)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id BIGINT PRIMARY KEY,
-                    total_submissions INTEGER DEFAULT 0,
-                    approved_count INTEGER DEFAULT 0,
-                    total_xp INTEGER DEFAULT 0,
-                    tier INTEGER DEFAULT 1,
-                    tier_name VARCHAR(50) DEFAULT 'Code SZ',
-                    link_list TEXT[] DEFAULT '{}',
-                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # 기존 테이블에 tier, tier_name 컬럼 추가 (PostgreSQL 14+ 또는 try/except)
+        """미적용 마이그레이션 적용 (advisory lock으로 레플리카 간 동시 실행 방지).
+
+        CREATE INDEX CONCURRENTLY 같은 no-transaction 마이그레이션은 부팅 시 건너뛰며
+        `python migrate.py apply --concurrently` 로 따로 적용한다.
+        """
+        with self.pool.connection() as conn:
             try:
-                cursor.execute('ALTER TABLE users ADD COLUMN IF NOT EXISTS tier INTEGER DEFAULT 1')
-                cursor.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS tier_name VARCHAR(50) DEFAULT 'Code SZ'")
-            except Exception:
-                pass
-            
-            # 제출 기록 테이블 (상세 기록용)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS submissions (
-                    submission_id SERIAL PRIMARY KEY,
-                    user_id BIGINT NOT NULL,
-                    mission_code VARCHAR(10) NOT NULL,
-                    link TEXT NOT NULL,
-                    status VARCHAR(20) DEFAULT 'pending',
-                    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    approved_at TIMESTAMP,
-                    rejection_reason TEXT,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # 완료된 퀘스트 기록 테이블 (마일스톤 포함)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS completed_quests (
-                    completion_id SERIAL PRIMARY KEY,
-                    user_id BIGINT NOT NULL,
-                    mission_code VARCHAR(10) NOT NULL,
-                    xp_earned INTEGER NOT NULL,
-                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
-                    UNIQUE(user_id, mission_code)
-                )
-            ''')
-            
-            # XP 로그 테이블
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS xp_logs (
-                    id SERIAL PRIMARY KEY,
-                    user_id BIGINT NOT NULL,
-                    mission_name VARCHAR(255) NOT NULL,
-                    xp_amount INTEGER NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # 인덱스 생성
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_submissions_user 
-                ON submissions(user_id)
-            ''')
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_submissions_status 
-                ON submissions(status)
-            ''')
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_completed_quests_user 
-                ON completed_quests(user_id)
-            ''')
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_xp_logs_user 
-                ON xp_logs(user_id)
-            ''')
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_xp_logs_created_at 
-                ON xp_logs(created_at DESC)
-            ''')
-            
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ 데이터베이스 초기화 오류: {e}")
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+                migrate.apply(conn)
+            except Exception as e:
+                print(f"❌ 데이터베이스 초기화 오류: {e}")
+                raise
     
     def register_user(self, user_id: int) -> bool:
         """사용자 등록 (처음 사용 시)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                INSERT INTO users (user_id, tier, tier_name) 
-                VALUES (%s, 1, 'Code SZ')
-                ON CONFLICT (user_id) DO NOTHING
-            ''', (user_id,))
-            conn.commit()
-            return cursor.rowcount > 0
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ 사용자 등록 오류: {e}")
-            return False
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute('''
+                    INSERT INTO users (user_id, tier, tier_name) 
+                    VALUES (%s, 1, 'Code SZ')
+                    ON CONFLICT (user_id) DO NOTHING
+                ''', (user_id,))
+                conn.commit()
+                return cursor.rowcount > 0
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ 사용자 등록 오류: {e}")
+                return False
+            finally:
+                cursor.close()
     
     def get_user(self, user_id: int) -> Optional[Dict]:
         """사용자 정보 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            cursor.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            try:
+                cursor.execute('SELECT * FROM users WHERE user_id = %s', (user_id,))
+                row = cursor.fetchone()
+                if row:
+                    return dict(row)
+                return None
+            finally:
+                cursor.close()
     
     def get_or_create_user(self, user_id: int) -> Dict:
         """사용자 정보 조회 또는 생성"""
@@ -188,466 +832,574 @@ class Database:
             user = self.get_user(user_id)
         return user
     
-    def create_submission(self, user_id: int, mission_code: str, link: str) -> int:
-        """제출 생성"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # 제출 기록 추가
-            cursor.execute('''
-                INSERT INTO submissions (user_id, mission_code, link, status)
-                VALUES (%s, %s, %s, 'pending')
-                RETURNING submission_id
-            ''', (user_id, mission_code, link))
-            
-            submission_id = cursor.fetchone()[0]
-            
-            # 사용자 테이블 업데이트 (total_submissions, link_list)
-            cursor.execute('''
-                UPDATE users
-                SET total_submissions = total_submissions + 1,
-                    link_list = array_append(link_list, %s)
-                WHERE user_id = %s
-            ''', (link, user_id))
-            
-            conn.commit()
-            return submission_id
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ 제출 생성 오류: {e}")
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+    def create_submission(self, user_id: int, mission_code: str, link: str) -> Optional[int]:
+        """제출 생성. 이미 완료한 원타임 퀘스트면 아무것도 기록하지 않고 None."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                # 제출 기록 추가 (원타임 완료 여부 확인 포함)
+                cursor.execute(CREATE_SUBMISSION_SQL, {
+                    'user_id': user_id,
+                    'mission_code': mission_code,
+                    'link': link,
+                    'one_time': QUEST_INFO[mission_code]['type'] == 'one-time',
+                })
+                row = cursor.fetchone()
+                if row is None:
+                    conn.rollback()
+                    return None
+                submission_id = row[0]
+
+                # 사용자 테이블 업데이트 (total_submissions, link_list)
+                cursor.execute('''
+                    UPDATE users
+                    SET total_submissions = total_submissions + 1,
+                        link_list = array_append(link_list, %s)
+                    WHERE user_id = %s
+                ''', (link, user_id))
+
+                # 관리자 채널 티켓은 커밋과 함께 아웃박스에 기록 (전송은 봇 디스패처가 담당)
+                cursor.execute(ENQUEUE_OUTBOX_SQL, ('admin_ticket', outbox_payload(
+                    submission_id=submission_id, user_id=user_id, mission_code=mission_code, link=link,
+                )))
+
+                conn.commit()
+                return submission_id
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ 제출 생성 오류: {e}")
+                raise
+            finally:
+                cursor.close()
     
     def get_submission(self, submission_id: int) -> Optional[Dict]:
         """제출 정보 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            cursor.execute('SELECT * FROM submissions WHERE submission_id = %s', (submission_id,))
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            try:
+                cursor.execute('SELECT * FROM submissions WHERE submission_id = %s', (submission_id,))
+                row = cursor.fetchone()
+                if row:
+                    return dict(row)
+                return None
+            finally:
+                cursor.close()
     
-    def approve_submission(self, submission_id: int) -> Tuple[bool, Optional[str], List[Dict]]:
-        """제출 승인 및 XP 추가"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # 제출 정보 조회
-            submission = self.get_submission(submission_id)
-            if not submission:
-                return False, "제출을 찾을 수 없습니다.", []
-            
-            if submission['status'] != 'pending':
-                return False, "이미 처리된 제출입니다.", []
-            
-            user_id = submission['user_id']
-            mission_code = submission['mission_code']
-            
-            # 원타임 퀘스트 중복 체크
-            quest_info = QUEST_INFO.get(mission_code)
-            if not quest_info:
-                return False, "유효하지 않은 미션 코드입니다.", []
-            
-            if quest_info['type'] == 'one-time':
-                cursor.execute('''
-                    SELECT COUNT(*) FROM completed_quests
-                    WHERE user_id = %s AND mission_code = %s
-                ''', (user_id, mission_code))
-                if cursor.fetchone()[0] > 0:
-                    return False, "이미 완료한 원타임 퀘스트입니다.", []
-            
-            # 제출 상태 업데이트
-            cursor.execute('''
-                UPDATE submissions
-                SET status = 'approved', approved_at = CURRENT_TIMESTAMP
-                WHERE submission_id = %s
-            ''', (submission_id,))
-            
-            # XP 추가 및 사용자 테이블 업데이트
-            xp_earned = quest_info['xp']
-            mission_name = f"Mission {mission_code}: {quest_info['name']}"
-            
-            cursor.execute('''
-                UPDATE users
-                SET total_xp = total_xp + %s,
-                    approved_count = approved_count + 1
-                WHERE user_id = %s
-            ''', (xp_earned, user_id))
-            self._update_user_tier_in_db(user_id, cursor)
-            
-            # XP 로그 기록
-            cursor.execute('''
-                INSERT INTO xp_logs (user_id, mission_name, xp_amount)
-                VALUES (%s, %s, %s)
-            ''', (user_id, mission_name, xp_earned))
-            
-            # 완료된 퀘스트 기록 (원타임만 기록)
-            if quest_info['type'] == 'one-time':
+    def approve_submission(self, submission_id: int) -> Tuple[bool, Optional[str], Optional[Dict]]:
+        """제출 승인 및 XP 추가 (잠금 + 커밋 1회의 단일 트랜잭션).
+
+        성공 시 (True, 메시지, 결과) 를 반환하며 결과에는 user_id, mission_code, xp_earned,
+        total_xp, tier, tier_name, approved_count, milestones 가 들어 있어 호출 측에서 다시 조회할 필요가 없다.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            try:
+                cursor.execute(APPROVE_LOCK_SQL, (submission_id,))
+                submission = cursor.fetchone()
+                if not submission:
+                    conn.rollback()
+                    return False, "제출을 찾을 수 없습니다.", None
+
+                if submission['status'] != 'pending':
+                    conn.rollback()
+                    return False, "이미 처리된 제출입니다.", None
+
+                user_id = submission['user_id']
+                mission_code = submission['mission_code']
+
+                # 원타임 퀘스트 중복 체크
+                quest_info = QUEST_INFO.get(mission_code)
+                if not quest_info:
+                    conn.rollback()
+                    return False, "유효하지 않은 미션 코드입니다.", None
+
+                if quest_info['type'] == 'one-time' and submission['already_completed']:
+                    conn.rollback()
+                    return False, "이미 완료한 원타임 퀘스트입니다.", None
+
+                # 제출 상태 업데이트
                 cursor.execute('''
-                    INSERT INTO completed_quests (user_id, mission_code, xp_earned)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (user_id, mission_code) DO NOTHING
-                ''', (user_id, mission_code, xp_earned))
-            
-            conn.commit()
-            
-            # 누적 마일스톤 체크
-            milestone_rewards = self._check_milestones(user_id, mission_code, cursor)
-            
-            # 마일스톤으로 XP가 추가됐을 수 있으므로 티어 재계산
-            self._update_user_tier_in_db(user_id, cursor)
-            conn.commit()
-            return True, f"{xp_earned} XP를 획득했습니다.", milestone_rewards
-            
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ 승인 처리 오류: {e}")
-            return False, f"오류 발생: {str(e)}", []
-        finally:
-            cursor.close()
-            conn.close()
-    
-    def _update_user_tier_in_db(self, user_id: int, cursor) -> None:
-        """현재 total_xp 기준으로 users 테이블의 tier, tier_name 갱신 (cursor 사용)"""
-        cursor.execute('SELECT total_xp FROM users WHERE user_id = %s', (user_id,))
-        row = cursor.fetchone()
-        if not row:
-            return
-        total_xp = row[0]
-        tier = self.get_user_tier(total_xp)
-        tier_name = TIER_SYSTEM[tier]['name']
-        cursor.execute(
-            'UPDATE users SET tier = %s, tier_name = %s WHERE user_id = %s',
-            (tier, tier_name, user_id),
-        )
+                    UPDATE submissions
+                    SET status = 'approved', approved_at = CURRENT_TIMESTAMP
+                    WHERE submission_id = %s
+                ''', (submission_id,))
+
+                # 완료된 퀘스트 기록 (원타임만 기록). 잠금 대기 중 다른 승인이 먼저 완료했으면 여기서 걸러짐
+                xp_earned = quest_info['xp']
+                if quest_info['type'] == 'one-time':
+                    cursor.execute('''
+                        INSERT INTO completed_quests (user_id, mission_code, xp_earned)
+                        VALUES (%s, %s, %s)
+                        ON CONFLICT (user_id, mission_code) DO NOTHING
+                        RETURNING completion_id
+                    ''', (user_id, mission_code, xp_earned))
+                    if cursor.fetchone() is None:
+                        conn.rollback()
+                        return False, "이미 완료한 원타임 퀘스트입니다.", None
+
+                # 미션 카운터 증가 후 누적 마일스톤 체크
+                cursor.execute(INCREMENT_MISSION_STAT_SQL, (user_id, mission_code))
+                approved_count = cursor.fetchone()['approved_count']
+                milestone_rewards = self._check_milestones(user_id, mission_code, approved_count, cursor)
+                total_earned = xp_earned + sum(r['xp'] for r in milestone_rewards)
+
+                # XP 추가 + 티어 재계산 (UPDATE 1회)
+                cursor.execute(APPROVE_USER_UPDATE_SQL, {'xp': total_earned, 'user_id': user_id})
+                updated = cursor.fetchone()
+
+                # XP 로그 기록 (미션 + 마일스톤을 한 번에)
+                log_rows = [(user_id, f"Mission {mission_code}: {quest_info['name']}", xp_earned)]
+                log_rows += [
+                    (user_id, f"Mission {r['mission']}: {QUEST_INFO[r['mission']]['name']} (Milestone)", r['xp'])
+                    for r in milestone_rewards
+                ]
+                execute_values(
+                    cursor,
+                    'INSERT INTO xp_logs (user_id, mission_name, xp_amount) VALUES %s',
+                    log_rows,
+                )
+
+                result = {
+                    'submission_id': submission_id,
+                    'user_id': user_id,
+                    'mission_code': mission_code,
+                    'xp_earned': xp_earned,
+                    'total_xp': updated['total_xp'],
+                    'tier': updated['tier'],
+                    'tier_name': updated['tier_name'],
+                    'approved_count': updated['approved_count'],
+                    'milestones': milestone_rewards,
+                }
+                # 승인 알림 DM은 같은 트랜잭션에서 아웃박스에 기록
+                cursor.execute(ENQUEUE_OUTBOX_SQL, ('approval_dm', approval_notice(result)))
+
+                conn.commit()
+                return True, f"{xp_earned} XP를 획득했습니다.", result
+
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ 승인 처리 오류: {e}")
+                return False, f"오류 발생: {str(e)}", None
+            finally:
+                cursor.close()
     
-    def _check_milestones(self, user_id: int, approved_mission: str, cursor) -> List[Dict]:
-        """누적 마일스톤 체크 및 보상 지급"""
-        rewards = []
-        
-        # Mission B (비디오) 승인 시 D, E 체크
-        if approved_mission == 'B':
-            cursor.execute('''
-                SELECT COUNT(*) FROM submissions
-                WHERE user_id = %s AND mission_code = 'B' AND status = 'approved'
-            ''', (user_id,))
-            video_count = cursor.fetchone()[0]
-            
-            # Mission D: 5개 비디오
-            if video_count == 5:
-                if self._grant_milestone(user_id, 'D', cursor):
-                    rewards.append({'mission': 'D', 'xp': 200})
-            
-            # Mission E: 10개 비디오
-            if video_count == 10:
-                if self._grant_milestone(user_id, 'E', cursor):
-                    rewards.append({'mission': 'E', 'xp': 500})
-        
-        # Mission C (스트리밍) 승인 시 F, G 체크
-        elif approved_mission == 'C':
-            cursor.execute('''
-                SELECT COUNT(*) FROM submissions
-                WHERE user_id = %s AND mission_code = 'C' AND status = 'approved'
-            ''', (user_id,))
-            stream_count = cursor.fetchone()[0]
-            
-            # Mission F: 3개 스트림
-            if stream_count == 3:
-                if self._grant_milestone(user_id, 'F', cursor):
-                    rewards.append({'mission': 'F', 'xp': 150})
-            
-            # Mission G: 6개 스트림
-            if stream_count == 6:
-                if self._grant_milestone(user_id, 'G', cursor):
-                    rewards.append({'mission': 'G', 'xp': 300})
+    def _check_milestones(self, user_id: int, approved_mission: str, approved_count: int, cursor) -> List[Dict]:
+        """누적 마일스톤 체크 및 완료 기록. approved_count는 방금 승인까지 포함한 카운터 값.
+
+        XP 가산은 호출 측 UPDATE에서 한 번에 처리.
+        """
+        milestones = MILESTONES.get(approved_mission)
+        if not milestones:
+            return []
         
+        rewards = []
+        for milestone_code, threshold in milestones:
+            if approved_count == threshold and self._grant_milestone(user_id, milestone_code, cursor):
+                rewards.append({'mission': milestone_code, 'xp': QUEST_INFO[milestone_code]['xp']})
         return rewards
     
     def _grant_milestone(self, user_id: int, mission_code: str, cursor) -> bool:
-        """마일스톤 보상 지급"""
+        """마일스톤 완료 기록. 이미 완료한 마일스톤이면 False."""
         quest_info = QUEST_INFO.get(mission_code)
         if not quest_info:
             return False
         
-        # 이미 완료했는지 체크
-        cursor.execute('''
-            SELECT COUNT(*) FROM completed_quests
-            WHERE user_id = %s AND mission_code = %s
-        ''', (user_id, mission_code))
-        if cursor.fetchone()[0] > 0:
-            return False
-        
-        # XP 추가
-        xp_earned = quest_info['xp']
-        mission_name = f"Mission {mission_code}: {quest_info['name']} (Milestone)"
-        
-        cursor.execute('''
-            UPDATE users
-            SET total_xp = total_xp + %s
-            WHERE user_id = %s
-        ''', (xp_earned, user_id))
-        self._update_user_tier_in_db(user_id, cursor)
-        
-        # XP 로그 기록
-        cursor.execute('''
-            INSERT INTO xp_logs (user_id, mission_name, xp_amount)
-            VALUES (%s, %s, %s)
-        ''', (user_id, mission_name, xp_earned))
-        
-        # 완료 기록
         cursor.execute('''
             INSERT INTO completed_quests (user_id, mission_code, xp_earned)
             VALUES (%s, %s, %s)
             ON CONFLICT (user_id, mission_code) DO NOTHING
-        ''', (user_id, mission_code, xp_earned))
-        
-        return True
+            RETURNING completion_id
+        ''', (user_id, mission_code, quest_info['xp']))
+        return cursor.fetchone() is not None
     
     def reject_submission(self, submission_id: int, reason: str = None) -> bool:
-        """제출 거부"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                UPDATE submissions
-                SET status = 'rejected', rejection_reason = %s
-                WHERE submission_id = %s
-            ''', (reason, submission_id))
-            
-            conn.commit()
-            return True
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ 거부 처리 오류: {e}")
-            return False
-        finally:
-            cursor.close()
-            conn.close()
+        """제출 거부 (반려 알림 DM은 같은 트랜잭션에서 아웃박스에 기록). 대기 중인 제출이 없으면 False."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(REJECT_SUBMISSION_SQL, (reason, submission_id))
+                row = cursor.fetchone()
+                if row is None:
+                    conn.rollback()
+                    return False
+
+                cursor.execute(ENQUEUE_OUTBOX_SQL, ('rejection_dm', outbox_payload(
+                    submission_id=submission_id, user_id=row[0], mission_code=row[1], reason=reason,
+                )))
+                conn.commit()
+                return True
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ 거부 처리 오류: {e}")
+                return False
+            finally:
+                cursor.close()
     
     def get_rejected_submissions(self, user_id: int) -> List[Dict]:
         """사용자의 반려된 제출 목록 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            cursor.execute('''
-                SELECT * FROM submissions
-                WHERE user_id = %s AND status = 'rejected'
-                ORDER BY submitted_at DESC
-            ''', (user_id,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+        return self.get_user_submissions(user_id, 'rejected')
     
     def get_quest_board_data(self, user_id: int) -> Dict:
-        """퀘스트 보드(/sz)용 데이터를 한 번에 조회. 이벤트 루프 블로킹 방지를 위해 to_thread에서 호출용."""
-        user = self.get_or_create_user(user_id)
-        rejected_submissions = self.get_rejected_submissions(user_id)
-        one_time: Dict[str, bool] = {}
-        repeatable: Dict[str, int] = {}
-        milestone: Dict[str, Dict] = {}
-        for code, info in QUEST_INFO.items():
-            if info['type'] == 'one-time':
-                one_time[code] = self.is_quest_completed(user_id, code)
-            elif info['type'] == 'repeatable':
-                repeatable[code] = self.get_approved_count(user_id, code)
-            elif info['type'] == 'milestone':
-                milestone[code] = {
-                    'completed': self.is_quest_completed(user_id, code),
-                    'count_b': self.get_approved_count(user_id, 'B') if code in ('D', 'E') else 0,
-                    'count_c': self.get_approved_count(user_id, 'C') if code in ('F', 'G') else 0,
-                }
-        return {
-            'user': user,
-            'rejected_submissions': rejected_submissions,
-            'one_time': one_time,
-            'repeatable': repeatable,
-            'milestone': milestone,
-        }
+        """퀘스트 보드(/sz)용 데이터를 쿼리 1회로 조회 (유저가 없으면 생성)"""
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                row = None
+                # 동시에 다른 요청이 같은 유저를 먼저 만들면 이번 스냅샷에서는 행이 안 보일 수 있어 한 번 재시도
+                for _ in range(2):
+                    cursor.execute(QUEST_BOARD_SQL, {'user_id': user_id})
+                    row = cursor.fetchone()
+                    conn.commit()
+                    if row:
+                        break
+                return build_quest_board(row)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
     
     def get_user_submissions(self, user_id: int, status: Optional[str] = None) -> List[Dict]:
-        """사용자의 제출 목록 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            if status:
-                cursor.execute('''
-                    SELECT * FROM submissions
-                    WHERE user_id = %s AND status = %s
-                    ORDER BY submitted_at DESC
-                ''', (user_id, status))
-            else:
-                cursor.execute('''
-                    SELECT * FROM submissions
-                    WHERE user_id = %s
-                    ORDER BY submitted_at DESC
-                ''', (user_id,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
-    
+        """사용자의 제출 목록 조회 (최신순 전체)"""
+        return list(self.iter_submissions(user_id=user_id, status=status, newest_first=True))
+
+    def get_user_submissions_page(
+        self,
+        user_id: int,
+        status: Optional[str] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 50,
+    ) -> List[Dict]:
+        """사용자의 제출 한 페이지 (최신순). after는 직전 페이지 마지막 행의 submission_cursor."""
+        return self._fetch_submissions(*submissions_query(user_id, status, after, limit, newest_first=True))
+
+    def _fetch_submissions(self, sql: str, params: Dict) -> List[Dict]:
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                cursor.execute(sql, params)
+                return [dict(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+    def iter_submissions(
+        self,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None,
+        newest_first: bool = False,
+        batch_size: int = 500,
+    ) -> Iterator[Dict]:
+        """제출 전체를 서버 측 커서로 batch_size개씩 받아 하나씩 내보내는 제너레이터.
+
+        순회가 끝나거나 제너레이터가 닫힐 때까지 풀 연결 하나를 점유한다.
+        """
+        sql, params = submissions_query(user_id, status, newest_first=newest_first)
+        with self.connection() as conn:
+            cursor = conn.cursor('submissions_stream', cursor_factory=RealDictCursor)
+            cursor.itersize = batch_size
+            try:
+                cursor.execute(sql, params)
+                for row in cursor:
+                    yield dict(row)
+            finally:
+                cursor.close()
+                conn.rollback()
+
     def get_approved_count(self, user_id: int, mission_code: str) -> int:
-        """승인된 특정 미션 개수"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                SELECT COUNT(*) FROM submissions
-                WHERE user_id = %s AND mission_code = %s AND status = 'approved'
-            ''', (user_id, mission_code))
-            
-            count = cursor.fetchone()[0]
-            return count
-        finally:
-            cursor.close()
-            conn.close()
+        """승인된 특정 미션 개수 (user_mission_stats 카운터)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute('''
+                    SELECT approved_count FROM user_mission_stats
+                    WHERE user_id = %s AND mission_code = %s
+                ''', (user_id, mission_code))
+
+                row = cursor.fetchone()
+                return row[0] if row else 0
+            finally:
+                cursor.close()
+
+    def rebuild_mission_stats(self) -> Dict:
+        """user_mission_stats 카운터를 submissions 기준으로 재계산. {'repaired', 'removed'} 반환."""
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                # 재계산 중 승인 트랜잭션의 카운터 증가는 잠시 대기시켜 결과가 어긋나지 않게 함
+                cursor.execute('LOCK TABLE user_mission_stats IN SHARE ROW EXCLUSIVE MODE')
+                cursor.execute(REBUILD_MISSION_STATS_SQL)
+                result = dict(cursor.fetchone())
+                conn.commit()
+                return result
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ rebuild_mission_stats 오류: {e}")
+                raise
+            finally:
+                cursor.close()
     
+    def get_state(self, key: str) -> Optional[str]:
+        """bot_state 값 조회 (없으면 None)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT value FROM bot_state WHERE key = %s', (key,))
+                row = cursor.fetchone()
+                return row[0] if row else None
+            finally:
+                cursor.close()
+
+    def set_state(self, key: str, value: str) -> None:
+        """bot_state 값 저장 (있으면 덮어씀)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(SET_STATE_SQL, (key, value))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ set_state 오류: {e}")
+                raise
+            finally:
+                cursor.close()
+
+    def get_outbox_counts(self) -> Dict[str, int]:
+        """아웃박스 상태별 행 수 (pending / sent / dead)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status')
+                return {status: count for status, count in cursor.fetchall()}
+            finally:
+                cursor.close()
+
+    def requeue_dead_outbox(self) -> int:
+        """재시도를 포기한(dead) 아웃박스 행을 다시 전송 대기로 돌림. 되돌린 행 수 반환."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(REQUEUE_DEAD_OUTBOX_SQL)
+                requeued = cursor.rowcount
+                conn.commit()
+                return requeued
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ requeue_dead_outbox 오류: {e}")
+                raise
+            finally:
+                cursor.close()
+
     def is_quest_completed(self, user_id: int, mission_code: str) -> bool:
         """원타임 퀘스트 완료 여부"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('''
-                SELECT COUNT(*) FROM completed_quests
-                WHERE user_id = %s AND mission_code = %s
-            ''', (user_id, mission_code))
-            
-            count = cursor.fetchone()[0]
-            return count > 0
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute('''
+                    SELECT COUNT(*) FROM completed_quests
+                    WHERE user_id = %s AND mission_code = %s
+                ''', (user_id, mission_code))
+
+                count = cursor.fetchone()[0]
+                return count > 0
+            finally:
+                cursor.close()
     
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
         """리더보드 조회"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            cursor.execute('''
-                SELECT user_id, total_xp, approved_count, total_submissions
-                FROM users
-                ORDER BY total_xp DESC
-                LIMIT %s
-            ''', (limit,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            try:
+                cursor.execute('''
+                    SELECT user_id, total_xp, approved_count, total_submissions
+                    FROM users
+                    ORDER BY total_xp DESC, user_id
+                    LIMIT %s
+                ''', (limit,))
+
+                rows = cursor.fetchall()
+                return [dict(row) for row in rows]
+            finally:
+                cursor.close()
+
+    def get_user_xp_map(self) -> Dict[int, int]:
+        """전체 유저의 user_id → total_xp (역할 일괄 동기화용, 쿼리 1회)"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute('SELECT user_id, total_xp FROM users')
+                return dict(cursor.fetchall())
+            finally:
+                cursor.close()
     
+    def get_user_rank(self, user_id: int) -> Optional[Dict]:
+        """유저 한 명의 정확한 순위, 바로 위/아래 이웃, 다음 순위까지 필요한 XP (등록되지 않은 유저는 None)"""
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                cursor.execute(USER_RANK_SQL, {'user_id': user_id})
+                return build_user_rank(cursor.fetchone())
+            finally:
+                cursor.close()
+
     def get_user_tier(self, total_xp: int) -> int:
         """XP에 따른 티어 계산"""
-        tier = 1
-        for tier_level, tier_info in sorted(TIER_SYSTEM.items(), reverse=True):
-            if total_xp >= tier_info['xp_required']:
-                tier = tier_level
-                break
-        return tier
+        return tier_for_xp(total_xp)
     
     def get_pending_submissions(self) -> List[Dict]:
-        """대기 중인 제출 목록"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        try:
-            cursor.execute('''
-                SELECT * FROM submissions
-                WHERE status = 'pending'
-                ORDER BY submitted_at ASC
-            ''')
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+        """대기 중인 제출 목록 (오래된 순 전체)"""
+        return list(self.iter_submissions(status='pending'))
+
+    def get_pending_submissions_page(
+        self, after: Optional[Tuple[datetime, int]] = None, limit: int = 200, reverse: bool = False
+    ) -> List[Dict]:
+        """대기 중인 제출 한 페이지. after는 직전 페이지 마지막 행의 (submitted_at, submission_id).
+
+        reverse면 after 이전 행을 가까운 순으로 (이전 페이지용).
+        """
+        return self._fetch_submissions(
+            *submissions_query(status='pending', after=after, limit=limit, newest_first=reverse)
+        )
 
     def get_xp_logs(self, user_id: int, limit: int = 15) -> List[Dict]:
         """사용자의 XP 획득 이력 조회 (최신순)"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        try:
-            cursor.execute(
-                '''
-                SELECT mission_name, xp_amount, created_at
-                FROM xp_logs
-                WHERE user_id = %s
-                ORDER BY created_at DESC
-                LIMIT %s
-                ''',
-                (user_id, limit),
-            )
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            cursor.close()
-            conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+            try:
+                cursor.execute(
+                    '''
+                    SELECT mission_name, xp_amount, created_at
+                    FROM xp_logs
+                    WHERE user_id = %s
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                    ''',
+                    (user_id, limit),
+                )
+                rows = cursor.fetchall()
+                return [dict(row) for row in rows]
+            finally:
+                cursor.close()
     
-    def get_users_for_role_audit(self) -> List[Dict]:
-        """수동 롤 부여용: user_id, total_xp, tier, tier_name 목록 (total_xp 내림차순)"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            cursor.execute('''
-                SELECT user_id, total_xp, tier, tier_name
-                FROM users
-                ORDER BY total_xp DESC
-            ''')
-            rows = [dict(row) for row in cursor.fetchall()]
-            for r in rows:
-                if r.get('tier') is None or r.get('tier_name') is None:
-                    r['tier'] = self.get_user_tier(r['total_xp'])
-                    r['tier_name'] = TIER_SYSTEM[r['tier']]['name']
-            return rows
-        finally:
-            cursor.close()
-            conn.close()
+    def copy_export(self, out, table: str, fmt: str = 'csv', since: Optional[datetime] = None,
+                    until: Optional[datetime] = None, user_id: Optional[int] = None) -> int:
+        """테이블을 COPY ... TO STDOUT으로 out(바이너리 파일 객체)에 흘려 씀. 내보낸 행 수 반환."""
+        sql, params = export_copy_query(table, fmt, since, until, user_id)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.copy_expert(cursor.mogrify(sql, params).decode(), out)
+                return cursor.rowcount
+            finally:
+                cursor.close()
+
+    def bulk_import(self, files: Dict[str, object], dry_run: bool = False, skip_invalid: bool = False) -> Dict:
+        """CSV 일괄 가져오기. files는 {'users'|'submissions'|'xp_logs': 텍스트 파일 객체}.
+
+        각 파일을 COPY FROM STDIN으로 스테이징 테이블에 흘려 넣고, 검증 후 집합 연산으로
+        users / submissions / completed_quests / user_mission_stats / xp_logs에 병합한 뒤
+        영향받은 유저의 합계·티어를 한 번에 갱신한다. dry_run이면 같은 과정을 거친 뒤 롤백하고,
+        문제 행이 있으면 skip_invalid가 아닌 한 커밋하지 않는다(aborted).
+        승인 제출의 미션 XP와 새로 달성한 마일스톤은 원장(xp_logs)에 자동으로 기록되므로,
+        xp_logs 파일에는 제출과 무관한 XP만 넣는다.
+        """
+        report: Dict = {'dry_run': dry_run, 'aborted': False, 'staged': {}, 'problems': [], 'merged': {}}
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                cursor.execute(IMPORT_STAGING_SQL)
+                execute_values(cursor, 'INSERT INTO import_quests (mission_code, name, xp, type) VALUES %s', [
+                    (code, info['name'], info['xp'], info['type']) for code, info in QUEST_INFO.items()
+                ])
+                execute_values(cursor, 'INSERT INTO import_milestones (source_code, mission_code, threshold) VALUES %s', [
+                    (source, code, threshold) for source, milestones in MILESTONES.items() for code, threshold in milestones
+                ])
+                for table, f in files.items():
+                    report['staged'][table] = self._copy_import_file(cursor, table, f)
+
+                cursor.execute(IMPORT_VALIDATE_SUBMISSIONS_SQL)
+                cursor.execute(IMPORT_VALIDATE_XP_LOGS_SQL)
+                cursor.execute(IMPORT_PROBLEMS_SQL)
+                report['problems'] = [dict(row) for row in cursor.fetchall()]
+
+                for name, sql in (
+                    ('new_users', IMPORT_MERGE_USERS_SQL),
+                    ('submissions', IMPORT_MERGE_SUBMISSIONS_SQL),
+                    ('completed_quests', IMPORT_MERGE_COMPLETIONS_SQL),
+                    ('mission_stats', IMPORT_MERGE_MISSION_STATS_SQL),
+                    ('ledger_rows', IMPORT_LEDGER_SQL),
+                    ('milestones', IMPORT_MILESTONES_SQL),
+                    ('xp_logs', IMPORT_MERGE_XP_LOGS_SQL),
+                    ('users_updated', IMPORT_MERGE_TOTALS_SQL),
+                ):
+                    cursor.execute(sql)
+                    report['merged'][name] = cursor.rowcount
+                cursor.execute('SELECT COALESCE(SUM(xp_amount), 0) AS xp FROM import_ledger')
+                report['merged']['xp_added'] = cursor.fetchone()['xp']
+
+                report['aborted'] = bool(report['problems']) and not skip_invalid and not dry_run
+                if dry_run or report['aborted']:
+                    conn.rollback()
+                else:
+                    cursor.execute(BUMP_USERS_VERSION_SQL)
+                    conn.commit()
+                return report
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ 일괄 가져오기 오류: {e}")
+                raise
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _copy_import_file(cursor, table: str, f) -> int:
+        """CSV 헤더로 컬럼을 확인한 뒤 나머지를 COPY FROM STDIN으로 스트리밍. 적재한 행 수 반환."""
+        allowed, required = IMPORT_COLUMNS[table]
+        header = next(csv.reader([f.readline()]), [])
+        columns = [name.strip().lower() for name in header]
+        unknown = [name for name in columns if name not in allowed]
+        missing = [name for name in required if name not in columns]
+        if unknown or missing:
+            raise ValueError(f"{table} CSV 헤더 오류: 알 수 없는 컬럼 {unknown}, 필수 컬럼 누락 {missing}")
+        cursor.copy_expert(f"COPY import_{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", f)
+        return cursor.rowcount
+
+    def get_users_page(self, after: Optional[Tuple[int, int]] = None, limit: int = 25, reverse: bool = False) -> List[Dict]:
+        """수동 롤 부여용 유저 목록 한 페이지 (total_xp 내림차순).
+
+        after는 직전 페이지 마지막 행의 (total_xp, user_id). reverse면 after 이전 행을 가까운 순으로.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            try:
+                cursor.execute(*users_page_query(after, limit, reverse))
+                rows = [dict(row) for row in cursor.fetchall()]
+                fill_missing_tiers(rows)
+                return rows
+            finally:
+                cursor.close()
     
     def sync_all_users_tier(self) -> int:
-        """모든 유저의 tier, tier_name을 total_xp 기준으로 동기화. 갱신된 행 수 반환."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('SELECT user_id, total_xp FROM users')
-            rows = cursor.fetchall()
-            updated = 0
-            for (user_id, total_xp) in rows:
-                tier = self.get_user_tier(total_xp)
-                tier_name = TIER_SYSTEM[tier]['name']
-                cursor.execute(
-                    'UPDATE users SET tier = %s, tier_name = %s WHERE user_id = %s',
-                    (tier, tier_name, user_id),
-                )
-                updated += cursor.rowcount
-            conn.commit()
-            return updated
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ sync_all_users_tier 오류: {e}")
-            return 0
-        finally:
-            cursor.close()
-            conn.close()
\ No newline at end of file
+        """total_xp와 어긋난 tier, tier_name을 UPDATE 한 번으로 동기화. 바로잡은 행 수 반환."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(SYNC_ALL_TIERS_SQL)
+                drifted = cursor.rowcount
+                if drifted:
+                    cursor.execute(BUMP_USERS_VERSION_SQL)
+                conn.commit()
+                return drifted
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ sync_all_users_tier 오류: {e}")
+                return 0
+            finally:
+                cursor.close()
\ No newline at end of file
@@ -0,0 +1,227 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    """풀에서 제한 시간 내에 연결을 얻지 못했을 때 발생"""
+
+
+class _PooledConnection:
+    """풀이 관리하는 연결 + 생성/사용 시각"""
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """psycopg2 연결 풀 (스레드 안전, min/max 크기, 체크아웃 시 헬스 체크, 최대 수명).
+
+    to_thread 워커 여러 개가 동시에 사용하므로 모든 상태 변경은 Condition 안에서 수행한다.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = 1,
+        maxconn: int = 10,
+        max_lifetime: float = 1800.0,
+        idle_check_after: float = 30.0,
+        checkout_timeout: float = 10.0,
+    ):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"잘못된 풀 크기 설정입니다. minconn={minconn} maxconn={maxconn}")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_lifetime = max_lifetime
+        self.idle_check_after = idle_check_after
+        self.checkout_timeout = checkout_timeout
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._opening = 0
+        self._closed = False
+        self._stats = {
+            'connections_created': 0,
+            'connections_discarded': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append(self._open())
+
+    def _open(self) -> _PooledConnection:
+        conn = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._stats['connections_created'] += 1
+        return _PooledConnection(conn)
+
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        """연결 폐기 (Condition 밖에서 호출)"""
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats['connections_discarded'] += 1
+            self._cond.notify()
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        """체크아웃 직전 연결 상태 확인. 오래 놀던 연결만 SELECT 1 왕복으로 확인."""
+        conn = pooled.conn
+        if conn.closed:
+            return False
+        if time.monotonic() - pooled.created_at > self.max_lifetime:
+            return False
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - pooled.last_used > self.idle_check_after:
+            try:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                finally:
+                    cursor.close()
+                conn.rollback()
+            except Exception:
+                with self._cond:
+                    self._stats['health_check_failures'] += 1
+                return False
+        return True
+
+    def getconn(self):
+        """연결 체크아웃. 유휴 연결이 없고 최대 크기에 도달했으면 checkout_timeout 동안 대기."""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            pooled: Optional[_PooledConnection] = None
+            should_open = False
+            with self._cond:
+                waited = False
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("연결 풀이 이미 종료되었습니다.")
+                    if self._idle:
+                        # LIFO: 가장 최근에 반납된 연결을 재사용해 오래된 연결이 자연스럽게 만료되도록 함
+                        pooled = self._idle.pop()
+                        self._in_use[id(pooled.conn)] = pooled
+                        break
+                    if self._size() < self.maxconn:
+                        self._opening += 1
+                        should_open = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeout(
+                            f"{self.checkout_timeout}초 안에 DB 연결을 얻지 못했습니다. (max={self.maxconn})"
+                        )
+                    if not waited:
+                        self._stats['waits'] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+
+            if should_open:
+                try:
+                    pooled = self._open()
+                finally:
+                    with self._cond:
+                        self._opening -= 1
+                        if pooled is not None:
+                            self._in_use[id(pooled.conn)] = pooled
+                        else:
+                            self._cond.notify()
+                with self._cond:
+                    self._stats['checkouts'] += 1
+                return pooled.conn
+
+            if self._is_healthy(pooled):
+                with self._cond:
+                    self._stats['checkouts'] += 1
+                return pooled.conn
+
+            with self._cond:
+                self._in_use.pop(id(pooled.conn), None)
+            self._discard(pooled)
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """연결 반납. 열린 트랜잭션은 롤백하고, 만료/손상된 연결은 폐기."""
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            return
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        if (
+            discard
+            or conn.closed
+            or self._closed
+            or time.monotonic() - pooled.created_at > self.max_lifetime
+        ):
+            self._discard(pooled)
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """with 블록 동안 연결을 빌려주고 반납. 연결 계열 오류 시 해당 연결은 폐기."""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def stats(self) -> Dict:
+        """풀 상태 스냅샷 (크기, 유휴/사용 중 연결 수, 누적 카운터)"""
+        with self._cond:
+            return {
+                'min': self.minconn,
+                'max': self.maxconn,
+                'size': self._size(),
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                **self._stats,
+            }
+
+    def closeall(self) -> None:
+        """유휴 연결을 모두 닫고 풀을 종료. 사용 중인 연결은 반납 시 닫힘."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            try:
+                pooled.conn.close()
+            except Exception:
+                pass
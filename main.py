@@ -5,7 +5,15 @@ import os
 import asyncio
 import logging
 from dotenv import load_dotenv
-from database import Database
+from async_database import AsyncDatabase
+from services.command_sync import sync_command_tree
+from services.leaderboard_cache import LeaderboardCache
+from services.outbox import OutboxDispatcher
+from services.role_scheduler import RoleMutationScheduler
+from services.role_sync import RoleSyncService, reconcile_all_roles
+from services.ticket_resync import resync_admin_tickets
+from services.tier_roles import TierRoleCache
+from services.user_resolver import UserResolver
 
 # 환경 변수 로드
 load_dotenv()
@@ -23,10 +31,56 @@ intents = discord.Intents.default()
 intents.members = True  # Privileged Intent - Discord Developer Portal에서 활성화 필요
 # intents.message_content = True  # 메시지 내용을 읽지 않으므로 불필요
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+class SZBot(commands.Bot):
+    async def close(self):
+        # 게이트웨이/HTTP 세션이 닫히기 전에 대기 중인 역할 동기화를 마저 처리
+        role_sync = getattr(self, 'role_sync', None)
+        if role_sync is not None:
+            await role_sync.drain()
+        outbox = getattr(self, 'outbox', None)
+        if outbox is not None:
+            await outbox.stop()
+        try:
+            await super().close()
+        finally:
+            # 워커가 모두 멈춘 뒤 DB 연결 풀 종료
+            db = getattr(self, 'db', None)
+            if db is not None:
+                await db.close()
+
+bot = SZBot(command_prefix='!', intents=intents)
+
+# 데이터베이스 초기화 (프로세스 전체에서 하나만 생성, Cog는 bot.db로 공유)
+db = AsyncDatabase()
+bot.db = db
+
+# 리더보드 캐시 (승인으로 XP가 바뀌면 무효화)
+bot.leaderboard_cache = LeaderboardCache(db)
+db.add_xp_listener(bot.leaderboard_cache.on_xp_changed)
+
+# 유저 이름/DM 대상 해석 (길드 캐시 → LRU 캐시 → 일괄 조회)
+bot.user_resolver = UserResolver(bot)
+
+# 길드별 티어 역할 매핑 (역할 생성/수정/삭제 이벤트에서 무효화)
+bot.tier_roles = TierRoleCache()
+
+# 역할 변경 스케줄러 (멤버당 요청 1회, 동시 실행/요청 속도 제한, 429 백오프)
+bot.role_scheduler = RoleMutationScheduler()
+
+# 유저별 역할 동기화 요청 큐 (연속 요청은 합쳐서 마지막 XP 기준으로 1회 처리)
+bot.role_sync = RoleSyncService(bot)
+
+# 티켓/DM 아웃박스 디스패처 (트랜잭션과 함께 기록된 알림을 백그라운드에서 전송)
+bot.outbox = OutboxDispatcher(bot)
+
+# 시작 시 역할 일괄 동기화 작업 (중복 실행 방지용)
+role_reconcile_task = None
 
-# 데이터베이스 초기화
-db = Database()
+# 관리자 티켓 재동기화 작업 (프로세스당 한 번)
+ticket_resync_task = None
+
+# 재연결로 on_ready가 다시 와도 명령어 동기화 확인은 한 번만
+commands_checked = False
 
 @bot.event
 async def on_ready():
@@ -34,83 +88,48 @@ async def on_ready():
     print(f'봇 ID: {bot.user.id}')
     print(f'서버 수: {len(bot.guilds)}')
     
-    # 슬래시 명령어 동기화
-    try:
-        synced = await bot.tree.sync()
-        print(f'{len(synced)}개의 슬래시 명령어가 동기화되었습니다.')
-    except Exception as e:
-        print(f'명령어 동기화 중 오류 발생: {e}')
-    
-    # 서버 시작 시 모든 사용자 역할 업데이트 (백그라운드 실행해 슬래시 커맨드 3초 타임아웃 방지)
-    asyncio.create_task(update_all_user_roles())
-
-async def update_all_user_roles():
-    """서버의 모든 사용자 역할 업데이트. DB 호출은 to_thread로 해서 이벤트 루프(하트비트) 블로킹 방지."""
-    for guild in bot.guilds:
-        for member in guild.members:
-            if not member.bot:
-                try:
-                    user = await asyncio.to_thread(db.get_user, member.id)
-                except Exception as e:
-                    logger.warning("역할 업데이트용 유저 조회 실패 user_id=%s error=%s", member.id, e)
-                    continue
-                if user:
-                    await update_user_roles(member.id, guild, user=user)
-
-async def update_user_roles(user_id: int, guild: discord.Guild, *, user=None):
-    """사용자 역할 업데이트. user가 없으면 to_thread로 조회."""
-    from database import TIER_SYSTEM
-
-    if user is None:
+    # 슬래시 명령어 동기화 (프로세스당 한 번, 트리 해시가 바뀌었을 때만 API 호출)
+    global commands_checked
+    if not commands_checked:
         try:
-            user = await asyncio.to_thread(db.get_user, user_id)
+            synced = await sync_command_tree(bot)
+            commands_checked = True
+            if synced is None:
+                print('슬래시 명령어 변경 없음 - 동기화를 건너뜁니다.')
+            else:
+                print(f'{synced}개의 슬래시 명령어가 동기화되었습니다.')
         except Exception as e:
-            logger.warning("역할 업데이트용 유저 조회 실패 user_id=%s error=%s", user_id, e)
-            return
-    if not user:
-        return
-    
-    member = guild.get_member(user_id)
-    if not member:
-        return
-    
-    total_xp = user['total_xp']
-    current_tier = db.get_user_tier(total_xp)
-    
-    # 모든 티어 역할 찾기
-    tier_roles = {}
-    for tier_level, tier_info in TIER_SYSTEM.items():
-        role = discord.utils.get(guild.roles, name=tier_info['role_name'])
-        if role:
-            tier_roles[tier_level] = role
+            print(f'명령어 동기화 중 오류 발생: {e}')
     
-    # 현재 티어 이하의 모든 역할 부여
-    roles_to_add = []
-    for tier_level in range(1, current_tier + 1):
-        if tier_level in tier_roles:
-            roles_to_add.append(tier_roles[tier_level])
+    # 티어 역할 매핑 새로 빌드 (연결이 끊긴 동안 놓친 역할 이벤트 반영, 설정 문제는 여기서 경고)
+    for guild in bot.guilds:
+        bot.tier_roles.invalidate(guild.id)
+        bot.tier_roles.get(guild)
     
-    # 역할 추가 (없는 것만)
-    for role in roles_to_add:
-        if role not in member.roles:
-            try:
-                await member.add_roles(role, reason=f"티어 업그레이드: Lv.{current_tier}")
-            except discord.Forbidden:
-                logger.warning("역할 추가 권한 없음 (서버 역할 순서 확인) user_id=%s role=%s", user_id, role.name)
-            except Exception as e:
-                logger.warning("역할 추가 실패 user_id=%s role=%s error=%s", user_id, role.name, e)
+    # 서버 시작 시 모든 사용자 역할 업데이트 (백그라운드 실행해 슬래시 커맨드 3초 타임아웃 방지)
+    # 재연결로 on_ready가 다시 와도 이전 동기화가 돌고 있으면 새로 시작하지 않음
+    global role_reconcile_task
+    if role_reconcile_task is None or role_reconcile_task.done():
+        role_reconcile_task = asyncio.create_task(update_all_user_roles())
     
-    # 현재 티어보다 높은 역할 제거
-    for tier_level in range(current_tier + 1, 6):
-        if tier_level in tier_roles:
-            role = tier_roles[tier_level]
-            if role in member.roles:
-                try:
-                    await member.remove_roles(role, reason=f"티어 다운그레이드")
-                except discord.Forbidden:
-                    logger.warning("역할 제거 권한 없음 (서버 역할 순서 확인) user_id=%s role=%s", user_id, role.name)
-                except Exception as e:
-                    logger.warning("역할 제거 실패 user_id=%s role=%s error=%s", user_id, role.name, e)
+    # 봇이 꺼져 있던 동안 올리지 못한 관리자 티켓 재전송 (프로세스당 한 번)
+    global ticket_resync_task
+    if ticket_resync_task is None:
+        ticket_resync_task = asyncio.create_task(resync_admin_tickets_on_start())
+
+async def resync_admin_tickets_on_start():
+    """대기 중 제출의 관리자 티켓 누락분 재전송 예약"""
+    try:
+        await resync_admin_tickets(bot, db)
+    except Exception as e:
+        logger.exception("관리자 티켓 재동기화 실패 error=%s", e)
+
+async def update_all_user_roles():
+    """서버의 모든 사용자 역할 업데이트 (XP 일괄 조회 후 역할이 다른 멤버만 변경)"""
+    try:
+        await reconcile_all_roles(bot, db)
+    except Exception as e:
+        logger.exception("시작 시 역할 일괄 동기화 실패 error=%s", e)
 
 @bot.event
 async def on_member_join(member: discord.Member):
@@ -119,16 +138,24 @@ async def on_member_join(member: discord.Member):
         return
     
     # 사용자 등록
-    db.register_user(member.id)
+    await db.register_user(member.id)
     
     # 기본 역할 부여 (Lv2: SZ Streamer)
-    from database import TIER_SYSTEM
-    streamer_role = discord.utils.get(member.guild.roles, name=TIER_SYSTEM[2]['role_name'])
+    streamer_role = bot.tier_roles.get(member.guild).get(2)
     if streamer_role:
-        try:
-            await member.add_roles(streamer_role, reason="신규 멤버 기본 역할")
-        except:
-            pass
+        await bot.role_scheduler.apply(member, add=[streamer_role], reason="신규 멤버 기본 역할")
+
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    bot.tier_roles.invalidate(role.guild.id)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    bot.tier_roles.invalidate(after.guild.id)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    bot.tier_roles.invalidate(role.guild.id)
 
 # Cog 로드
 async def load_cogs():
@@ -194,7 +221,11 @@ async def on_app_command_error(interaction: discord.Interaction, error: app_comm
 # 봇 실행
 async def main():
     async with bot:
+        # 스키마 버전 확인 (최신이면 DDL 없이 조회 1회로 끝남)
+        await db.open()
+        await db.ensure_schema()
         await load_cogs()
+        bot.outbox.start()
         token = os.getenv('DISCORD_BOT_TOKEN')
         if not token:
             print("❌ 오류: DISCORD_BOT_TOKEN 환경 변수가 설정되지 않았습니다.")
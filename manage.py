@@ -0,0 +1,140 @@
+"""운영용 관리 CLI.
+
+사용법:
+    python manage.py rebuild-mission-stats   # user_mission_stats 카운터를 submissions 기준으로 재계산
+    python manage.py sync-tiers              # total_xp와 어긋난 users.tier / tier_name 바로잡기
+    python manage.py outbox-status           # 아웃박스 상태별 건수
+    python manage.py outbox-retry-dead       # 재시도를 포기한(dead) 알림을 다시 전송 대기로
+    python manage.py export submissions --since 2026-01-01 --until 2026-03-31 -o q1.csv.gz
+                                             # 테이블을 gzip CSV/JSONL로 스트리밍 내보내기
+    python manage.py import --users u.csv --submissions s.csv --xp-logs x.csv --dry-run
+                                             # CSV 일괄 가져오기 (COPY + 집합 병합, 먼저 --dry-run으로 확인)
+"""
+import argparse
+import gzip
+import sys
+from typing import List
+
+
+def rebuild_mission_stats(db, args) -> int:
+    result = db.rebuild_mission_stats()
+    print(f"✅ 미션 카운터 재계산 완료: 수정 {result['repaired']}건, 삭제 {result['removed']}건")
+    return 0
+
+
+def sync_tiers(db, args) -> int:
+    drifted = db.sync_all_users_tier()
+    print(f"✅ 티어 동기화 완료: 어긋난 유저 {drifted}명 수정")
+    return 0
+
+
+def outbox_status(db, args) -> int:
+    counts = db.get_outbox_counts()
+    print("📬 아웃박스: " + ", ".join(f"{status} {counts.get(status, 0)}건" for status in ('pending', 'sent', 'dead')))
+    return 0
+
+
+def outbox_retry_dead(db, args) -> int:
+    requeued = db.requeue_dead_outbox()
+    print(f"✅ dead 알림 {requeued}건을 다시 전송 대기로 돌렸습니다.")
+    return 0
+
+
+def export(db, args) -> int:
+    from services.export import export_filename, parse_date_range
+
+    since, until = parse_date_range(args.since, args.until)
+    output = args.output or export_filename(args.table, args.format)
+    with gzip.open(output, 'wb') as out:
+        rows = db.copy_export(out, args.table, args.format, since, until, args.user)
+    print(f"✅ {args.table} {rows}행을 {output} 에 내보냈습니다.")
+    return 0
+
+
+def export_args(parser: argparse.ArgumentParser) -> None:
+    from database import EXPORT_FORMATS, EXPORT_TABLES
+
+    parser.add_argument('table', choices=list(EXPORT_TABLES))
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--since', help="시작일 YYYY-MM-DD (포함)")
+    parser.add_argument('--until', help="종료일 YYYY-MM-DD (포함)")
+    parser.add_argument('--user', type=int, help="특정 user_id만")
+    parser.add_argument('-o', '--output', help="출력 파일 (기본: <table>_<시각>.<format>.gz)")
+
+
+def bulk_import(db, args) -> int:
+    paths = {'users': args.users, 'submissions': args.submissions, 'xp_logs': args.xp_logs}
+    paths = {table: path for table, path in paths.items() if path}
+    if not paths:
+        print("❌ 가져올 CSV 파일을 하나 이상 지정하세요 (--users / --submissions / --xp-logs).")
+        return 2
+    files = {table: open(path, encoding='utf-8-sig', newline='') for table, path in paths.items()}
+    try:
+        report = db.bulk_import(files, dry_run=args.dry_run, skip_invalid=args.skip_invalid)
+    finally:
+        for f in files.values():
+            f.close()
+
+    print("📥 스테이징: " + ", ".join(f"{table} {count}행" for table, count in report['staged'].items()))
+    for problem in report['problems']:
+        rows = ", ".join(str(row) for row in problem['rows'])
+        print(f"⚠️  {problem['source']} {problem['problem']}: {problem['count']}행 (데이터 행 번호 예: {rows})")
+    print("🔀 병합: " + ", ".join(f"{name} {count}" for name, count in report['merged'].items()))
+    if report['dry_run']:
+        print("ℹ️  dry-run - 변경 사항을 롤백했습니다.")
+    elif report['aborted']:
+        print("❌ 문제 행이 있어 롤백했습니다. 문제 행을 빼고 진행하려면 --skip-invalid를 붙이세요.")
+        return 1
+    else:
+        print("✅ 가져오기 완료")
+    return 0
+
+
+def import_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--users', help="user_id[, registered_at]")
+    parser.add_argument('--submissions', help="user_id, mission_code, link[, status, submitted_at, approved_at]")
+    parser.add_argument('--xp-logs', help="user_id, mission_name, xp_amount[, created_at] (제출과 무관한 XP만)")
+    parser.add_argument('--dry-run', action='store_true', help="검증/병합 결과만 보고하고 롤백")
+    parser.add_argument('--skip-invalid', action='store_true', help="문제 행을 건너뛰고 나머지만 반영")
+
+
+COMMANDS = {
+    'rebuild-mission-stats': (rebuild_mission_stats, "user_mission_stats 카운터 재계산 (백필/복구)"),
+    'sync-tiers': (sync_tiers, "total_xp 기준으로 tier / tier_name 일괄 동기화"),
+    'outbox-status': (outbox_status, "아웃박스(티켓/DM 전송 대기열) 상태별 건수"),
+    'outbox-retry-dead': (outbox_retry_dead, "전송 포기(dead)된 알림 재전송 예약"),
+    'export': (export, "테이블을 COPY로 gzip CSV/JSONL 파일에 내보내기"),
+    'import': (bulk_import, "CSV 일괄 가져오기 (users / submissions / xp_logs)"),
+}
+
+# 인자가 필요한 명령의 인자 정의
+COMMAND_ARGS = {
+    'export': export_args,
+    'import': import_args,
+}
+
+
+def main(argv: List[str] = None) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Spot Zero 봇 관리 명령")
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        command_parser = sub.add_parser(name, help=help_text)
+        if name in COMMAND_ARGS:
+            COMMAND_ARGS[name](command_parser)
+    args = parser.parse_args(argv)
+
+    from database import Database
+
+    db = Database()
+    try:
+        handler, _ = COMMANDS[args.command]
+        return handler(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
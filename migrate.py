@@ -0,0 +1,237 @@
+"""스키마 마이그레이션 러너.
+
+migrations/NNNN_name.sql 파일을 번호 순으로 적용하고 schema_migrations 테이블에 기록한다.
+첫 줄 근처에 `-- migrate: no-transaction` 이 있는 파일(CREATE INDEX CONCURRENTLY 등)은
+트랜잭션 밖에서 실행해야 하므로 부팅 시에는 건너뛰고 이 CLI(apply --concurrently)로만 적용한다.
+CONCURRENTLY 인덱스 생성이 중간에 실패하면 INVALID 인덱스가 남아 IF NOT EXISTS가 그냥 통과하므로,
+다시 적용할 때 INVALID 인덱스를 먼저 지우고 새로 만든다.
+
+사용법:
+    python migrate.py status
+    python migrate.py apply                  # 트랜잭션 마이그레이션만 적용 (부팅 시와 동일)
+    python migrate.py apply --concurrently   # no-transaction 마이그레이션까지 적용
+"""
+import argparse
+import os
+import re
+import sys
+from typing import Dict, List, NamedTuple, Set
+
+import psycopg2
+import psycopg2.errors
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# 여러 레플리카가 동시에 부팅해도 마이그레이션은 한 곳에서만 실행되도록 잡는 advisory lock 키
+MIGRATION_LOCK_ID = 0x535A_0001
+
+_FILENAME_RE = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+_NO_TRANSACTION_RE = re.compile(r'^--\s*migrate:\s*no-transaction\s*$', re.MULTILINE)
+_CONCURRENT_INDEX_RE = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)', re.IGNORECASE
+)
+
+# no-transaction 마이그레이션 적용 명령 (부팅 경고와 건너뛸 때 안내에 같이 사용)
+APPLY_NO_TRANSACTION_COMMAND = 'python migrate.py apply --concurrently'
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    sql: str
+    transactional: bool
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """migrations 디렉터리의 SQL 파일을 버전 순으로 읽기"""
+    migrations = []
+    seen: Set[int] = set()
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in seen:
+            raise ValueError(f"중복된 마이그레이션 번호입니다: {version:04d}")
+        seen.add(version)
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            sql = f.read()
+        migrations.append(Migration(
+            version=version,
+            name=match.group(2),
+            sql=sql,
+            transactional=not _NO_TRANSACTION_RE.search(sql),
+        ))
+    return migrations
+
+
+def _ensure_migrations_table(cursor) -> None:
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def applied_versions(conn) -> Set[int]:
+    """적용된 마이그레이션 번호 집합 (schema_migrations가 없으면 빈 집합)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT version FROM schema_migrations')
+        return {row[0] for row in cursor.fetchall()}
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return set()
+    finally:
+        cursor.close()
+
+
+def is_current(conn, migrations: List[Migration] = None) -> bool:
+    """부팅 경로용 확인: 트랜잭션 마이그레이션이 모두 적용됐는지 (쿼리 1회)"""
+    migrations = migrations if migrations is not None else load_migrations()
+    applied = applied_versions(conn)
+    conn.rollback()
+    return all(m.version in applied for m in migrations if m.transactional)
+
+
+def pending_no_transaction(applied: Set[int], migrations: List[Migration] = None) -> List[Migration]:
+    """부팅 시 적용하지 않는 no-transaction 마이그레이션 중 아직 적용되지 않은 것"""
+    migrations = migrations if migrations is not None else load_migrations()
+    return [m for m in migrations if not m.transactional and m.version not in applied]
+
+
+def _split_statements(sql: str) -> List[str]:
+    """no-transaction 파일을 문장 단위로 분리 (여러 문장을 한 번에 보내면 암묵적 트랜잭션이 됨)"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def _drop_invalid_index(cursor, statement: str, log=print) -> None:
+    """이전에 실패한 CREATE INDEX CONCURRENTLY가 남긴 INVALID 인덱스 삭제 (autocommit 상태에서 호출)"""
+    match = _CONCURRENT_INDEX_RE.match(statement)
+    if not match:
+        return
+    index_name = match.group(1)
+    cursor.execute('''
+        SELECT 1 FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND NOT i.indisvalid
+    ''', (index_name,))
+    if cursor.fetchone():
+        log(f"♻️  이전 실패로 남은 INVALID 인덱스 {index_name} 삭제 후 다시 생성")
+        cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+
+def apply(conn, include_no_transaction: bool = False, log=print) -> List[Migration]:
+    """미적용 마이그레이션을 advisory lock 아래에서 순서대로 적용. 적용한 목록 반환."""
+    migrations = load_migrations()
+    cursor = conn.cursor()
+    applied_now: List[Migration] = []
+    try:
+        cursor.execute('SELECT pg_advisory_lock(%s)', (MIGRATION_LOCK_ID,))
+        _ensure_migrations_table(cursor)
+        conn.commit()
+
+        # 락을 잡은 뒤 다시 읽어야 다른 레플리카가 먼저 적용한 것을 중복 실행하지 않음
+        applied = applied_versions(conn)
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            if not migration.transactional and not include_no_transaction:
+                log(f"⏭️  {migration.version:04d}_{migration.name}: no-transaction 마이그레이션은 "
+                    f"'{APPLY_NO_TRANSACTION_COMMAND}'로 적용하세요.")
+                continue
+
+            if migration.transactional:
+                try:
+                    cursor.execute(migration.sql)
+                    cursor.execute(
+                        'INSERT INTO schema_migrations (version, name) VALUES (%s, %s)',
+                        (migration.version, migration.name),
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            else:
+                # 열린 트랜잭션(applied_versions 조회 등)이 있으면 autocommit 전환이 거부됨
+                conn.commit()
+                conn.autocommit = True
+                try:
+                    for statement in _split_statements(migration.sql):
+                        _drop_invalid_index(cursor, statement, log)
+                        cursor.execute(statement)
+                    cursor.execute(
+                        'INSERT INTO schema_migrations (version, name) VALUES (%s, %s)',
+                        (migration.version, migration.name),
+                    )
+                finally:
+                    conn.autocommit = False
+
+            applied_now.append(migration)
+            log(f"✅ {migration.version:04d}_{migration.name} 적용 완료")
+        return applied_now
+    finally:
+        try:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', (MIGRATION_LOCK_ID,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+        cursor.close()
+
+
+def status(conn) -> List[Dict]:
+    """마이그레이션별 적용 여부"""
+    applied = applied_versions(conn)
+    conn.rollback()
+    return [
+        {
+            'version': m.version,
+            'name': m.name,
+            'transactional': m.transactional,
+            'applied': m.version in applied,
+        }
+        for m in load_migrations()
+    ]
+
+
+def main(argv: List[str] = None) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Spot Zero 봇 DB 마이그레이션")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', help="마이그레이션 적용 현황 출력")
+    apply_parser = sub.add_parser('apply', help="미적용 마이그레이션 적용")
+    apply_parser.add_argument(
+        '--concurrently',
+        action='store_true',
+        help="no-transaction 마이그레이션(CREATE INDEX CONCURRENTLY 등)까지 적용",
+    )
+    args = parser.parse_args(argv)
+
+    dsn = os.getenv('DATABASE_URL') or os.getenv('DATABASE_PUBLIC_URL')
+    if not dsn:
+        print("❌ DATABASE_URL 또는 DATABASE_PUBLIC_URL 환경 변수가 설정되지 않았습니다.")
+        return 1
+
+    conn = psycopg2.connect(dsn)
+    try:
+        if args.command == 'status':
+            for row in status(conn):
+                mark = '✅' if row['applied'] else '⬜'
+                kind = '' if row['transactional'] else ' (no-transaction)'
+                print(f"{mark} {row['version']:04d}_{row['name']}{kind}")
+        else:
+            applied = apply(conn, include_no_transaction=args.concurrently)
+            if not applied:
+                print("적용할 마이그레이션이 없습니다.")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+-- 기존 init_database DDL (이미 만들어진 DB에도 안전하게 적용되도록 IF NOT EXISTS 유지)
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id BIGINT PRIMARY KEY,
+    total_submissions INTEGER DEFAULT 0,
+    approved_count INTEGER DEFAULT 0,
+    total_xp INTEGER DEFAULT 0,
+    tier INTEGER DEFAULT 1,
+    tier_name VARCHAR(50) DEFAULT 'Code SZ',
+    link_list TEXT[] DEFAULT '{}',
+    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- tier 컬럼이 없던 시절에 만들어진 users 테이블 보정
+ALTER TABLE users ADD COLUMN IF NOT EXISTS tier INTEGER DEFAULT 1;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS tier_name VARCHAR(50) DEFAULT 'Code SZ';
+
+CREATE TABLE IF NOT EXISTS submissions (
+    submission_id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    mission_code VARCHAR(10) NOT NULL,
+    link TEXT NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending',
+    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    approved_at TIMESTAMP,
+    rejection_reason TEXT,
+    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS completed_quests (
+    completion_id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    mission_code VARCHAR(10) NOT NULL,
+    xp_earned INTEGER NOT NULL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE,
+    UNIQUE(user_id, mission_code)
+);
+
+CREATE TABLE IF NOT EXISTS xp_logs (
+    id SERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    mission_name VARCHAR(255) NOT NULL,
+    xp_amount INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_submissions_user ON submissions(user_id);
+CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(status);
+CREATE INDEX IF NOT EXISTS idx_completed_quests_user ON completed_quests(user_id);
+CREATE INDEX IF NOT EXISTS idx_xp_logs_user ON xp_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_xp_logs_created_at ON xp_logs(created_at DESC);
@@ -0,0 +1,3 @@
+-- schema_meta 단일 버전 테이블은 schema_migrations로 대체됨
+
+DROP TABLE IF EXISTS schema_meta;
@@ -0,0 +1,18 @@
+-- 유저별 미션 승인 누적 수 (승인 트랜잭션 안에서 증가, 마일스톤/보드가 COUNT(*) 대신 읽음)
+
+CREATE TABLE IF NOT EXISTS user_mission_stats (
+    user_id BIGINT NOT NULL,
+    mission_code VARCHAR(10) NOT NULL,
+    approved_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, mission_code),
+    FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+);
+
+-- 기존 승인 이력으로 채우기
+INSERT INTO user_mission_stats (user_id, mission_code, approved_count)
+SELECT user_id, mission_code, COUNT(*)
+FROM submissions
+WHERE status = 'approved'
+GROUP BY user_id, mission_code
+ON CONFLICT (user_id, mission_code) DO UPDATE
+SET approved_count = EXCLUDED.approved_count;
@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+-- 랭킹/내 순위 조회용 인덱스 (ORDER BY total_xp DESC, user_id). 큰 테이블에서도 쓰기를 막지 않도록 CONCURRENTLY
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_total_xp_rank ON users (total_xp DESC, user_id);
@@ -0,0 +1,7 @@
+-- 봇 운영 상태 키-값 저장소 (예: 마지막으로 동기화한 슬래시 명령어 트리 해시)
+
+CREATE TABLE IF NOT EXISTS bot_state (
+    key VARCHAR(100) PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,16 @@
+-- 트랜잭션 아웃박스: 제출/승인/반려와 같은 트랜잭션에서 기록하고, 봇의 디스패처가 Discord로 전송
+-- status: pending(전송 대기) / sent(전송 완료) / dead(재시도 포기, 수동 확인 필요)
+
+CREATE TABLE IF NOT EXISTS outbox (
+    outbox_id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(30) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (next_attempt_at, outbox_id) WHERE status = 'pending';
@@ -0,0 +1,4 @@
+-- 관리자 채널 티켓 메시지 위치 (티켓 재동기화 시 누락된 티켓 판별용)
+
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS admin_channel_id BIGINT;
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS admin_message_id BIGINT;
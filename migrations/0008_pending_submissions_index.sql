@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- 대기 중 제출 키셋 페이지네이션용 부분 인덱스 (ORDER BY submitted_at, submission_id)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_submissions_pending_keyset
+    ON submissions (submitted_at, submission_id) WHERE status = 'pending';
@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- 유저별 제출 이력 키셋 페이지네이션용 인덱스 (WHERE user_id ORDER BY submitted_at DESC, submission_id DESC)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_submissions_user_keyset
+    ON submissions (user_id, submitted_at, submission_id);
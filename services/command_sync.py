@@ -0,0 +1,47 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# bot_state에 저장하는 마지막 동기화 트리 해시 키
+STATE_KEY = 'command_tree_hash'
+
+
+def command_tree_hash(bot: commands.Bot) -> str:
+    """슬래시 명령어 트리(이름/설명/파라미터/권한)의 안정적인 해시"""
+    payload = sorted(
+        (command.to_dict(bot.tree) for command in bot.tree.get_commands()),
+        key=lambda data: (data.get('type', 1), data['name']),
+    )
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+async def sync_command_tree(bot: commands.Bot, force: bool = False) -> Optional[int]:
+    """트리 해시가 바뀌었을 때만 전역 동기화. 동기화한 명령어 수, 건너뛰면 None 반환.
+
+    FORCE_COMMAND_SYNC=1 이거나 force=True면 해시와 관계없이 동기화한다.
+    """
+    tree_hash = command_tree_hash(bot)
+    force = force or os.getenv('FORCE_COMMAND_SYNC', '').lower() in ('1', 'true', 'yes')
+    if not force:
+        try:
+            if await bot.db.get_state(STATE_KEY) == tree_hash:
+                logger.info("슬래시 명령어 변경 없음 - 동기화 건너뜀 hash=%s", tree_hash[:12])
+                return None
+        except Exception as e:
+            # 저장된 해시를 못 읽으면 동기화하는 쪽이 안전
+            logger.warning("명령어 트리 해시 조회 실패 - 동기화 진행 error=%s", e)
+
+    synced = await bot.tree.sync()
+    try:
+        await bot.db.set_state(STATE_KEY, tree_hash)
+    except Exception as e:
+        logger.warning("명령어 트리 해시 저장 실패 error=%s", e)
+    logger.info("슬래시 명령어 %s개 동기화 hash=%s", len(synced), tree_hash[:12])
+    return len(synced)
@@ -0,0 +1,61 @@
+import gzip
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+# 업로드 한도에서 남겨 둘 여유 (multipart 헤더 등)
+UPLOAD_MARGIN = 64 * 1024
+_READ_BLOCK = 1024 * 1024
+
+
+def parse_date_range(since: Optional[str], until: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """'YYYY-MM-DD' 기간 → (since 00:00, until 다음날 00:00). until 날짜까지 포함."""
+    start = datetime.strptime(since, '%Y-%m-%d') if since else None
+    end = datetime.strptime(until, '%Y-%m-%d') + timedelta(days=1) if until else None
+    if start and end and start >= end:
+        raise ValueError(f"기간이 올바르지 않습니다. since={since} until={until}")
+    return start, end
+
+
+def export_filename(table: str, fmt: str) -> str:
+    return f"{table}_{datetime.now():%Y%m%d_%H%M%S}.{fmt}.gz"
+
+
+async def export_to_gzip(db, table: str, fmt: str = 'csv', since: Optional[datetime] = None,
+                         until: Optional[datetime] = None, user_id: Optional[int] = None) -> Tuple[str, int]:
+    """COPY 스트림을 임시 gzip 파일로 내보냄. (파일 경로, 행 수) 반환 - 파일 삭제는 호출 측 책임."""
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=f".{fmt}.gz")
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as out:
+            rows = await db.copy_export(out, table, fmt, since, until, user_id)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, rows
+
+
+def split_file(path: str, chunk_size: int) -> List[str]:
+    """파일을 chunk_size 바이트 이하 조각(.part001, ...)으로 나눔. 한도 이하면 원본 경로 하나만 반환.
+
+    조각은 `cat 이름.part* > 이름` 으로 합치면 원본 gzip이 된다.
+    """
+    if os.path.getsize(path) <= chunk_size:
+        return [path]
+    parts = []
+    with open(path, 'rb') as src:
+        while True:
+            part_path = f"{path}.part{len(parts) + 1:03d}"
+            written = 0
+            with open(part_path, 'wb') as dst:
+                while written < chunk_size:
+                    block = src.read(min(_READ_BLOCK, chunk_size - written))
+                    if not block:
+                        break
+                    dst.write(block)
+                    written += len(block)
+            if written == 0:
+                os.remove(part_path)
+                break
+            parts.append(part_path)
+    return parts
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+import discord
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardCache:
+    """/ranking 용 리더보드 캐시 (상위 N명 + 길드별 렌더링된 임베드 + 유저별 순위).
+
+    XP는 승인 시에만 바뀌므로 AsyncDatabase의 XP 변경 리스너로 무효화하고,
+    놓친 변경(수동 SQL 등)에 대비해 TTL이 지나면 다시 조회한다.
+    """
+
+    def __init__(self, db, size: int = 10, ttl: float = 300.0, rank_ttl: float = 60.0):
+        self.db = db
+        self.size = size
+        self.ttl = ttl
+        self._top: Optional[List[Dict]] = None
+        self._top_expires_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        # 무효화/XP 변경마다 증가. 조회 도중 값이 바뀌었으면 그 결과는 이미 낡았으므로 저장하지 않는다.
+        self._generation = 0
+        # 길드 아이콘이 썸네일로 들어가므로 임베드는 길드별로 보관
+        self._embeds = TTLCache(maxsize=64, ttl=ttl)
+        self._ranks = TTLCache(maxsize=4096, ttl=rank_ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_top(self) -> List[Dict]:
+        """상위 N명. 캐시가 유효하면 DB를 거치지 않음."""
+        if self._top is not None and time.monotonic() < self._top_expires_at:
+            self.hits += 1
+            return self._top
+        # 공지 직후처럼 동시에 몰려도 DB 조회는 한 번만
+        async with self._refresh_lock:
+            if self._top is not None and time.monotonic() < self._top_expires_at:
+                self.hits += 1
+                return self._top
+            self.misses += 1
+            generation = self._generation
+            top = await self.db.get_leaderboard(self.size)
+            if generation == self._generation:
+                self._top = top
+                self._top_expires_at = time.monotonic() + self.ttl
+            return top
+
+    def get_embed(self, guild_id: Optional[int]) -> Optional[discord.Embed]:
+        """캐시된 상위 N명 임베드 (호출 측에서 수정할 수 있도록 복사본 반환)"""
+        if self._top is None or time.monotonic() >= self._top_expires_at:
+            return None
+        embed = self._embeds.get(guild_id)
+        return embed.copy() if embed is not None else None
+
+    def set_embed(self, guild_id: Optional[int], embed: discord.Embed, top: List[Dict]) -> None:
+        """top(get_top 결과)으로 만든 임베드 저장. 그 사이 무효화됐으면 버림."""
+        if top is self._top:
+            self._embeds.set(guild_id, embed.copy())
+
+    async def get_user_rank(self, user_id: int) -> Optional[Dict]:
+        """상위 N명 밖 유저의 순위 (XP 변경 시 전체 무효화)"""
+        rank = self._ranks.get(user_id)
+        if rank is not None:
+            return rank
+        generation = self._generation
+        rank = await self.db.get_user_rank(user_id)
+        if rank is not None and generation == self._generation:
+            self._ranks.set(user_id, rank)
+        return rank
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._top = None
+        self._embeds.clear()
+        self._ranks.clear()
+        self.invalidations += 1
+
+    def on_xp_changed(self, user_id: int, total_xp: int) -> None:
+        """XP 변경 리스너. 상위 N명에 영향이 있을 때만 상위 목록/임베드를 버린다."""
+        # 누군가의 XP가 바뀌면 그 아래 유저들의 순위가 밀리므로 개별 순위는 항상 비움
+        self._ranks.clear()
+        # 진행 중인 조회(상위 목록/순위)가 변경 이전 값을 저장하지 못하게 함
+        self._generation += 1
+        top = self._top
+        if top is None:
+            return
+        in_top = any(entry['user_id'] == user_id for entry in top)
+        enters_top = len(top) < self.size or total_xp >= top[-1]['total_xp']
+        if in_top or enters_top:
+            logger.debug("리더보드 캐시 무효화 user_id=%s total_xp=%s", user_id, total_xp)
+            self.invalidate()
+
+    def stats(self) -> Dict:
+        """캐시 적중/미스 카운터"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'embeds': self._embeds.stats(),
+            'ranks': self._ranks.stats(),
+        }
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import discord
+
+from services.role_scheduler import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[object, Dict], Awaitable[None]]
+
+
+class OutboxDispatcher:
+    """outbox 테이블을 비우는 백그라운드 디스패처.
+
+    제출/승인/반려 트랜잭션이 남긴 알림을 batch_size개씩 가져와 kind별 핸들러로 보낸다.
+    실패하면 지수 백오프로 재시도하고, 429는 Retry-After 동안 전체 전송을 멈춘다.
+    max_attempts를 넘기거나 다시 시도해도 소용없는 오류(DM 차단, 없는 유저)는 dead로 남긴다.
+    """
+
+    def __init__(
+        self,
+        bot,
+        batch_size: int = 20,
+        interval: float = 5.0,
+        max_attempts: int = 8,
+        max_backoff: float = 900.0,
+        concurrency: int = 4,
+    ):
+        self.bot = bot
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self._handlers: Dict[str, OutboxHandler] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._paused_until = 0.0
+        self.sent = 0
+        self.retried = 0
+        self.dead = 0
+        self.rate_limited = 0
+
+    def register(self, kind: str, handler: OutboxHandler, rate_per_sec: Optional[float] = None, burst: int = 5) -> None:
+        """kind별 전송 핸들러 등록. handler(bot, payload)가 예외 없이 끝나면 전송 완료.
+
+        rate_per_sec를 주면 해당 kind는 토큰 버킷으로 전송 속도를 제한한다 (한 채널로 몰리는 티켓 등).
+        """
+        self._handlers[kind] = handler
+        if rate_per_sec:
+            self._buckets[kind] = TokenBucket(rate_per_sec, burst)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self) -> None:
+        """새 행이 커밋됐음을 알림 (다음 주기를 기다리지 않고 바로 전송)"""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except Exception as e:
+                logger.warning("아웃박스 전송 주기 실패 error=%s", e)
+                processed = 0
+            # 가득 찬 배치를 처리했으면 남은 행이 있을 가능성이 높으므로 바로 다음 배치로
+            if processed >= self.batch_size:
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def dispatch_once(self) -> int:
+        """전송 대기 행 한 배치 처리. 처리한 행 수 반환."""
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        rows = await self.bot.db.claim_outbox(self.batch_size)
+        if not rows:
+            return 0
+        outcomes = await asyncio.gather(*(self._deliver(row) for row in rows))
+        await self.bot.db.mark_outbox_sent([row['outbox_id'] for row, ok in zip(rows, outcomes) if ok])
+        return len(rows)
+
+    async def _deliver(self, row: Dict) -> bool:
+        handler = self._handlers.get(row['kind'])
+        if handler is None:
+            await self._fail(row, f"등록된 핸들러 없음 kind={row['kind']}", permanent=True)
+            return False
+        # 속도 제한 토큰은 세마포어 밖에서 기다림 (티켓이 밀려도 승인/반려 DM 자리를 막지 않도록)
+        bucket = self._buckets.get(row['kind'])
+        if bucket is not None:
+            await bucket.acquire()
+        async with self._semaphore:
+            # 다른 전송이 429를 받았으면 같이 기다림
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await handler(self.bot, row['payload'])
+                self.sent += 1
+                return True
+            except (discord.Forbidden, discord.NotFound, LookupError) as e:
+                # DM 차단, 삭제된 유저/채널(UserNotFound 포함), 채널 미설정 등 다시 보내도 실패할 오류.
+                # 유저 조회의 5xx/429는 UserResolver.require가 HTTPException으로 올려 아래에서 재시도한다.
+                await self._fail(row, repr(e), permanent=True)
+            except discord.HTTPException as e:
+                retry_after = None
+                if e.status == 429:
+                    self.rate_limited += 1
+                    header = e.response.headers.get('Retry-After') if e.response else None
+                    retry_after = float(header or 5)
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                await self._fail(row, repr(e), retry_after=retry_after)
+            except Exception as e:
+                await self._fail(row, repr(e))
+            return False
+
+    async def _fail(self, row: Dict, error: str, permanent: bool = False, retry_after: float = None) -> None:
+        if permanent or row['attempts'] >= self.max_attempts:
+            self.dead += 1
+            logger.error(
+                "아웃박스 전송 포기(dead) outbox_id=%s kind=%s attempts=%s error=%s",
+                row['outbox_id'], row['kind'], row['attempts'], error,
+            )
+            await self.bot.db.mark_outbox_failed(row['outbox_id'], error, None)
+            return
+        self.retried += 1
+        backoff = min(self.max_backoff, 2 ** row['attempts'] * 5)
+        if retry_after is not None:
+            backoff = max(backoff, retry_after)
+        logger.warning(
+            "아웃박스 전송 실패 outbox_id=%s kind=%s attempts=%s retry_in=%ss error=%s",
+            row['outbox_id'], row['kind'], row['attempts'], backoff, error,
+        )
+        await self.bot.db.mark_outbox_failed(row['outbox_id'], error, backoff)
+
+    def stats(self) -> Dict:
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'sent': self.sent,
+            'retried': self.retried,
+            'dead': self.dead,
+            'rate_limited': self.rate_limited,
+        }
@@ -0,0 +1,159 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+Cursor = Tuple[Any, ...]
+
+# 페이지 종류별 정의 (register_pager로 등록)
+_PAGERS: Dict[str, 'KeysetPager'] = {}
+
+
+class KeysetPager(ABC):
+    """관리자용 키셋 페이지 목록 정의. 하위 클래스가 fetch/cursor/render를 구현한다.
+
+    페이지는 앵커(직전 행의 커서, 첫 페이지는 None)로 정해지고, 앵커와 이동 커서는 버튼
+    custom_id에 들어가므로 봇이 재시작돼도 버튼이 동작하며 몇 번째 페이지든 쿼리 비용이 같다.
+    """
+    kind: str = ''
+    page_size: int = 10
+
+    @abstractmethod
+    async def fetch(self, bot, after: Optional[Cursor], limit: int, reverse: bool) -> List[Dict]:
+        """after 다음 행 limit개 (reverse면 after 이전 행을 가까운 순으로)"""
+
+    @abstractmethod
+    def cursor(self, row: Dict) -> Cursor:
+        """행의 정렬 키 (fetch의 after로 다시 넘어감)"""
+
+    @abstractmethod
+    def render(self, rows: List[Dict], has_prev: bool, has_next: bool) -> discord.Embed:
+        """한 페이지 임베드"""
+
+    def row_items(self, rows: List[Dict]) -> List[discord.ui.Item]:
+        """행별 버튼 (최대 4줄, 마지막 줄은 이동 버튼)"""
+        return []
+
+    def encode(self, cursor: Cursor) -> str:
+        return '.'.join(str(value) for value in cursor)
+
+    def decode(self, token: str) -> Cursor:
+        return tuple(int(value) for value in token.split('.'))
+
+
+def register_pager(pager: KeysetPager) -> None:
+    _PAGERS[pager.kind] = pager
+
+
+async def load_page(
+    pager: KeysetPager, bot, anchor: Optional[Cursor] = None, before: Optional[Cursor] = None
+) -> Tuple[List[Dict], Optional[Cursor], bool, bool]:
+    """(행, 앵커, 이전 페이지 여부, 다음 페이지 여부). before를 주면 그 행 바로 앞 페이지."""
+    size = pager.page_size
+    if before is not None:
+        rows = await pager.fetch(bot, before, size + 1, reverse=True)
+        if not rows:
+            return await load_page(pager, bot)
+        anchor = pager.cursor(rows[size]) if len(rows) > size else None
+        rows = rows[:size]
+        rows.reverse()
+        return rows, anchor, anchor is not None, True
+    rows = await pager.fetch(bot, anchor, size + 1, reverse=False)
+    return rows[:size], anchor, anchor is not None, len(rows) > size
+
+
+class PageButton(discord.ui.DynamicItem[discord.ui.Button], template=r'sz:page:(?P<kind>[a-z_]+):(?P<action>prev|page|next):(?P<token>start|[0-9.\-]+)'):
+    """이전/새로고침/다음 버튼. custom_id에 페이지 종류와 커서를 담아 재시작 후에도 동작."""
+    LABELS = {'prev': "◀ Prev", 'page': "🔄 Refresh", 'next': "Next ▶"}
+
+    def __init__(self, kind: str, action: str, token: str, disabled: bool = False):
+        super().__init__(
+            discord.ui.Button(
+                label=self.LABELS[action],
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"sz:page:{kind}:{action}:{token}",
+                disabled=disabled,
+                row=4,
+            )
+        )
+        self.kind = kind
+        self.action = action
+        self.token = token
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['kind'], match['action'], match['token'])
+
+    async def callback(self, interaction: discord.Interaction):
+        pager = _PAGERS.get(self.kind)
+        if pager is None:
+            await interaction.response.send_message("❌ 알 수 없는 목록입니다.", ephemeral=True)
+            return
+        if not interaction.user.guild_permissions.administrator:
+            await interaction.response.send_message("❌ 관리자만 사용할 수 있습니다.", ephemeral=True)
+            return
+        await interaction.response.defer()
+        cursor = None if self.token == 'start' else pager.decode(self.token)
+        if self.action == 'prev' and cursor is not None:
+            page = await load_page(pager, interaction.client, before=cursor)
+        else:
+            page = await load_page(pager, interaction.client, anchor=cursor)
+        await _edit_page(interaction, pager, *page)
+
+
+def page_view(
+    pager: KeysetPager, rows: List[Dict], anchor: Optional[Cursor], has_prev: bool, has_next: bool
+) -> discord.ui.View:
+    """행 버튼 + 이동 버튼 View (모두 DynamicItem이라 메시지별 View를 보관하지 않음)"""
+    view = discord.ui.View(timeout=None)
+    for item in pager.row_items(rows):
+        view.add_item(item)
+
+    def token(cursor: Optional[Cursor]) -> str:
+        return 'start' if cursor is None else pager.encode(cursor)
+
+    first = pager.cursor(rows[0]) if rows else anchor
+    last = pager.cursor(rows[-1]) if rows else anchor
+    view.add_item(PageButton(pager.kind, 'prev', token(first), disabled=not has_prev))
+    view.add_item(PageButton(pager.kind, 'page', token(anchor)))
+    view.add_item(PageButton(pager.kind, 'next', token(last), disabled=not has_next))
+    return view
+
+
+async def _edit_page(interaction: discord.Interaction, pager: KeysetPager, rows, anchor, has_prev, has_next) -> None:
+    await interaction.edit_original_response(
+        embed=pager.render(rows, has_prev, has_next),
+        view=page_view(pager, rows, anchor, has_prev, has_next),
+    )
+
+
+async def send_first_page(interaction: discord.Interaction, pager: KeysetPager) -> None:
+    """슬래시 명령어 응답으로 첫 페이지 전송 (defer 이후 호출)"""
+    rows, anchor, has_prev, has_next = await load_page(pager, interaction.client)
+    await interaction.followup.send(
+        embed=pager.render(rows, has_prev, has_next),
+        view=page_view(pager, rows, anchor, has_prev, has_next),
+        ephemeral=True,
+    )
+
+
+async def refresh_page(interaction: discord.Interaction, kind: str) -> bool:
+    """버튼이 눌린 목록 메시지를 현재 앵커 기준으로 다시 그림 (defer 이후 호출). 목록 메시지가 아니면 False."""
+    pager = _PAGERS.get(kind)
+    prefix = f"sz:page:{kind}:page:"
+    message = interaction.message
+    if pager is None or message is None:
+        return False
+    for row in message.components:
+        for component in getattr(row, 'children', []):
+            custom_id = getattr(component, 'custom_id', None) or ''
+            if custom_id.startswith(prefix):
+                token = custom_id[len(prefix):]
+                anchor = None if token == 'start' else pager.decode(token)
+                await _edit_page(interaction, pager, *await load_page(pager, interaction.client, anchor=anchor))
+                return True
+    logger.warning("목록 메시지에서 앵커 버튼을 찾지 못함 kind=%s message_id=%s", kind, message.id)
+    return False
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """비동기 토큰 버킷 (초당 rate개, 최대 burst개까지 몰아서 허용)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """429 응답 후 해당 길드 요청을 잠시 멈춤"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class RoleMutationScheduler:
+    """멤버 역할 변경 스케줄러.
+
+    한 멤버의 추가/제거를 member.edit(roles=...) 한 번으로 합치고, 여러 멤버는 세마포어로
+    동시 실행 수를 제한하면서 길드별 토큰 버킷으로 요청 속도를 맞춘다. 429를 받으면
+    Retry-After 만큼 해당 길드를 멈추고 지수 백오프로 재시도한다.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_retries: int = 3,
+    ):
+        self.concurrency = concurrency or int(os.getenv('ROLE_SYNC_CONCURRENCY', '4'))
+        self.rate_per_sec = rate_per_sec or float(os.getenv('ROLE_SYNC_RATE', '2'))
+        self.burst = burst or int(os.getenv('ROLE_SYNC_BURST', '5'))
+        self.max_retries = max_retries
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # Discord의 멤버 수정 라우트는 길드 단위로 레이트리밋이 걸리므로 버킷도 길드별
+        self._buckets: Dict[int, TokenBucket] = {}
+        self.in_flight = 0
+        self.applied = 0
+        self.failed = 0
+        self.retries = 0
+        self.rate_limited = 0
+
+    def _bucket(self, guild_id: int) -> TokenBucket:
+        bucket = self._buckets.get(guild_id)
+        if bucket is None:
+            bucket = self._buckets[guild_id] = TokenBucket(self.rate_per_sec, self.burst)
+        return bucket
+
+    async def apply(
+        self,
+        member: discord.Member,
+        add: Iterable[discord.Role] = (),
+        remove: Iterable[discord.Role] = (),
+        reason: Optional[str] = None,
+    ) -> bool:
+        """역할 추가/제거를 한 번의 요청으로 적용. 바꿀 것이 없으면 요청 없이 True."""
+        add = list(add)
+        remove_ids = {role.id for role in remove}
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                for attempt in range(self.max_retries + 1):
+                    # 대기하는 동안 다른 곳에서 역할이 바뀌었을 수 있으므로 실행 직전 상태로 계산
+                    current = [role for role in member.roles if not role.is_default()]
+                    current_ids = {role.id for role in current}
+                    roles = [role for role in current if role.id not in remove_ids]
+                    roles += [role for role in add if role.id not in current_ids]
+                    if {role.id for role in roles} == current_ids:
+                        return True
+
+                    bucket = self._bucket(member.guild.id)
+                    await bucket.acquire()
+                    try:
+                        await member.edit(roles=roles, reason=reason)
+                        self.applied += 1
+                        return True
+                    except discord.Forbidden:
+                        logger.warning("역할 변경 권한 없음 (서버 역할 순서 확인) user_id=%s", member.id)
+                        break
+                    except discord.HTTPException as e:
+                        if attempt >= self.max_retries or (e.status != 429 and e.status < 500):
+                            logger.warning("역할 변경 실패 user_id=%s error=%s", member.id, e)
+                            break
+                        self.retries += 1
+                        delay = 2 ** attempt
+                        if e.status == 429:
+                            self.rate_limited += 1
+                            retry_after = e.response.headers.get('Retry-After') if e.response else None
+                            delay = max(delay, float(retry_after or 1))
+                            bucket.pause(delay)
+                        await asyncio.sleep(delay)
+                self.failed += 1
+                return False
+            finally:
+                self.in_flight -= 1
+
+    async def apply_many(self, changes: List[tuple], chunk_size: int = 200) -> Dict:
+        """(member, add, remove, reason) 목록을 동시에 적용. 한 번에 만드는 작업 수는 chunk_size로 제한."""
+        result = {'applied': 0, 'failed': 0}
+        for start in range(0, len(changes), chunk_size):
+            chunk = changes[start:start + chunk_size]
+            outcomes = await asyncio.gather(*(self.apply(*change) for change in chunk))
+            result['applied'] += sum(1 for ok in outcomes if ok)
+            result['failed'] += sum(1 for ok in outcomes if not ok)
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            'concurrency': self.concurrency,
+            'rate_per_sec': self.rate_per_sec,
+            'in_flight': self.in_flight,
+            'applied': self.applied,
+            'failed': self.failed,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+        }
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+
+def diff_tier_roles(
+    member: discord.Member, tier: int, tier_roles: Dict[int, discord.Role]
+) -> Tuple[List[discord.Role], List[discord.Role]]:
+    """현재 티어 이하 역할은 모두 보유, 초과 역할은 미보유가 되도록 (추가할 역할, 제거할 역할) 계산"""
+    member_role_ids = {role.id for role in member.roles}
+    to_add = [
+        role for level, role in sorted(tier_roles.items())
+        if level <= tier and role.id not in member_role_ids
+    ]
+    to_remove = [
+        role for level, role in sorted(tier_roles.items())
+        if level > tier and role.id in member_role_ids
+    ]
+    return to_add, to_remove
+
+
+async def sync_member_roles(bot, member: discord.Member, total_xp: int) -> bool:
+    """멤버 한 명의 티어 역할을 total_xp에 맞춤 (변경은 bot.role_scheduler로 한 번에 적용)"""
+    tier_roles = bot.tier_roles.get(member.guild)
+    tier = bot.db.get_user_tier(total_xp)
+    to_add, to_remove = diff_tier_roles(member, tier, tier_roles)
+    if not to_add and not to_remove:
+        return True
+    return await bot.role_scheduler.apply(member, to_add, to_remove, reason=f"티어 변경: Lv.{tier}")
+
+
+async def reconcile_all_roles(bot, db, progress_every: int = 1000) -> Dict:
+    """모든 길드 멤버의 티어 역할을 한 번에 맞춤.
+
+    유저 XP는 쿼리 1회로 전부 읽고, 원하는 역할 구성은 메모리에서 계산하며,
+    실제로 역할이 다른 멤버만 bot.role_scheduler로 동시에 적용한다. 결과 통계를 반환.
+    """
+    started = time.monotonic()
+    xp_by_user = await db.get_user_xp_map()
+    stats = {'members': 0, 'checked': 0, 'unregistered': 0, 'changed': 0, 'failed': 0}
+    changes = []
+
+    for guild in bot.guilds:
+        tier_roles = bot.tier_roles.get(guild)
+        if not tier_roles:
+            logger.warning("티어 역할이 하나도 없는 길드 guild_id=%s - 역할 동기화 건너뜀", guild.id)
+            continue
+        for member in guild.members:
+            if member.bot:
+                continue
+            stats['members'] += 1
+            if stats['members'] % progress_every == 0:
+                logger.info(
+                    "역할 동기화 진행 중 guild_id=%s 확인=%s 변경=%s 실패=%s",
+                    guild.id, stats['checked'], stats['changed'], stats['failed'],
+                )
+                # 순수 계산 루프가 길어져도 게이트웨이 하트비트가 밀리지 않도록 양보
+                await asyncio.sleep(0)
+
+            total_xp = xp_by_user.get(member.id)
+            if total_xp is None:
+                stats['unregistered'] += 1
+                continue
+            stats['checked'] += 1
+            tier = db.get_user_tier(total_xp)
+            to_add, to_remove = diff_tier_roles(member, tier, tier_roles)
+            if to_add or to_remove:
+                changes.append((member, to_add, to_remove, f"티어 동기화: Lv.{tier}"))
+
+    if changes:
+        logger.info("역할 변경 대상 %s명 적용 시작", len(changes))
+        result = await bot.role_scheduler.apply_many(changes)
+        stats['changed'] = result['applied']
+        stats['failed'] = result['failed']
+
+    stats['elapsed_sec'] = round(time.monotonic() - started, 1)
+    logger.info("역할 동기화 완료 %s", stats)
+    return stats
+
+
+class RoleSyncService:
+    """유저별로 요청을 모아 티어 역할을 맞추는 비동기 큐.
+
+    같은 유저에 대한 요청은 debounce 초 동안 합쳐져 마지막 XP 기준으로 한 번만 처리된다
+    (관리자가 같은 유저의 제출 5건을 연달아 승인해도 역할 변경은 1회). 종료 시 drain()으로
+    대기 중인 요청을 즉시 처리하고 끝낸다.
+    """
+
+    def __init__(self, bot, debounce: float = 3.0, workers: int = 2):
+        self.bot = bot
+        self.debounce = debounce
+        self.workers = workers
+        # (guild_id, user_id) → 마지막으로 전달된 total_xp (None이면 처리 시점에 DB 조회)
+        self._pending: Dict[Tuple[int, int], Optional[int]] = {}
+        self._timers: Dict[Tuple[int, int], asyncio.TimerHandle] = {}
+        self._queue: "asyncio.Queue[Tuple[int, int]]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._closing = False
+        self.requested = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.failed = 0
+        self.in_progress = 0
+
+    def request(self, user_id: int, guild: discord.Guild, total_xp: Optional[int] = None) -> None:
+        """역할 동기화 요청. 대기 중인 요청이 있으면 XP만 갱신하고 타이머를 다시 건다."""
+        if self._closing:
+            return
+        self._ensure_workers()
+        key = (guild.id, user_id)
+        self.requested += 1
+        if key in self._pending:
+            self.coalesced += 1
+            previous = self._pending[key]
+            # 승인 알림 순서가 뒤바뀌어도 XP는 감소하지 않으므로 큰 값이 최신
+            if previous is not None and total_xp is not None:
+                total_xp = max(previous, total_xp)
+        self._pending[key] = total_xp
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timers[key] = loop.call_later(self.debounce, self._enqueue, key)
+
+    def _enqueue(self, key: Tuple[int, int]) -> None:
+        self._timers.pop(key, None)
+        self._queue.put_nowait(key)
+
+    def _ensure_workers(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._queue.get()
+            try:
+                await self._process(key)
+            except Exception as e:
+                self.failed += 1
+                logger.warning("역할 동기화 실패 guild_id=%s user_id=%s error=%s", key[0], key[1], e)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, key: Tuple[int, int]) -> None:
+        if key not in self._pending:
+            return
+        # 처리 중 들어온 요청은 새 항목으로 다시 쌓이도록 먼저 꺼냄
+        total_xp = self._pending.pop(key)
+        guild_id, user_id = key
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if member is None:
+            return
+        self.in_progress += 1
+        try:
+            if total_xp is None:
+                user = await self.bot.db.get_user(user_id)
+                if not user:
+                    return
+                total_xp = user['total_xp']
+            if await sync_member_roles(self.bot, member, total_xp):
+                self.processed += 1
+            else:
+                self.failed += 1
+        finally:
+            self.in_progress -= 1
+
+    def pending(self) -> int:
+        """아직 처리되지 않은 유저 수 (디바운스 대기 + 큐 대기)"""
+        return len(self._pending)
+
+    async def drain(self, timeout: float = 30.0) -> None:
+        """새 요청을 막고 대기 중인 요청을 즉시 처리한 뒤 워커 종료"""
+        self._closing = True
+        for key, timer in list(self._timers.items()):
+            timer.cancel()
+            self._enqueue(key)
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("역할 동기화 드레인 시간 초과 - 미처리 %s건", self.pending())
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+    def stats(self) -> Dict:
+        return {
+            'pending': self.pending(),
+            'queued': self._queue.qsize(),
+            'in_progress': self.in_progress,
+            'requested': self.requested,
+            'coalesced': self.coalesced,
+            'processed': self.processed,
+            'failed': self.failed,
+        }
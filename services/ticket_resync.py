@@ -0,0 +1,130 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import discord
+
+from database import submission_cursor
+from services.role_scheduler import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 티켓 임베드에서 제출 ID가 들어 있는 필드 이름 (이전 티켓의 메시지 ID를 찾을 때 사용)
+SUBMISSION_ID_FIELD = "📋 Submission ID"
+
+
+def admin_channel_id() -> Optional[int]:
+    """ADMIN_CHANNEL_ID 환경 변수 (없거나 잘못된 값이면 None)"""
+    value = os.getenv('ADMIN_CHANNEL_ID', '')
+    if not value or value == 'your_channel_id_here':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("ADMIN_CHANNEL_ID 유효하지 않음 value=%s", value)
+        return None
+
+
+async def _scan_ticket_messages(bot, channel, since) -> Optional[Dict[int, int]]:
+    """채널에 남아 있는 봇 티켓 메시지 {submission_id: message_id}. 읽을 수 없으면 None."""
+    tickets: Dict[int, int] = {}
+    # submitted_at은 타임존 없는 TIMESTAMP(UTC 가정). 시계/타임존 차이를 감안해 하루 앞부터 훑는다.
+    after = discord.Object(discord.utils.time_snowflake(since.replace(tzinfo=timezone.utc) - timedelta(days=1)))
+    try:
+        async for message in channel.history(limit=None, after=after):
+            if message.author.id != bot.user.id or not message.embeds:
+                continue
+            for field in message.embeds[0].fields:
+                if field.name == SUBMISSION_ID_FIELD:
+                    try:
+                        tickets[int(field.value.strip('`#'))] = message.id
+                    except ValueError:
+                        pass
+                    break
+    except discord.HTTPException as e:
+        logger.warning("관리자 채널 기록 조회 실패 channel_id=%s error=%s", channel.id, e)
+        return None
+    return tickets
+
+
+async def _ticket_exists(channel, message_id: int) -> bool:
+    """기록된 티켓 메시지가 채널에 남아 있는지 (확인할 수 없으면 기록을 믿음)"""
+    try:
+        await channel.fetch_message(message_id)
+        return True
+    except discord.NotFound:
+        return False
+    except discord.HTTPException as e:
+        logger.warning("티켓 메시지 확인 실패 channel_id=%s message_id=%s error=%s", channel.id, message_id, e)
+        return True
+
+
+async def resync_admin_tickets(bot, db, page_size: int = 200) -> Dict:
+    """대기 중 제출 중 관리자 채널 티켓이 없는 것을 찾아 다시 올리도록 아웃박스에 예약.
+
+    대기 제출은 (submitted_at, submission_id) 키셋으로 page_size씩 읽되, 재동기화를 시작한 뒤 들어온
+    제출은 이 프로세스의 아웃박스가 티켓을 올리므로 거기서 멈춘다. 메시지 ID가 기록된 티켓은 모두
+    fetch_message로 확인하고, 확인 호출은 admin_ticket 전송 버킷과 별개인 TICKET_VERIFY_RATE(초당)
+    버킷으로 제한해 새 티켓 전송을 늦추지 않는다. 채널 기록은 ID가 없는 제출이 있을 때만 그중 가장
+    오래된 제출 이후를 한 번 훑는다. 실제 전송은 아웃박스 디스패처가 admin_ticket 속도 제한에 맞춰 처리.
+    """
+    started = time.monotonic()
+    # submitted_at은 타임존 없는 TIMESTAMP(UTC 가정)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None)
+    verify_bucket = TokenBucket(float(os.getenv('TICKET_VERIFY_RATE', '2')), burst=5)
+    stats = {'checked': 0, 'verified': 0, 'backfilled': 0, 'requeued': 0}
+    channel_id = admin_channel_id()
+    if channel_id is None:
+        logger.warning("ADMIN_CHANNEL_ID가 설정되지 않아 티켓 재동기화를 건너뜀")
+        return stats
+    channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+    async def requeue(submission_ids) -> None:
+        if submission_ids:
+            stats['requeued'] += await db.enqueue_admin_tickets(submission_ids)
+            bot.outbox.wake()
+
+    # 메시지 ID가 없는(추적 이전 티켓이거나 채널이 바뀐) 제출은 채널 기록에서 찾아야 함 - 오래된 순
+    untracked = []
+    page = await db.get_pending_submissions_page(limit=page_size)
+    while page:
+        page = [row for row in page if row['submitted_at'] < cutoff]
+        missing = []
+        for row in page:
+            message_id = row['admin_message_id']
+            if message_id is None or row['admin_channel_id'] != channel.id:
+                untracked.append(row)
+            else:
+                await verify_bucket.acquire()
+                stats['verified'] += 1
+                if not await _ticket_exists(channel, message_id):
+                    missing.append(row['submission_id'])
+        stats['checked'] += len(page)
+        await requeue(missing)
+        if len(page) < page_size:
+            break
+        page = await db.get_pending_submissions_page(submission_cursor(page[-1]), page_size)
+
+    if untracked:
+        existing = await _scan_ticket_messages(bot, channel, untracked[0]['submitted_at'])
+        if existing is None:
+            # 채널 기록을 못 읽었다고 티켓이 없는 것은 아님 - 다시 올리면 이미 있는 티켓이 중복된다
+            stats['unscanned'] = len(untracked)
+            logger.warning("관리자 채널 기록을 읽지 못해 추적되지 않은 제출 %s건의 재전송을 건너뜀", len(untracked))
+        else:
+            missing = []
+            for row in untracked:
+                found = existing.get(row['submission_id'])
+                if found is not None:
+                    # 메시지 ID 추적 이전에 올라간 티켓은 ID만 채움
+                    await db.set_admin_message(row['submission_id'], channel.id, found)
+                    stats['backfilled'] += 1
+                else:
+                    missing.append(row['submission_id'])
+            await requeue(missing)
+
+    stats['elapsed_sec'] = round(time.monotonic() - started, 1)
+    logger.info("관리자 티켓 재동기화 완료 %s", stats)
+    return stats
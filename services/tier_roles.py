@@ -0,0 +1,74 @@
+import logging
+from typing import Dict, List
+
+import discord
+
+from database import TIER_SYSTEM
+
+logger = logging.getLogger(__name__)
+
+# 역할 이름 → 티어 레벨 (역할 목록을 한 번만 훑으면서 매칭하기 위한 역인덱스)
+_LEVEL_BY_ROLE_NAME = {info['role_name']: level for level, info in TIER_SYSTEM.items()}
+
+
+class TierRoleCache:
+    """길드별 티어 레벨 → Role 매핑 캐시.
+
+    길드 역할 목록은 처음 요청될 때 한 번만 훑고, 역할 생성/수정/삭제 이벤트에서 해당 길드만
+    무효화한다. 빌드할 때 누락/중복/부여 불가 역할을 찾아 problems()로 알려준다.
+    """
+
+    def __init__(self):
+        self._roles: Dict[int, Dict[int, discord.Role]] = {}
+        self._problems: Dict[int, List[str]] = {}
+        self.builds = 0
+        self.invalidations = 0
+
+    def get(self, guild: discord.Guild) -> Dict[int, discord.Role]:
+        """tier_level → Role (없는 티어는 빠짐)"""
+        tier_roles = self._roles.get(guild.id)
+        if tier_roles is None:
+            tier_roles = self._build(guild)
+        return tier_roles
+
+    def _build(self, guild: discord.Guild) -> Dict[int, discord.Role]:
+        tier_roles: Dict[int, discord.Role] = {}
+        problems: List[str] = []
+        for role in guild.roles:
+            level = _LEVEL_BY_ROLE_NAME.get(role.name)
+            if level is None:
+                continue
+            if level in tier_roles:
+                problems.append(f"Lv.{level} '{role.name}' 역할이 여러 개 있음 (첫 번째만 사용)")
+                continue
+            tier_roles[level] = role
+            if not role.is_assignable():
+                problems.append(f"Lv.{level} '{role.name}' 역할을 봇이 부여할 수 없음 (역할 순서/관리형 역할 확인)")
+        for level, info in sorted(TIER_SYSTEM.items()):
+            if level not in tier_roles:
+                problems.append(f"Lv.{level} '{info['role_name']}' 역할이 없음")
+
+        self._roles[guild.id] = tier_roles
+        self._problems[guild.id] = problems
+        self.builds += 1
+        for problem in problems:
+            logger.warning("티어 역할 설정 문제 guild_id=%s %s", guild.id, problem)
+        return tier_roles
+
+    def problems(self, guild: discord.Guild) -> List[str]:
+        """누락/중복/부여 불가 티어 역할 목록 (캐시가 없으면 새로 빌드)"""
+        self.get(guild)
+        return list(self._problems.get(guild.id, []))
+
+    def invalidate(self, guild_id: int) -> None:
+        if self._roles.pop(guild_id, None) is not None:
+            self.invalidations += 1
+        self._problems.pop(guild_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            'guilds': len(self._roles),
+            'builds': self.builds,
+            'invalidations': self.invalidations,
+            'problems': sum(len(problems) for problems in self._problems.values()),
+        }
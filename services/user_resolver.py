@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Union
+
+import discord
+from discord.ext import commands
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+UserLike = Union[discord.User, discord.Member]
+
+# 존재하지 않는 유저(NotFound)를 짧게 기억해 같은 ID로 REST를 반복 호출하지 않기 위한 표식
+_NOT_FOUND = object()
+
+
+class UserNotFound(LookupError):
+    """Discord에 존재하지 않는 유저 (404). 재시도해도 결과가 같다."""
+
+    def __init__(self, user_id: int):
+        super().__init__(f"유저를 찾을 수 없습니다. user_id={user_id}")
+        self.user_id = user_id
+
+
+class UserResolver:
+    """user_id → User/Member 해석 서비스.
+
+    조회 순서: 길드 멤버 캐시 → 봇 유저 캐시 → LRU+TTL 캐시 → (길드가 있으면) 게이트웨이
+    query_members 일괄 조회 → 남은 ID만 REST fetch_user 동시 호출(세마포어로 제한).
+    캐시가 데워진 상태에서는 REST 호출이 발생하지 않는다.
+    """
+
+    def __init__(
+        self,
+        bot: commands.Bot,
+        maxsize: int = 2048,
+        ttl: float = 3600.0,
+        not_found_ttl: float = 300.0,
+        concurrency: int = 4,
+    ):
+        self.bot = bot
+        self.not_found_ttl = not_found_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.rest_fetches = 0
+        self.gateway_queries = 0
+        self.rate_limited = 0
+
+    def _cached(self, user_id: int, guild: Optional[discord.Guild]):
+        if guild is not None:
+            member = guild.get_member(user_id)
+            if member is not None:
+                return member
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return user
+        return self._cache.get(user_id)
+
+    async def _fetch(self, user_id: int, strict: bool = False) -> Optional[discord.User]:
+        """REST 조회 (동시 실행 수 제한, 429 시 Retry-After 만큼 한 번 더 대기 후 재시도)
+
+        404면 None. 그 밖의 실패(5xx, 두 번째 429)는 strict면 예외를 그대로 올리고 아니면 None.
+        """
+        async with self._semaphore:
+            for attempt in range(2):
+                try:
+                    self.rest_fetches += 1
+                    user = await self.bot.fetch_user(user_id)
+                    self._cache.set(user_id, user)
+                    return user
+                except discord.NotFound:
+                    self._cache.set(user_id, _NOT_FOUND, ttl=self.not_found_ttl)
+                    return None
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt:
+                        logger.warning("유저 조회 실패 user_id=%s error=%s", user_id, e)
+                        if strict:
+                            raise
+                        return None
+                    self.rate_limited += 1
+                    retry_after = float(e.response.headers.get('Retry-After', 1)) if e.response else 1.0
+                    await asyncio.sleep(retry_after)
+        return None
+
+    async def resolve(self, user_id: int, guild: Optional[discord.Guild] = None) -> Optional[UserLike]:
+        """유저 한 명 해석 (없으면 None)"""
+        resolved = await self.resolve_many([user_id], guild)
+        return resolved.get(user_id)
+
+    async def require(self, user_id: int, guild: Optional[discord.Guild] = None) -> UserLike:
+        """유저 한 명 해석. 없는 유저면 UserNotFound, 일시적 조회 실패는 HTTPException을 그대로 올린다.
+
+        아웃박스 DM처럼 "없는 유저"와 "잠시 조회 실패"를 구분해 재시도 여부를 정해야 하는 곳에서 쓴다.
+        """
+        cached = self._cached(user_id, guild)
+        if cached is _NOT_FOUND:
+            raise UserNotFound(user_id)
+        if cached is not None:
+            return cached
+        user = await self._fetch(user_id, strict=True)
+        if user is None:
+            raise UserNotFound(user_id)
+        return user
+
+    async def resolve_many(
+        self, user_ids: Iterable[int], guild: Optional[discord.Guild] = None
+    ) -> Dict[int, UserLike]:
+        """여러 유저를 한 번에 해석. 캐시에 없는 ID만 모아서 일괄/동시 조회."""
+        resolved: Dict[int, UserLike] = {}
+        misses = []
+        for user_id in dict.fromkeys(user_ids):
+            cached = self._cached(user_id, guild)
+            if cached is _NOT_FOUND:
+                continue
+            if cached is not None:
+                resolved[user_id] = cached
+            else:
+                misses.append(user_id)
+
+        # 길드 멤버는 게이트웨이로 100명씩 일괄 조회 (REST 레이트리밋을 소모하지 않음)
+        if misses and guild is not None and self.bot.intents.members:
+            for start in range(0, len(misses), 100):
+                chunk = misses[start:start + 100]
+                try:
+                    self.gateway_queries += 1
+                    members = await guild.query_members(user_ids=chunk, cache=True)
+                except (asyncio.TimeoutError, discord.ClientException) as e:
+                    logger.warning("길드 멤버 일괄 조회 실패 guild_id=%s error=%s", guild.id, e)
+                    continue
+                for member in members:
+                    resolved[member.id] = member
+                    self._cache.set(member.id, member)
+            misses = [user_id for user_id in misses if user_id not in resolved]
+
+        if misses:
+            fetched = await asyncio.gather(*(self._fetch(user_id) for user_id in misses))
+            for user_id, user in zip(misses, fetched):
+                if user is not None:
+                    resolved[user_id] = user
+        return resolved
+
+    async def display_names(
+        self, user_ids: Iterable[int], guild: Optional[discord.Guild] = None
+    ) -> Dict[int, str]:
+        """user_id → 표시 이름 (해석 실패 시 'User <id>')"""
+        user_ids = list(user_ids)
+        resolved = await self.resolve_many(user_ids, guild)
+        return {
+            user_id: resolved[user_id].display_name if user_id in resolved else f"User {user_id}"
+            for user_id in user_ids
+        }
+
+    def stats(self) -> Dict:
+        return {
+            **self._cache.stats(),
+            'rest_fetches': self.rest_fetches,
+            'gateway_queries': self.gateway_queries,
+            'rate_limited': self.rate_limited,
+        }
@@ -0,0 +1,80 @@
+"""내보내기 COPY 문 구성(export_copy_query)과 업로드용 파일 분할(split_file) 테스트."""
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from database import EXPORT_TABLES, export_copy_query
+from services.export import parse_date_range, split_file
+
+
+def test_export_without_filters_selects_everything_in_order():
+    sql, params = export_copy_query('submissions')
+    assert params == {}
+    assert 'WHERE TRUE ORDER BY submission_id' in sql
+    assert sql.endswith('WITH (FORMAT csv, HEADER true)')
+
+
+def test_export_filters_use_table_date_column_and_user():
+    since, until = datetime(2026, 1, 1), datetime(2026, 4, 1)
+    sql, params = export_copy_query('xp_logs', since=since, until=until, user_id=42)
+    assert params == {'since': since, 'until': until, 'user_id': 42}
+    assert 'WHERE created_at >= %(since)s AND created_at < %(until)s AND user_id = %(user_id)s' in sql
+
+
+@pytest.mark.parametrize('table', list(EXPORT_TABLES))
+def test_export_date_filter_column_per_table(table):
+    _, date_column, _ = EXPORT_TABLES[table]
+    sql, params = export_copy_query(table, since=datetime(2026, 1, 1))
+    assert f'{date_column} >= %(since)s' in sql
+    assert 'until' not in params
+
+
+def test_export_jsonl_wraps_select_in_row_to_json():
+    sql, _ = export_copy_query('users', 'jsonl', user_id=7)
+    assert sql.startswith('COPY (SELECT row_to_json(t) FROM (SELECT ')
+    assert 'user_id = %(user_id)s' in sql
+    assert 'HEADER' not in sql
+
+
+@pytest.mark.parametrize('table, fmt', [('outbox', 'csv'), ('submissions', 'xml')])
+def test_export_rejects_unknown_table_or_format(table, fmt):
+    with pytest.raises(ValueError):
+        export_copy_query(table, fmt)
+
+
+def test_parse_date_range_includes_until_day():
+    assert parse_date_range('2026-01-01', '2026-03-31') == (datetime(2026, 1, 1), datetime(2026, 4, 1))
+    assert parse_date_range(None, None) == (None, None)
+    with pytest.raises(ValueError):
+        parse_date_range('2026-02-01', '2026-01-31')
+
+
+@pytest.fixture
+def make_file(tmp_path):
+    def make(size: int) -> str:
+        path = tmp_path / 'export.csv.gz'
+        path.write_bytes(bytes(i % 251 for i in range(size)))
+        return str(path)
+    return make
+
+
+def test_split_file_under_limit_returns_original(make_file):
+    path = make_file(1000)
+    assert split_file(path, 1000) == [path]
+
+
+def test_split_file_chunks_reassemble_to_original(make_file):
+    path = make_file(2500)
+    parts = split_file(path, 1000)
+    assert parts == [f"{path}.part001", f"{path}.part002", f"{path}.part003"]
+    sizes = [len(Path(part).read_bytes()) for part in parts]
+    assert sizes == [1000, 1000, 500]
+    assert b''.join(Path(part).read_bytes() for part in parts) == Path(path).read_bytes()
+
+
+def test_split_file_exact_multiple_has_no_empty_part(make_file):
+    path = make_file(2000)
+    parts = split_file(path, 1000)
+    assert len(parts) == 2
+    assert all(len(Path(part).read_bytes()) == 1000 for part in parts)
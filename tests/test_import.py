@@ -0,0 +1,118 @@
+"""Database.bulk_import 검증/병합 SQL을 실제 PostgreSQL에서 실행하는 테스트.
+
+TEST_DATABASE_URL이 있을 때만 실행한다 (마이그레이션이 적용되므로 비워도 되는 DB를 지정할 것).
+테스트 유저는 실제 Discord ID와 겹치지 않는 큰 ID를 쓰고 앞뒤로 지운다.
+"""
+import io
+import os
+
+import pytest
+
+import database
+
+pytestmark = pytest.mark.skipif(not os.getenv('TEST_DATABASE_URL'), reason="TEST_DATABASE_URL 미설정")
+
+USER_ID = 9_000_000_000_000_000_001
+
+# 데이터 행 번호: 1-5 정상 B, 6 중복, 7 없는 미션, 8 마일스톤 미션 직접 제출,
+# 9 원타임 A, 10 두 번째 A, 11 대기 C, 12 잘못된 상태, 13 user_id 누락
+SUBMISSIONS_CSV = "user_id,mission_code,link,status\n" + "".join(
+    f"{USER_ID},B,https://example.com/b{i},approved\n" for i in range(1, 6)
+) + (
+    f"{USER_ID},B,https://example.com/b1,approved\n"
+    f"{USER_ID},Z,https://example.com/z,approved\n"
+    f"{USER_ID},D,https://example.com/d,approved\n"
+    f"{USER_ID},A,https://example.com/a1,\n"
+    f"{USER_ID},A,https://example.com/a2,approved\n"
+    f"{USER_ID},C,https://example.com/c1,pending\n"
+    f"{USER_ID},C,https://example.com/c2,bogus\n"
+    f",B,https://example.com/n,approved\n"
+)
+XP_LOGS_CSV = (
+    "user_id,mission_name,xp_amount\n"
+    f"{USER_ID},Event Bonus,50\n"
+    f"{USER_ID},Broken Row,\n"
+)
+
+# B 5건 + A 1건 + 5건 달성 마일스톤 D + XP 로그 1건
+EXPECTED_XP = 5 * database.QUEST_INFO['B']['xp'] + database.QUEST_INFO['A']['xp'] \
+    + database.QUEST_INFO['D']['xp'] + 50
+
+EXPECTED_PROBLEMS = [
+    ('submissions', 'already_completed', [10]),
+    ('submissions', 'bad_status', [12]),
+    ('submissions', 'duplicate', [6]),
+    ('submissions', 'milestone_mission', [8]),
+    ('submissions', 'missing_field', [13]),
+    ('submissions', 'unknown_mission', [7]),
+    ('xp_logs', 'missing_field', [2]),
+]
+
+
+def _cleanup(db):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        for table in ('xp_logs', 'completed_quests', 'user_mission_stats', 'submissions', 'users'):
+            cursor.execute(f'DELETE FROM {table} WHERE user_id = %s', (USER_ID,))
+        conn.commit()
+        cursor.close()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', os.environ['TEST_DATABASE_URL'])
+    db = database.Database()
+    _cleanup(db)
+    yield db
+    _cleanup(db)
+    db.close()
+
+
+def run_import(db, **kwargs):
+    files = {'submissions': io.StringIO(SUBMISSIONS_CSV), 'xp_logs': io.StringIO(XP_LOGS_CSV)}
+    return db.bulk_import(files, **kwargs)
+
+
+def stored_user(db):
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT total_xp, tier, approved_count, total_submissions FROM users WHERE user_id = %s', (USER_ID,)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        return row
+
+
+def test_dry_run_reports_problems_and_milestones_without_writing(db):
+    report = run_import(db, dry_run=True)
+
+    assert report['staged'] == {'submissions': 13, 'xp_logs': 2}
+    assert [(p['source'], p['problem'], p['rows']) for p in report['problems']] == EXPECTED_PROBLEMS
+    merged = report['merged']
+    assert merged['new_users'] == 1
+    assert merged['submissions'] == 7  # B 5건 + A 1건 + 대기 C 1건
+    assert merged['completed_quests'] == 1
+    assert merged['milestones'] == 1
+    assert merged['xp_added'] == EXPECTED_XP
+    assert stored_user(db) is None
+
+
+def test_problems_abort_without_skip_invalid(db):
+    report = run_import(db)
+
+    assert report['aborted']
+    assert stored_user(db) is None
+
+
+def test_skip_invalid_merges_valid_rows_and_recomputes_tier(db):
+    report = run_import(db, skip_invalid=True)
+
+    assert not report['aborted']
+    assert stored_user(db) == (EXPECTED_XP, database.tier_for_xp(EXPECTED_XP), 6, 7)
+
+    # 같은 파일을 다시 가져오면 모두 중복/이미 완료로 걸러지고 마일스톤도 다시 주지 않음
+    again = run_import(db, dry_run=True)
+    assert again['merged']['submissions'] == 0
+    assert again['merged']['milestones'] == 0
+    assert again['merged']['xp_added'] == 50
@@ -0,0 +1,114 @@
+"""manage.py 서브커맨드를 main()으로 끝까지 실행하는 테스트.
+
+가짜 풀 테스트는 DB 없이 실제 Database 클래스의 연결/스키마 확인/종료 경로를 거친다.
+TEST_DATABASE_URL이 있으면 실제 PostgreSQL에서도 서브커맨드를 실행한다
+(마이그레이션이 적용되므로 비워도 되는 DB를 지정할 것).
+"""
+import os
+from contextlib import contextmanager
+
+import pytest
+
+import database
+import manage
+import migrate
+
+
+class FakeCursor:
+    def __init__(self, results):
+        self.results = results
+        self.rows = []
+
+    def execute(self, query, vars=None):
+        self.rows = next((rows for key, rows in self.results.items() if key in query), [])
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, results):
+        self.results = results
+
+    def cursor(self):
+        return FakeCursor(self.results)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakePool:
+    """Database가 쓰는 ConnectionPool 인터페이스만 흉내 내는 풀"""
+    instances = []
+
+    def __init__(self, dsn, **kwargs):
+        applied = [(m.version,) for m in migrate.load_migrations()]
+        self.results = {
+            'FROM schema_migrations': applied,
+            'FROM outbox': [('pending', 2), ('dead', 1)],
+        }
+        self.checkouts = 0
+        self.closed = False
+        FakePool.instances.append(self)
+
+    @contextmanager
+    def connection(self):
+        self.checkouts += 1
+        yield FakeConnection(self.results)
+
+    def stats(self):
+        return {'checkouts': self.checkouts}
+
+    def closeall(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', 'postgresql://test/test')
+    monkeypatch.setattr(database, 'ConnectionPool', FakePool)
+    FakePool.instances = []
+    yield FakePool
+
+
+def test_outbox_status_runs_through_main(fake_pool, capsys):
+    assert manage.main(['outbox-status']) == 0
+
+    assert "pending 2건, sent 0건, dead 1건" in capsys.readouterr().out
+    pool, = fake_pool.instances
+    assert pool.checkouts == 2  # 스키마 확인 1회 + 조회 1회
+    assert pool.closed
+
+
+def test_pool_closed_when_command_fails(fake_pool, monkeypatch):
+    def broken(self):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(database.Database, 'get_outbox_counts', broken)
+    with pytest.raises(RuntimeError):
+        manage.main(['outbox-status'])
+
+    assert fake_pool.instances[0].closed
+
+
+def test_database_exposes_pool_stats(fake_pool):
+    db = database.Database()
+    assert db.pool_stats() == {'checkouts': 0}
+    db.close()
+    assert fake_pool.instances[0].closed
+
+
+@pytest.mark.skipif(not os.getenv('TEST_DATABASE_URL'), reason="TEST_DATABASE_URL 미설정")
+@pytest.mark.parametrize('command', [
+    'rebuild-mission-stats', 'sync-tiers', 'outbox-status', 'outbox-retry-dead',
+])
+def test_commands_against_postgres(command, monkeypatch, capsys):
+    monkeypatch.setenv('DATABASE_URL', os.environ['TEST_DATABASE_URL'])
+    assert manage.main([command]) == 0
+    assert capsys.readouterr().out
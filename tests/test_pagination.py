@@ -0,0 +1,138 @@
+"""키셋 페이지 이동(load_page)과 유저 목록 페이지 쿼리(users_page_query) 동작 테스트.
+
+users_page_query의 WHERE/ORDER BY는 표준 SQL만 쓰므로 sqlite 메모리 DB에서 그대로 실행해
+이전/다음 페이지가 전체 정렬 결과와 이어지는지 확인한다.
+"""
+import asyncio
+import re
+import sqlite3
+
+import pytest
+
+from database import users_page_query
+from services.pagination import KeysetPager, load_page
+
+
+class ListPager(KeysetPager):
+    """정수 id 목록을 오름차순으로 페이지 나누는 테스트용 목록"""
+    kind = 'test'
+    page_size = 3
+
+    def __init__(self, ids):
+        self.ids = sorted(ids)
+
+    async def fetch(self, bot, after, limit, reverse):
+        if reverse:
+            rows = [i for i in reversed(self.ids) if after is None or i < after[0]]
+        else:
+            rows = [i for i in self.ids if after is None or i > after[0]]
+        return [{'id': i} for i in rows[:limit]]
+
+    def cursor(self, row):
+        return (row['id'],)
+
+    def render(self, rows, has_prev, has_next):
+        return None
+
+
+def page(pager, anchor=None, before=None):
+    rows, anchor, has_prev, has_next = asyncio.run(load_page(pager, None, anchor=anchor, before=before))
+    return [row['id'] for row in rows], anchor, has_prev, has_next
+
+
+@pytest.fixture
+def pager():
+    return ListPager(range(1, 9))  # 1..8 → [1,2,3] [4,5,6] [7,8]
+
+
+def test_first_page(pager):
+    assert page(pager) == ([1, 2, 3], None, False, True)
+
+
+def test_next_pages_follow_anchor(pager):
+    assert page(pager, anchor=(3,)) == ([4, 5, 6], (3,), True, True)
+    assert page(pager, anchor=(6,)) == ([7, 8], (6,), True, False)
+
+
+def test_prev_from_second_page_returns_first_page(pager):
+    # 두 번째 페이지의 첫 행(4) 이전 → 앵커가 없는 첫 페이지
+    assert page(pager, before=(4,)) == ([1, 2, 3], None, False, True)
+
+
+def test_prev_from_last_page_sets_anchor(pager):
+    # 마지막 페이지의 첫 행(7) 이전 → [4,5,6]이고 그 앞 행(3)이 새 앵커
+    assert page(pager, before=(7,)) == ([4, 5, 6], (3,), True, True)
+
+
+def test_prev_with_short_first_page_keeps_rows_in_order():
+    pager = ListPager(range(1, 6))  # 앞 페이지를 당겨 와도 행이 page_size보다 적은 경우
+    assert page(pager, before=(3,)) == ([1, 2], None, False, True)
+
+
+def test_prev_before_first_row_falls_back_to_first_page(pager):
+    assert page(pager, before=(1,)) == ([1, 2, 3], None, False, True)
+
+
+def test_prev_then_next_round_trip(pager):
+    rows, anchor, _, _ = page(pager, before=(7,))
+    assert page(pager, anchor=anchor)[0] == rows
+
+
+def test_cursor_token_round_trip(pager):
+    assert pager.decode(pager.encode((1500, -42))) == (1500, -42)
+
+
+# ---- users_page_query ----
+
+# total_xp 동점이 페이지 경계에 걸치도록 구성
+USERS = [(1, 900), (2, 500), (3, 500), (4, 500), (5, 500), (6, 300), (7, 0), (8, 0)]
+
+
+@pytest.fixture
+def users_db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE users (user_id INTEGER, total_xp INTEGER, tier INTEGER, tier_name TEXT)')
+    conn.executemany('INSERT INTO users VALUES (?, ?, 1, NULL)', USERS)
+    yield conn
+    conn.close()
+
+
+def run_page(conn, after, limit, reverse=False):
+    sql, params = users_page_query(after, limit, reverse)
+    sql = re.sub(r'%\((\w+)\)s', r':\1', sql)  # psycopg2 → sqlite 파라미터 표기
+    return [(user_id, xp) for user_id, xp, _, _ in conn.execute(sql, params)]
+
+
+def ranked():
+    return sorted(USERS, key=lambda u: (-u[1], u[0]))
+
+
+def test_users_first_page_has_no_cursor_params():
+    sql, params = users_page_query(None, 10)
+    assert params == {'limit': 10}
+    assert 'WHERE' not in sql
+
+
+def test_users_next_pages_cover_ranking_without_gaps(users_db):
+    seen, after = [], None
+    while True:
+        rows = run_page(users_db, after, 3)
+        seen.extend(rows)
+        if len(rows) < 3:
+            break
+        user_id, xp = rows[-1]
+        after = (xp, user_id)
+    assert seen == ranked()
+
+
+def test_users_prev_page_returns_rows_before_cursor_nearest_first(users_db):
+    order = ranked()
+    # 동점(500 XP) 한가운데인 4번 유저 직전 행들
+    index = order.index((4, 500))
+    rows = run_page(users_db, (500, 4), 3, reverse=True)
+    assert rows == list(reversed(order[index - 3:index]))
+
+
+def test_users_prev_page_at_start_is_empty(users_db):
+    user_id, xp = ranked()[0]
+    assert run_page(users_db, (xp, user_id), 3, reverse=True) == []
@@ -0,0 +1,41 @@
+"""티어 계산(tier_for_xp / tiers_for_xp)이 이전 get_user_tier와 같은 결과를 내는지 확인."""
+import pytest
+
+from database import TIER_SYSTEM, tier_for_xp, tiers_for_xp
+
+
+def legacy_get_user_tier(total_xp: int) -> int:
+    """bisect 테이블 이전 Database.get_user_tier 구현"""
+    tier = 1
+    for tier_level, tier_info in sorted(TIER_SYSTEM.items(), reverse=True):
+        if total_xp >= tier_info['xp_required']:
+            tier = tier_level
+            break
+    return tier
+
+
+# 각 기준값과 그 앞뒤, 음수(XP 차감), 아주 큰 값
+BOUNDARY_XP = sorted({
+    xp
+    for info in TIER_SYSTEM.values()
+    for xp in (info['xp_required'] - 1, info['xp_required'], info['xp_required'] + 1)
+} | {-1000, 10 ** 9})
+
+
+@pytest.mark.parametrize('total_xp', BOUNDARY_XP)
+def test_tier_for_xp_matches_legacy(total_xp):
+    assert tier_for_xp(total_xp) == legacy_get_user_tier(total_xp)
+
+
+def test_tier_for_xp_known_boundaries():
+    # 2티어 기준값이 0이라 0 XP부터 2티어이고, 음수면 기본값 1
+    assert tier_for_xp(-1) == 1
+    assert tier_for_xp(0) == 2
+    assert tier_for_xp(499) == 2
+    assert tier_for_xp(500) == 3
+    assert tier_for_xp(2500) == 5
+
+
+def test_tiers_for_xp_matches_single_lookup():
+    assert tiers_for_xp(BOUNDARY_XP) == [tier_for_xp(xp) for xp in BOUNDARY_XP]
+    assert tiers_for_xp([]) == []